@@ -10,17 +10,35 @@ accounts/
       create_sample_data.py  <-- This file
 """
 
-from django.core.management.base import BaseCommand
+import time
+
+from django.core.management.base import BaseCommand, CommandError
 from django.contrib.auth import get_user_model
 from articles.models import Category, Article
 from django.utils.text import slugify
+from articles.synthetic import generate_dataset, SAMPLE_PASSWORD
 
 User = get_user_model()
 
 class Command(BaseCommand):
-    help = 'Create sample data for testing'
+    help = 'Create sample data for testing (--scale: a large deterministic dataset for benchmarking)'
+    
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--scale', action='store_true',
+            help='Generate a large synthetic dataset with bulk inserts instead of the demo rows'
+        )
+        parser.add_argument('--users', type=int, default=1000, help='Sample users (--scale, default: 1000)')
+        parser.add_argument('--categories', type=int, default=50, help='Sample categories (--scale, default: 50)')
+        parser.add_argument('--articles', type=int, default=100000, help='Sample articles (--scale, default: 100000)')
+        parser.add_argument('--seed', type=int, default=42, help='Random seed (--scale, default: 42)')
+        parser.add_argument('--draft-ratio', type=float, default=0.2, help='Share of drafts (--scale, default: 0.2)')
+        parser.add_argument('--batch-size', type=int, default=10000, help='Rows per INSERT batch (--scale, default: 10000)')
     
     def handle(self, *args, **options):
+        if options['scale']:
+            return self.handle_scale(options)
+        
         self.stdout.write(self.style.SUCCESS('=' * 70))
         self.stdout.write(self.style.SUCCESS('Creating sample data for Mini CMS...'))
         self.stdout.write(self.style.SUCCESS('=' * 70))
@@ -225,4 +243,29 @@ class Command(BaseCommand):
         self.stdout.write('  2. Run tests: python test_api_complete.py')
         self.stdout.write('  3. View Swagger: http://127.0.0.1:1223/swagger/')
         self.stdout.write('  4. Login at: http://127.0.0.1:1223/api/auth/login/')
-        self.stdout.write('=' * 70 + '\n')
\ No newline at end of file
+        self.stdout.write('=' * 70 + '\n')
+    
+    def handle_scale(self, options):
+        """
+        Bulk-generate users, categories and articles (see articles.synthetic).
+        Existing sample rows are kept, so the dataset can be grown later.
+        """
+        if min(options['users'], options['categories'], options['batch_size']) < 1:
+            raise CommandError('--users, --categories and --batch-size must be positive')
+        
+        started = time.perf_counter()
+        written = generate_dataset(
+            users=options['users'],
+            categories=options['categories'],
+            articles=options['articles'],
+            seed=options['seed'],
+            draft_ratio=options['draft_ratio'],
+            batch_size=options['batch_size'],
+            log=self.stdout.write,
+        )
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(
+            f'✓ Generated {written} articles in {elapsed:.1f}s; '
+            f'{Article.objects.count()} articles, {User.objects.count()} users in total'
+        ))
+        self.stdout.write(f'  Sample users log in with password: {SAMPLE_PASSWORD}')
@@ -1,6 +1,9 @@
 """
 accounts/tests.py
 """
+from io import StringIO
+
+from django.core.management import call_command
 from django.test import TestCase
 from django.contrib.auth import get_user_model
 from rest_framework.test import APIClient
@@ -63,3 +66,34 @@ class UserAuthenticationTests(TestCase):
         
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(response.data['username'], 'testuser')
+
+
+class CreateSampleDataScaleTests(TestCase):
+    def _run(self, *args):
+        out = StringIO()
+        call_command('create_sample_data', '--scale', '--users', '5', '--categories', '3', *args, stdout=out)
+        return out.getvalue()
+    
+    def test_scale_mode_generates_dataset(self):
+        """Test that --scale bulk-generates users, categories and articles with counters"""
+        from articles.models import Article, Category
+        self._run('--articles', '250', '--batch-size', '100')
+        self.assertEqual(User.objects.count(), 5)
+        self.assertEqual(Category.objects.count(), 3)
+        self.assertEqual(Article.objects.count(), 250)
+        self.assertEqual(
+            sum(Category.objects.values_list('published_articles_count', flat=True)),
+            Article.objects.filter(status='published').count()
+        )
+        
+        # Growing the dataset only adds the missing rows
+        self._run('--articles', '300')
+        self.assertEqual(Article.objects.count(), 300)
+    
+    def test_generation_is_deterministic(self):
+        """Test that rows depend only on the seed, not on batching"""
+        from articles.synthetic import article_records
+        at_once = article_records(0, 2500, [1, 2, 3], [1, 2], seed=7)
+        batched = article_records(0, 1200, [1, 2, 3], [1, 2], seed=7) + article_records(1200, 2500, [1, 2, 3], [1, 2], seed=7)
+        self.assertEqual(at_once, batched)
+        self.assertNotEqual(at_once, article_records(0, 2500, [1, 2, 3], [1, 2], seed=8))
@@ -7,10 +7,11 @@ from .models import Category, Article
 
 @admin.register(Category)
 class CategoryAdmin(admin.ModelAdmin):
-    list_display = ['name', 'slug', 'created_at']
+    list_display = ['name', 'slug', 'published_articles_count', 'created_at']
     prepopulated_fields = {'slug': ('name',)}
     search_fields = ['name', 'description']
     list_filter = ['created_at']
+    readonly_fields = ['published_articles_count', 'created_at', 'updated_at']
 
 @admin.register(Article)
 class ArticleAdmin(admin.ModelAdmin):
@@ -1,5 +1,3 @@
-
-
 """
 articles/apps.py
 """
@@ -8,4 +6,6 @@ from django.apps import AppConfig
 class ArticlesConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'articles'
-
+    
+    def ready(self):
+        from . import signals  # noqa: F401
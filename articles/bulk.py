@@ -0,0 +1,175 @@
+"""
+articles/bulk.py
+"""
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.text import slugify
+from .models import Article, Category
+from .counters import rebuild_published_counts
+from .serializers import BulkArticleSerializer
+
+SLUG_MAX_LENGTH = Article._meta.get_field('slug').max_length
+LOOKUP_CHUNK_SIZE = 500
+WRITE_BATCH_SIZE = 1000
+
+def chunked(values, size=LOOKUP_CHUNK_SIZE):
+    values = list(values)
+    for start in range(0, len(values), size):
+        yield values[start:start + size]
+
+def allocate_slugs(titles, released_pks=()):
+    """
+    Unique slugs for `titles`, in order, with two lookups per chunk instead
+    of one per title: slugify(title) when it is free, otherwise the next
+    free "-N" suffix. Slugs of the articles in `released_pks` (which are
+    about to be renamed) count as free.
+    """
+    bases = [(slugify(title) or 'article')[:SLUG_MAX_LENGTH] for title in titles]
+    existing = Article.objects.exclude(pk__in=list(released_pks))
+
+    taken = set()
+    for chunk in chunked(set(bases)):
+        taken.update(existing.filter(slug__in=chunk).values_list('slug', flat=True))
+
+    # Highest numeric suffix already used for every base that collides,
+    # either with the table or with another title in this batch
+    seen = set()
+    colliding = set()
+    for base in bases:
+        if base in taken or base in seen:
+            colliding.add(base)
+        seen.add(base)
+
+    next_suffix = {}
+    for chunk in chunked(colliding, 100):
+        query = Q()
+        for base in chunk:
+            query |= Q(slug__startswith=f'{base[:SLUG_MAX_LENGTH - 2]}-')
+        for slug in existing.filter(query).values_list('slug', flat=True):
+            taken.add(slug)
+            base, _, suffix = slug.rpartition('-')
+            if suffix.isdigit():
+                next_suffix[base] = max(next_suffix.get(base, 2), int(suffix) + 1)
+
+    slugs = []
+    for base in bases:
+        slug = base
+        while slug in taken:
+            suffix = next_suffix.get(base, 2)
+            next_suffix[base] = suffix + 1
+            slug = f'{base[:SLUG_MAX_LENGTH - len(str(suffix)) - 1]}-{suffix}'
+        taken.add(slug)
+        slugs.append(slug)
+    return slugs
+
+def bulk_create_articles(validated_items, author):
+    """
+    INSERT one article per validated_data dict with bulk_create, in a single
+    transaction, then refresh the affected category counters (bulk_create
+    does not send model signals)
+    """
+    slugs = allocate_slugs(item['title'] for item in validated_items)
+    articles = [
+        Article(**item, slug=slug, author=author)
+        for item, slug in zip(validated_items, slugs)
+    ]
+    with transaction.atomic():
+        Article.objects.bulk_create(articles, batch_size=WRITE_BATCH_SIZE)
+        rebuild_published_counts({article.category_id for article in articles})
+    return articles
+
+def bulk_update_articles(changes):
+    """
+    Apply (article, validated_data) pairs with bulk_update in a single
+    transaction. Retitled articles get new slugs like single updates do.
+    """
+    renamed = [(article, data) for article, data in changes if 'title' in data]
+    slugs = allocate_slugs([data['title'] for _, data in renamed], released_pks=[a.pk for a, _ in renamed])
+    slug_for = {article.pk: slug for (article, _), slug in zip(renamed, slugs)}
+
+    category_ids = set()
+    fields = {'updated_at'}
+    now = timezone.now()
+    for article, data in changes:
+        category_ids.add(article.category_id)
+        for name, value in data.items():
+            setattr(article, name, value)
+            fields.add(name)
+        if article.pk in slug_for:
+            article.slug = slug_for[article.pk]
+            fields.add('slug')
+        article.updated_at = now
+        category_ids.add(article.category_id)
+
+    articles = [article for article, _ in changes]
+    with transaction.atomic():
+        Article.objects.bulk_update(articles, sorted(fields), batch_size=WRITE_BATCH_SIZE)
+        rebuild_published_counts(category_ids)
+    return articles
+
+def write_bulk_request(items, author, context, instances=None, can_change=None):
+    """
+    Validate and write the items of a bulk request: create one article per
+    item, or, when `instances` (the queryset of editable articles) is given,
+    partially update the article named by each item's "id". Articles for
+    which can_change(article) is false are refused.
+
+    Categories (and articles) are loaded in one query each and every valid
+    item is written in a single transaction. Returns (written, results),
+    results holding one {'index', 'status', ...} dict per item. Raises
+    IntegrityError, with nothing saved, on a conflicting concurrent write.
+    """
+    creating = instances is None
+    category_ids = set()
+    for item in items:
+        if isinstance(item, dict) and str(item.get('category', '')).isdigit():
+            category_ids.add(int(item['category']))
+    context = {**context, 'categories': Category.objects.in_bulk(category_ids)}
+
+    results = [None] * len(items)
+    valid = []
+    if creating:
+        for index, item in enumerate(items):
+            valid.append((index, BulkArticleSerializer(data=item, context=context), None))
+    else:
+        ids = [item.get('id') for item in items if isinstance(item, dict)]
+        ids = [int(pk) for pk in ids if str(pk).isdigit()]
+        instances = instances.filter(pk__in=ids).in_bulk()
+        seen = set()
+        for index, item in enumerate(items):
+            pk = item.get('id') if isinstance(item, dict) else None
+            if pk is None or not str(pk).isdigit():
+                results[index] = {'index': index, 'status': 400, 'errors': {'id': ['This field is required.']}}
+                continue
+            instance = instances.get(int(pk))
+            if instance is None or int(pk) in seen:
+                detail = 'Not found.' if instance is None else 'Duplicate id.'
+                results[index] = {'index': index, 'status': 404 if instance is None else 400, 'errors': {'detail': detail}}
+                continue
+            seen.add(instance.pk)
+            if can_change is not None and not can_change(instance):
+                results[index] = {
+                    'index': index,
+                    'status': 403,
+                    'errors': {'detail': 'You do not have permission to perform this action.'},
+                }
+                continue
+            valid.append((index, BulkArticleSerializer(instance, data=item, partial=True, context=context), instance))
+
+    written = []
+    for index, serializer, instance in valid:
+        if serializer.is_valid():
+            written.append((index, serializer.validated_data, instance))
+        else:
+            results[index] = {'index': index, 'status': 400, 'errors': serializer.errors}
+
+    if written:
+        if creating:
+            articles = bulk_create_articles([data for _, data, _ in written], author)
+        else:
+            articles = bulk_update_articles([(instance, data) for _, data, instance in written])
+        item_status = 201 if creating else 200
+        for (index, _, _), article in zip(written, articles):
+            results[index] = {'index': index, 'status': item_status, 'id': article.pk, 'slug': article.slug}
+    return len(written), results
@@ -0,0 +1,157 @@
+"""
+articles/caching.py
+"""
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.utils.cache import get_conditional_response
+from django.utils.http import parse_http_date_safe
+from rest_framework import status
+from rest_framework.response import Response
+
+class ResponseCache:
+    """
+    Versioned cache for serialized API responses.
+
+    Every key embeds a generation number. Article/Category writes bump the
+    generation (see articles.signals), which orphans every previously cached
+    response at once instead of tracking which keys a write affects; orphans
+    simply expire via the cache TIMEOUT.
+
+    Hit/miss counters live in the same cache so they add up across workers
+    when a shared backend (file or Redis) is configured.
+    """
+    alias = 'api_responses'
+    prefix = 'api-responses'
+
+    @property
+    def cache(self):
+        return caches[self.alias]
+
+    @property
+    def enabled(self):
+        return getattr(settings, 'API_CACHE_ENABLED', True)
+
+    def generation(self):
+        key = f'{self.prefix}:generation'
+        value = self.cache.get(key)
+        if value is None:
+            # Seed from the clock so an evicted generation never comes back
+            # to a number that still has entries cached under it
+            self.cache.add(key, int(time.time() * 1000), timeout=None)
+            value = self.cache.get(key)
+        return value
+
+    def bump(self):
+        """
+        Invalidate every cached response
+        """
+        key = f'{self.prefix}:generation'
+        try:
+            self.cache.incr(key)
+        except ValueError:
+            self.cache.set(key, int(time.time() * 1000), timeout=None)
+
+    def make_key(self, request, namespace):
+        # The absolute URI, not just the path: cached pages embed absolute
+        # next/previous links, so a response built for one Host must never
+        # be served for another
+        digest = hashlib.sha256(request.build_absolute_uri().encode()).hexdigest()
+        renderer_format = getattr(request, 'accepted_renderer', None)
+        renderer_format = renderer_format.format if renderer_format else ''
+        return f'{self.prefix}:{self.generation()}:{namespace}:{renderer_format}:{digest}'
+
+    def get(self, key):
+        value = self.cache.get(key)
+        self._count('hits' if value is not None else 'misses')
+        return value
+
+    def set(self, key, value):
+        self.cache.set(key, value)
+
+    def stats(self):
+        counters = self.cache.get_many([f'{self.prefix}:hits', f'{self.prefix}:misses'])
+        hits = counters.get(f'{self.prefix}:hits', 0)
+        misses = counters.get(f'{self.prefix}:misses', 0)
+        lookups = hits + misses
+        return {
+            'backend': self.cache.__class__.__name__,
+            'generation': self.generation(),
+            'hits': hits,
+            'misses': misses,
+            'hit_ratio': round(hits / lookups, 4) if lookups else None,
+        }
+
+    def _count(self, name):
+        key = f'{self.prefix}:{name}'
+        try:
+            self.cache.incr(key)
+        except ValueError:
+            if not self.cache.add(key, 1, timeout=None):
+                self.cache.incr(key)
+
+response_cache = ResponseCache()
+
+class AnonymousResponseCacheMixin:
+    """
+    Serve anonymous GETs for `cached_actions` from response_cache.
+
+    Unauthenticated users all get the same queryset (published articles,
+    every category), so one cached body per URL is correct for all of them.
+    Authenticated requests always bypass the cache.
+
+    Validator headers (ETag, Last-Modified) are cached with the body, so a
+    revalidation that hits the cache is answered with a 304 without
+    touching the database.
+    """
+    cached_actions = ('list', 'retrieve')
+    cached_headers = ('ETag', 'Last-Modified', 'Vary')
+
+    def is_response_cacheable(self, request):
+        return (
+            response_cache.enabled
+            and request.method == 'GET'
+            and self.action in self.cached_actions
+            and not request.user.is_authenticated
+        )
+
+    def cached_response(self, request, build):
+        """
+        Return the cached response for this request, or call `build()` and
+        cache its result if it is a 200
+        """
+        if not self.is_response_cacheable(request):
+            return build()
+
+        key = response_cache.make_key(request, f'{self.basename}-{self.action}')
+        cached = response_cache.get(key)
+        if cached is not None:
+            data, headers = cached
+            response = Response(data)
+            for header, value in headers.items():
+                response[header] = value
+            response = get_conditional_response(
+                request,
+                etag=headers.get('ETag'),
+                last_modified=parse_http_date_safe(headers.get('Last-Modified', '')),
+                response=response,
+            )
+            response['X-Cache'] = 'HIT'
+            return response
+
+        response = build()
+        if response.status_code == status.HTTP_200_OK:
+            headers = {h: response[h] for h in self.cached_headers if response.has_header(h)}
+            response_cache.set(key, (response.data, headers))
+        response['X-Cache'] = 'MISS'
+        return response
+
+    def list(self, request, *args, **kwargs):
+        build = super().list
+        return self.cached_response(request, lambda: build(request, *args, **kwargs))
+
+    def retrieve(self, request, *args, **kwargs):
+        build = super().retrieve
+        return self.cached_response(request, lambda: build(request, *args, **kwargs))
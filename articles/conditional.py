@@ -0,0 +1,105 @@
+"""
+articles/conditional.py
+"""
+import hashlib
+import json
+from calendar import timegm
+
+from django.core.exceptions import ValidationError
+from django.db.models import Count, Max, Sum
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.http import http_date
+from rest_framework import status
+from .caching import response_cache
+
+class ConditionalGetMixin:
+    """
+    ETag / Last-Modified support for `conditional_actions`.
+
+    Validators come from one aggregate probe over the same queryset the
+    action would serialize: MAX(updated_at), COUNT(*) and, optionally, the
+    SUM of `conditional_checksum_field` for counters that change without
+    touching updated_at. They are combined with the request path, the user
+    and the response cache generation into a strong ETag. When the client's
+    If-None-Match / If-Modified-Since still matches, a 304 is returned
+    before anything is serialized.
+
+    Last-Modified cannot see rows that were deleted; clients that need
+    exact revalidation should use If-None-Match.
+    """
+    conditional_actions = ('list', 'retrieve')
+    conditional_checksum_field = None
+
+    def get_conditional_validators(self, request, queryset):
+        """
+        Return (etag, last_modified timestamp), or None when there is
+        nothing to validate against (e.g. a missing object)
+        """
+        aggregates = {'last_modified': Max('updated_at'), 'total': Count('pk')}
+        if self.conditional_checksum_field:
+            aggregates['checksum'] = Sum(self.conditional_checksum_field)
+        probe = queryset.order_by().aggregate(**aggregates)
+
+        if self.action == 'retrieve' and not probe['total']:
+            return None
+
+        last_modified = probe['last_modified']
+        last_modified = timegm(last_modified.utctimetuple()) if last_modified else None
+        renderer = getattr(request, 'accepted_renderer', None)
+        fingerprint = json.dumps([
+            request.get_full_path(),
+            request.user.pk,
+            renderer.format if renderer else None,
+            response_cache.generation(),
+            probe['total'],
+            probe.get('checksum'),
+            last_modified,
+        ])
+        return '"%s"' % hashlib.sha256(fingerprint.encode()).hexdigest(), last_modified
+
+    def conditional_response(self, request, queryset, build):
+        """
+        Answer 304 if the client's copy of `queryset` is current, otherwise
+        call `build()`; either way attach the validators
+        """
+        if request.method != 'GET' or self.action not in self.conditional_actions:
+            return build()
+
+        validators = self.get_conditional_validators(request, queryset)
+        if validators is None:
+            return build()
+
+        etag, last_modified = validators
+        response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+        if response is None:
+            response = build()
+
+        if response.status_code in (status.HTTP_200_OK, status.HTTP_304_NOT_MODIFIED):
+            response['ETag'] = etag
+            if last_modified is not None:
+                response['Last-Modified'] = http_date(last_modified)
+        # Visibility (and therefore the ETag) depends on who is asking
+        patch_vary_headers(response, ['Authorization'])
+        return response
+
+    def get_object_queryset(self):
+        """
+        The single-row queryset get_object() would look the object up in
+        """
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        queryset = self.filter_queryset(self.get_queryset())
+        return queryset.filter(**{self.lookup_field: self.kwargs[lookup_url_kwarg]})
+
+    def list(self, request, *args, **kwargs):
+        build = super().list
+        queryset = self.filter_queryset(self.get_queryset())
+        return self.conditional_response(request, queryset, lambda: build(request, *args, **kwargs))
+
+    def retrieve(self, request, *args, **kwargs):
+        build = super().retrieve
+        try:
+            queryset = self.get_object_queryset()
+        except (TypeError, ValueError, ValidationError):
+            # Malformed lookup; let get_object() turn it into a 404
+            return build(request, *args, **kwargs)
+        return self.conditional_response(request, queryset, lambda: build(request, *args, **kwargs))
@@ -0,0 +1,42 @@
+"""
+articles/counters.py
+"""
+from django.db import transaction
+from django.db.models import Count, F, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from .models import Category, Article
+from .caching import response_cache
+
+def adjust_published_count(category_id, delta):
+    """
+    Shift one category's published_articles_count by `delta` in SQL,
+    so concurrent writers never overwrite each other
+    """
+    if category_id is None or not delta:
+        return
+    Category.objects.filter(pk=category_id).update(
+        published_articles_count=F('published_articles_count') + delta
+    )
+
+def rebuild_published_counts(category_ids=None):
+    """
+    Recompute published_articles_count from the articles table with a single
+    UPDATE ... SET = (correlated COUNT subquery).
+
+    Used after writes that bypass model signals (bulk_create, queryset.update,
+    imports) and by the rebuild_category_counts command. Returns the number
+    of categories updated.
+    """
+    published = (
+        Article.objects.filter(category=OuterRef('pk'), status='published')
+        .order_by()
+        .values('category')
+        .annotate(total=Count('pk'))
+        .values('total')
+    )
+    categories = Category.objects.all()
+    if category_ids is not None:
+        categories = categories.filter(pk__in=list(category_ids))
+    updated = categories.update(published_articles_count=Coalesce(Subquery(published), 0))
+    transaction.on_commit(response_cache.bump)
+    return updated
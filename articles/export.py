@@ -0,0 +1,32 @@
+"""
+articles/export.py
+"""
+
+# Column name -> values() path; same schema as
+# "Complete Article Information with All Relations.csv"
+EXPORT_COLUMNS = {
+    'article_id': 'id',
+    'title': 'title',
+    'slug': 'slug',
+    'description': 'description',
+    'content': 'content',
+    'status': 'status',
+    'views_count': 'views_count',
+    'featured_image': 'featured_image',
+    'author_id': 'author_id',
+    'author_username': 'author__username',
+    'author_email': 'author__email',
+    'author_role': 'author__role',
+    'category_id': 'category_id',
+    'category_name': 'category__name',
+    'category_slug': 'category__slug',
+    'created_at': 'created_at',
+    'updated_at': 'updated_at',
+}
+
+def export_rows(queryset, chunk_size=2000):
+    """
+    Yield one tuple per article (in EXPORT_COLUMNS order) from a server-side
+    cursor, `chunk_size` rows at a time; nothing else is held in memory
+    """
+    return queryset.values_list(*EXPORT_COLUMNS.values()).iterator(chunk_size=chunk_size)
@@ -0,0 +1,188 @@
+"""
+articles/fastpath.py
+"""
+from django.conf import settings
+from django.core.exceptions import FieldDoesNotExist
+from rest_framework import serializers
+from rest_framework.renderers import JSONRenderer
+from rest_framework.response import Response
+from mini_cms.middleware import serializer_timing
+from .renderers import FastJSONRenderer
+
+# Fields whose to_representation() returns database values unchanged
+PASSTHROUGH_FIELDS = (
+    serializers.CharField,
+    serializers.IntegerField,
+    serializers.FloatField,
+    serializers.BooleanField,
+    serializers.ChoiceField,
+    serializers.ReadOnlyField,
+    serializers.PrimaryKeyRelatedField,
+)
+
+class Unsupported(Exception):
+    pass
+
+class ValuesPlan:
+    """
+    Renders rows of a .values() queryset into exactly the dicts a (possibly
+    sparse) ModelSerializer would produce for the same objects, without
+    instantiating models or walking DRF's per-field machinery.
+
+    Built from a serializer instance; `paths` are the values() arguments.
+    Nested serializers become nested dicts rendered once per foreign key.
+    """
+
+    def __init__(self, serializer, queryset, request=None, extra_paths=()):
+        self.request = request
+        self.annotations = set(queryset.query.annotations)
+        self.paths = [queryset.model._meta.pk.name]
+        self.entries = self._plan(serializer, queryset.model, '')
+        self.paths.extend(extra_paths)
+        self.paths = list(dict.fromkeys(self.paths))
+
+    @classmethod
+    def for_serializer(cls, serializer, queryset, request=None, extra_paths=()):
+        """
+        The plan for `serializer`, or None if it renders something that does
+        not come straight from a column (method fields, source='*', ...)
+        """
+        if isinstance(serializer, serializers.ListSerializer):
+            serializer = serializer.child
+        try:
+            return cls(serializer, queryset, request, extra_paths)
+        except Unsupported:
+            return None
+
+    def _plan(self, serializer, model, prefix):
+        entries = []
+        for key, field in serializer.fields.items():
+            if field.write_only:
+                continue
+            if field.source == '*' or len(field.source_attrs) != 1:
+                raise Unsupported(key)
+
+            name = field.source_attrs[0]
+            path = prefix + name
+            try:
+                model_field = model._meta.get_field(name)
+            except FieldDoesNotExist:
+                if prefix or hasattr(model, name):
+                    raise Unsupported(key)
+                if name not in self.annotations:
+                    # Read-only attribute that is absent: DRF skips the key
+                    continue
+                model_field = None
+
+            if isinstance(field, serializers.BaseSerializer):
+                if model_field is None or not model_field.is_relation or not model_field.concrete:
+                    raise Unsupported(key)
+                fk_path = prefix + model_field.attname
+                self.paths.append(fk_path)
+                nested = self._plan(field, model_field.related_model, path + '__')
+                entries.append((key, fk_path, None, nested))
+                continue
+
+            if model_field is not None and model_field.is_relation:
+                if not isinstance(field, serializers.PrimaryKeyRelatedField):
+                    raise Unsupported(key)
+            elif isinstance(field, serializers.RelatedField):
+                raise Unsupported(key)
+
+            self.paths.append(path)
+            entries.append((key, path, self._converter(field, model_field), None))
+        return entries
+
+    def _converter(self, field, model_field):
+        if isinstance(field, serializers.FileField):
+            use_url = getattr(field, 'use_url', True)
+            storage = model_field.storage
+            request = self.request
+
+            def file_representation(name):
+                if not name:
+                    return None
+                if not use_url:
+                    return name
+                url = storage.url(name)
+                return request.build_absolute_uri(url) if request is not None else url
+            return file_representation
+        if isinstance(field, PASSTHROUGH_FIELDS):
+            return None
+        return field.to_representation
+
+    def render(self, rows):
+        memo = {}
+        return [self._render_row(row, self.entries, memo) for row in rows]
+
+    def _render_row(self, row, entries, memo):
+        item = {}
+        for key, path, convert, nested in entries:
+            value = row[path]
+            if nested is not None:
+                if value is None:
+                    item[key] = None
+                else:
+                    cache_key = (path, value)
+                    if cache_key not in memo:
+                        memo[cache_key] = self._render_row(row, nested, memo)
+                    item[key] = memo[cache_key]
+            elif value is None or convert is None:
+                item[key] = value
+            else:
+                item[key] = convert(value)
+        return item
+
+class FastListMixin:
+    """
+    Opt-in values()-based rendering for read-only list actions.
+
+    Viewsets list the actions in `fast_list_actions`; those pages are read
+    with .values() and turned into dicts by ValuesPlan instead of going
+    through ModelSerializer, with identical output, and JSON is encoded
+    with FastJSONRenderer. Anything the plan cannot express falls back to
+    the serializer. The fast path is off unless API_FAST_LIST_ENABLED is set.
+    """
+    fast_list_actions = ()
+
+    def use_fast_list(self):
+        return getattr(settings, 'API_FAST_LIST_ENABLED', False) and self.action in self.fast_list_actions
+
+    def get_renderers(self):
+        renderers = super().get_renderers()
+        if not self.use_fast_list():
+            return renderers
+        return [FastJSONRenderer() if type(renderer) is JSONRenderer else renderer for renderer in renderers]
+
+    def get_values_plan(self, queryset):
+        if not self.use_fast_list():
+            return None
+        # The paginator may order by any of these, so the rows must carry them
+        extra_paths = [field.lstrip('-') for field in getattr(self, 'ordering_fields', None) or []]
+        if 'search_rank' in queryset.query.annotations:
+            extra_paths.append('search_rank')
+        return ValuesPlan.for_serializer(self.get_serializer(), queryset, self.request, extra_paths)
+
+    def list_response(self, queryset):
+        """
+        Paginate and render `queryset` for a list-style action
+        """
+        plan = self.get_values_plan(queryset)
+        if plan is not None:
+            queryset = queryset.values(*plan.paths)
+
+        page = self.paginate_queryset(queryset)
+        rows = page if page is not None else queryset
+
+        if plan is not None:
+            with serializer_timing(self.request):
+                data = plan.render(rows)
+        else:
+            data = self.get_serializer(rows, many=True).data
+
+        if page is not None:
+            return self.get_paginated_response(data)
+        return Response(data)
+
+    def list(self, request, *args, **kwargs):
+        return self.list_response(self.filter_queryset(self.get_queryset()))
@@ -0,0 +1,266 @@
+"""
+articles/importer.py
+"""
+import csv
+import io
+import json
+import sys
+import time
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.db import connection, transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from django.utils.text import slugify
+from .models import Article, Category
+from .bulk import allocate_slugs, chunked, WRITE_BATCH_SIZE
+from .counters import rebuild_published_counts
+
+User = get_user_model()
+
+# Columns written by COPY / the multi-row INSERT, in order
+ARTICLE_COLUMNS = [
+    'title', 'slug', 'description', 'content', 'category_id', 'author_id',
+    'status', 'featured_image', 'views_count', 'created_at', 'updated_at',
+]
+STATUSES = {value for value, _ in Article.STATUS_CHOICES}
+
+def insert_articles(records, use_copy=None):
+    """
+    Write dicts with the ARTICLE_COLUMNS keys straight into the articles
+    table: COPY on PostgreSQL (or when `use_copy`), a multi-row INSERT
+    (executemany) otherwise. Both bypass the ORM, so timestamps are stored
+    as given rather than replaced by auto_now/auto_now_add. No signals are
+    sent.
+    """
+    if use_copy is None:
+        use_copy = connection.vendor == 'postgresql'
+    if not records:
+        return
+    table = connection.ops.quote_name(Article._meta.db_table)
+    columns = ', '.join(connection.ops.quote_name(column) for column in ARTICLE_COLUMNS)
+    if use_copy:
+        buffer = io.StringIO()
+        writer = csv.writer(buffer, quoting=csv.QUOTE_NONNUMERIC)
+        for record in records:
+            writer.writerow([
+                record[column].isoformat() if column in ('created_at', 'updated_at') else record[column]
+                for column in ARTICLE_COLUMNS
+            ])
+        buffer.seek(0)
+        with connection.cursor() as cursor:
+            cursor.copy_expert(f'COPY {table} ({columns}) FROM STDIN WITH (FORMAT csv)', buffer)
+    else:
+        fields = [Article._meta.get_field(column) for column in ARTICLE_COLUMNS]
+        sql = f'INSERT INTO {table} ({columns}) VALUES ({", ".join(["%s"] * len(fields))})'
+        with connection.cursor() as cursor:
+            for start in range(0, len(records), WRITE_BATCH_SIZE):
+                cursor.executemany(sql, [
+                    [field.get_db_prep_save(record[field.attname], connection) for field in fields]
+                    for record in records[start:start + WRITE_BATCH_SIZE]
+                ])
+
+def read_rows(path, fmt=None):
+    """
+    Yield one dict per record of a CSV (with header) or JSON Lines file,
+    streaming; '-' reads stdin. The format follows the file extension
+    unless `fmt` is given.
+    """
+    if fmt is None:
+        fmt = 'jsonl' if path.endswith(('.jsonl', '.ndjson')) else 'csv'
+    stream = sys.stdin if path == '-' else open(path, newline='', encoding='utf-8')
+    try:
+        if fmt == 'csv':
+            yield from csv.DictReader(stream)
+        else:
+            for line in stream:
+                if line.strip():
+                    yield json.loads(line)
+    finally:
+        if stream is not sys.stdin:
+            stream.close()
+
+class ArticleImporter:
+    """
+    Loads article records shaped like the /api/articles/export/ schema
+    (article_id, title, slug, ..., author_username, category_slug, ...)
+    in batches.
+
+    Authors and categories are resolved through in-memory maps (username
+    -> id, category slug -> id, category name -> id) loaded once up front;
+    unknown ones are created in bulk per batch. Articles whose slug
+    already exists are skipped, so re-running an import is safe. Each batch
+    is written in its own transaction with COPY on PostgreSQL and a
+    multi-row INSERT elsewhere. Category counters are rebuilt once at the
+    end.
+    """
+    def __init__(self, batch_size=5000, use_copy=None, create_missing=True):
+        self.batch_size = batch_size
+        self.use_copy = connection.vendor == 'postgresql' if use_copy is None else use_copy
+        self.create_missing = create_missing
+        self.authors = dict(User.objects.values_list('username', 'pk'))
+        self.category_slugs = {}
+        self.category_names = {}
+        for pk, slug, name in Category.objects.values_list('pk', 'slug', 'name'):
+            self.category_slugs[slug] = pk
+            self.category_names[name] = pk
+        self.stats = {'read': 0, 'imported': 0, 'existing': 0, 'invalid': 0, 'seconds': 0.0}
+
+    def run(self, rows, progress=None):
+        """
+        Import every record of `rows`; returns the stats dict
+        """
+        started = time.perf_counter()
+        batch = []
+        for row in rows:
+            self.stats['read'] += 1
+            batch.append(row)
+            if len(batch) >= self.batch_size:
+                self.load_batch(batch)
+                batch = []
+                if progress:
+                    progress(self.stats, time.perf_counter() - started)
+        if batch:
+            self.load_batch(batch)
+
+        rebuild_published_counts()
+        self.stats['seconds'] = time.perf_counter() - started
+        return self.stats
+
+    def load_batch(self, rows):
+        records = [record for record in map(self.clean, rows) if record is not None]
+        self.stats['invalid'] += len(rows) - len(records)
+
+        with transaction.atomic():
+            self.resolve_authors(records)
+            self.resolve_categories(records)
+            records = self.assign_slugs(records)
+            insert_articles(records, self.use_copy)
+        self.stats['imported'] += len(records)
+
+    def clean(self, row):
+        """
+        Normalize one input record, or None if it cannot be imported
+        """
+        title = (row.get('title') or '').strip()
+        username = (row.get('author_username') or '').strip()
+        category_slug = (row.get('category_slug') or '').strip()
+        category_name = (row.get('category_name') or '').strip()
+        if not title or not username or not (category_slug or category_name):
+            return None
+
+        now = timezone.now()
+        created_at = self.parse_datetime(row.get('created_at')) or now
+        status = row.get('status')
+        try:
+            views_count = max(int(row.get('views_count') or 0), 0)
+        except (TypeError, ValueError):
+            return None
+        return {
+            'title': title[:255],
+            'slug': (row.get('slug') or '').strip()[:255],
+            'description': row.get('description') or '',
+            'content': row.get('content') or '',
+            'status': status if status in STATUSES else 'draft',
+            'featured_image': row.get('featured_image') or '',
+            'views_count': views_count,
+            'created_at': created_at,
+            'updated_at': self.parse_datetime(row.get('updated_at')) or created_at,
+            'author_username': username,
+            'author_email': row.get('author_email') or '',
+            'author_role': row.get('author_role') if row.get('author_role') in ('admin', 'author') else 'author',
+            'category_slug': category_slug[:100],
+            'category_name': category_name[:100],
+        }
+
+    @staticmethod
+    def parse_datetime(value):
+        if not value:
+            return None
+        try:
+            parsed = parse_datetime(value)
+        except ValueError:
+            return None
+        if parsed is not None and timezone.is_naive(parsed):
+            parsed = timezone.make_aware(parsed)
+        return parsed
+
+    def resolve_authors(self, records):
+        missing = {}
+        for record in records:
+            if record['author_username'] not in self.authors:
+                missing.setdefault(record['author_username'], record)
+        if missing and self.create_missing:
+            password = make_password(None)
+            User.objects.bulk_create([
+                User(username=username, email=record['author_email'], role=record['author_role'], password=password)
+                for username, record in missing.items()
+            ])
+            self.authors.update(User.objects.filter(username__in=list(missing)).values_list('username', 'pk'))
+
+        for record in records:
+            record['author_id'] = self.authors.get(record['author_username'])
+
+    def find_category(self, record):
+        """
+        Id of the category of a record: by its slug when it has one,
+        otherwise by its name (or the slug of its name)
+        """
+        if record['category_slug']:
+            return self.category_slugs.get(record['category_slug'])
+        pk = self.category_names.get(record['category_name'])
+        if pk is None:
+            pk = self.category_slugs.get(slugify(record['category_name'])[:100])
+        return pk
+
+    def resolve_categories(self, records):
+        missing = {}
+        for record in records:
+            if self.find_category(record) is None:
+                slug = record['category_slug'] or slugify(record['category_name'])[:100]
+                missing.setdefault(slug, record)
+        if missing and self.create_missing:
+            # Names are unique too: a record whose name was just created
+            # under another slug is left unresolved
+            names = set(self.category_names)
+            created = []
+            for slug, record in missing.items():
+                name = record['category_name'] or slug
+                if name not in names:
+                    names.add(name)
+                    created.append(Category(name=name, slug=slug))
+            Category.objects.bulk_create(created)
+            for pk, slug, name in Category.objects.filter(slug__in=list(missing)).values_list('pk', 'slug', 'name'):
+                self.category_slugs[slug] = pk
+                self.category_names[name] = pk
+
+        for record in records:
+            record['category_id'] = self.find_category(record)
+
+    def assign_slugs(self, records):
+        """
+        Drop records whose author/category could not be resolved or whose
+        slug is already taken, and allocate slugs for records without one
+        """
+        resolved = [r for r in records if r['author_id'] and r['category_id']]
+        self.stats['invalid'] += len(records) - len(resolved)
+
+        existing = set()
+        given = [r['slug'] for r in resolved if r['slug']]
+        for chunk in chunked(set(given)):
+            existing.update(Article.objects.filter(slug__in=chunk).values_list('slug', flat=True))
+
+        kept = []
+        for record in resolved:
+            if record['slug'] in existing:
+                self.stats['existing'] += 1
+                continue
+            if record['slug']:
+                existing.add(record['slug'])
+            kept.append(record)
+
+        unslugged = [r for r in kept if not r['slug']]
+        for record, slug in zip(unslugged, allocate_slugs(r['title'] for r in unslugged)):
+            record['slug'] = slug
+        return kept
@@ -0,0 +1,70 @@
+"""
+articles/loaders.py
+"""
+from django.core.exceptions import FieldDoesNotExist
+from django.db import models
+from rest_framework import serializers
+from .projection import serializer_columns
+
+def load_related(serializer, instances):
+    """
+    Resolve every nested to-one relation `serializer` renders for all of
+    `instances` at once: collect the foreign keys, fetch each related model
+    with one pk__in query (projected onto the nested serializer's fields)
+    and attach the shared objects to the instances.
+
+    Relations that are already cached (select_related, earlier loads) are
+    left alone.
+    """
+    if not instances:
+        return
+
+    model = type(instances[0])
+    for field in serializer.fields.values():
+        if not isinstance(field, serializers.BaseSerializer) or len(field.source_attrs) != 1:
+            continue
+        try:
+            relation = model._meta.get_field(field.source_attrs[0])
+        except FieldDoesNotExist:
+            continue
+        if not (relation.many_to_one or relation.one_to_one) or not relation.concrete:
+            continue
+
+        pending = [instance for instance in instances if not relation.is_cached(instance)]
+        ids = {getattr(instance, relation.attname) for instance in pending} - {None}
+        if not ids:
+            continue
+
+        related_model = relation.related_model
+        queryset = related_model._default_manager.filter(pk__in=ids)
+        columns = serializer_columns(field, related_model)
+        if columns is not None:
+            queryset = queryset.only(*columns)
+        related = {obj.pk: obj for obj in queryset}
+
+        for instance in pending:
+            relation.set_cached_value(instance, related.get(getattr(instance, relation.attname)))
+
+class BatchLoadingListSerializer(serializers.ListSerializer):
+    """
+    ListSerializer that batch-loads the child's nested relations for the
+    whole page (one query per relation instead of a join per row).
+    """
+    def to_representation(self, data):
+        items = list(data.all() if isinstance(data, models.manager.BaseManager) else data)
+        load_related(self.child, items)
+        return super().to_representation(items)
+
+class MemoizedRepresentationMixin:
+    """
+    For nested serializers: render each distinct related object once.
+
+    Nested serializer fields are copied per parent serializer, so the memo
+    lives exactly as long as the response being built. A 100-article page
+    by five authors serializes five authors, not a hundred.
+    """
+    def to_representation(self, instance):
+        memo = self.__dict__.setdefault('_representations', {})
+        if instance.pk not in memo:
+            memo[instance.pk] = super().to_representation(instance)
+        return memo[instance.pk]
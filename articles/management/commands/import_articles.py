@@ -0,0 +1,54 @@
+"""
+articles/management/commands/import_articles.py
+"""
+from django.core.management.base import BaseCommand, CommandError
+from articles.importer import ArticleImporter, read_rows
+
+class Command(BaseCommand):
+    help = (
+        'Import articles from CSV or JSON Lines files in the export schema '
+        '(see /api/articles/export/), creating missing authors and categories'
+    )
+    
+    def add_arguments(self, parser):
+        parser.add_argument('paths', nargs='+', help="CSV/JSONL files ('-' for stdin)")
+        parser.add_argument('--format', choices=['csv', 'jsonl'], help='Input format (default: from the file extension)')
+        parser.add_argument('--batch-size', type=int, default=5000, help='Records per transaction (default: 5000)')
+        parser.add_argument(
+            '--no-copy', action='store_true',
+            help='Use multi-row INSERTs even on PostgreSQL instead of COPY'
+        )
+        parser.add_argument(
+            '--no-create', action='store_true',
+            help='Skip records whose author or category does not exist instead of creating them'
+        )
+    
+    def handle(self, *args, **options):
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size must be positive')
+        
+        importer = ArticleImporter(
+            batch_size=options['batch_size'],
+            use_copy=False if options['no_copy'] else None,
+            create_missing=not options['no_create'],
+        )
+        method = 'COPY' if importer.use_copy else 'INSERT'
+        self.stdout.write(f'Importing with {method}, {options["batch_size"]} records per batch...')
+        
+        def progress(stats, elapsed):
+            if options['verbosity'] > 1:
+                self.stdout.write(f'  {stats["read"]} read, {stats["imported"]} imported ({stats["read"] / elapsed:,.0f} rows/s)')
+        
+        def rows():
+            for path in options['paths']:
+                try:
+                    yield from read_rows(path, options['format'])
+                except FileNotFoundError:
+                    raise CommandError(f'No such file: {path}')
+        
+        stats = importer.run(rows(), progress=progress)
+        rate = stats['read'] / stats['seconds'] if stats['seconds'] else 0
+        self.stdout.write(self.style.SUCCESS(
+            f'✓ Imported {stats["imported"]} of {stats["read"]} records in {stats["seconds"]:.1f}s '
+            f'({rate:,.0f} rows/s); {stats["existing"]} already present, {stats["invalid"]} invalid'
+        ))
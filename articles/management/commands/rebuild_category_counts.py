@@ -0,0 +1,19 @@
+"""
+articles/management/commands/rebuild_category_counts.py
+"""
+from django.core.management.base import BaseCommand
+from articles.counters import rebuild_published_counts
+
+class Command(BaseCommand):
+    help = 'Recompute Category.published_articles_count from the articles table'
+    
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'category_ids', nargs='*', type=int,
+            help='Only rebuild these categories (default: all)'
+        )
+    
+    def handle(self, *args, **options):
+        category_ids = options['category_ids'] or None
+        updated = rebuild_published_counts(category_ids)
+        self.stdout.write(self.style.SUCCESS(f'✓ Rebuilt published article counts for {updated} categories'))
@@ -0,0 +1,34 @@
+# Generated by Django 4.2.7 on 2026-10-18 00:49
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def backfill_published_articles_count(apps, schema_editor):
+    Category = apps.get_model('articles', 'Category')
+    Article = apps.get_model('articles', 'Article')
+    published = (
+        Article.objects.filter(category=OuterRef('pk'), status='published')
+        .order_by()
+        .values('category')
+        .annotate(total=Count('pk'))
+        .values('total')
+    )
+    Category.objects.update(published_articles_count=Coalesce(Subquery(published), 0))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('articles', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='category',
+            name='published_articles_count',
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(backfill_published_articles_count, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,83 @@
+# Full-text search support for articles.
+#
+# PostgreSQL: a generated, weighted tsvector column (title A, description B,
+# content C) with a GIN index. SQLite: an external-content FTS5 table kept in
+# sync by triggers, so search can be benchmarked locally. Neither is a model
+# field; articles.search.ArticleSearchFilter queries them directly.
+
+from django.db import migrations
+
+
+POSTGRES_FORWARD = [
+    """
+    ALTER TABLE articles ADD COLUMN search_vector tsvector GENERATED ALWAYS AS (
+        setweight(to_tsvector('english'::regconfig, coalesce(title, '')), 'A') ||
+        setweight(to_tsvector('english'::regconfig, coalesce(description, '')), 'B') ||
+        setweight(to_tsvector('english'::regconfig, coalesce(content, '')), 'C')
+    ) STORED
+    """,
+    "CREATE INDEX articles_search_vector_gin ON articles USING gin (search_vector)",
+]
+
+POSTGRES_BACKWARD = [
+    "DROP INDEX IF EXISTS articles_search_vector_gin",
+    "ALTER TABLE articles DROP COLUMN IF EXISTS search_vector",
+]
+
+SQLITE_FORWARD = [
+    """
+    CREATE VIRTUAL TABLE articles_fts USING fts5(
+        title, description, content,
+        content='articles', content_rowid='id', tokenize='porter unicode61'
+    )
+    """,
+    """
+    CREATE TRIGGER articles_fts_insert AFTER INSERT ON articles BEGIN
+        INSERT INTO articles_fts(rowid, title, description, content)
+        VALUES (new.id, new.title, new.description, new.content);
+    END
+    """,
+    """
+    CREATE TRIGGER articles_fts_delete AFTER DELETE ON articles BEGIN
+        INSERT INTO articles_fts(articles_fts, rowid, title, description, content)
+        VALUES ('delete', old.id, old.title, old.description, old.content);
+    END
+    """,
+    """
+    CREATE TRIGGER articles_fts_update AFTER UPDATE OF title, description, content ON articles BEGIN
+        INSERT INTO articles_fts(articles_fts, rowid, title, description, content)
+        VALUES ('delete', old.id, old.title, old.description, old.content);
+        INSERT INTO articles_fts(rowid, title, description, content)
+        VALUES (new.id, new.title, new.description, new.content);
+    END
+    """,
+    "INSERT INTO articles_fts(articles_fts) VALUES ('rebuild')",
+]
+
+SQLITE_BACKWARD = [
+    "DROP TRIGGER IF EXISTS articles_fts_update",
+    "DROP TRIGGER IF EXISTS articles_fts_delete",
+    "DROP TRIGGER IF EXISTS articles_fts_insert",
+    "DROP TABLE IF EXISTS articles_fts",
+]
+
+
+def _run(statements_by_vendor):
+    def run(apps, schema_editor):
+        for statement in statements_by_vendor.get(schema_editor.connection.vendor, []):
+            schema_editor.execute(statement)
+    return run
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('articles', '0002_category_published_articles_count'),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            _run({'postgresql': POSTGRES_FORWARD, 'sqlite': SQLITE_FORWARD}),
+            _run({'postgresql': POSTGRES_BACKWARD, 'sqlite': SQLITE_BACKWARD}),
+        ),
+    ]
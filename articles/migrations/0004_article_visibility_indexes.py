@@ -0,0 +1,29 @@
+# Generated by Django 4.2.7 on 2026-10-18 00:56
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('articles', '0003_article_search_vector'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='article',
+            name='articles_status_a4f178_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='article',
+            name='articles_author__a0ff4a_idx',
+        ),
+        migrations.AddIndex(
+            model_name='article',
+            index=models.Index(fields=['status', '-created_at'], name='articles_status_1bfa8f_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='article',
+            index=models.Index(fields=['author', '-created_at'], name='articles_author__f81e79_idx'),
+        ),
+    ]
@@ -1,13 +1,15 @@
 """
 articles/models.py
 """
-from django.db import models
+from django.db import models, transaction
 from django.conf import settings
 
 class Category(models.Model):
     name = models.CharField(max_length=100, unique=True)
     slug = models.SlugField(max_length=100, unique=True)
     description = models.TextField(blank=True)
+    # Denormalized; maintained by articles.signals, rebuilt by rebuild_category_counts
+    published_articles_count = models.IntegerField(default=0, editable=False)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
@@ -40,12 +42,24 @@ class Article(models.Model):
     class Meta:
         db_table = 'articles'
         ordering = ['-created_at']
+        # Composite indexes serve the visibility filters (status / author)
+        # and the default -created_at ordering from a single index scan
         indexes = [
             models.Index(fields=['-created_at']),
-            models.Index(fields=['status']),
-            models.Index(fields=['author']),
+            models.Index(fields=['status', '-created_at']),
+            models.Index(fields=['author', '-created_at']),
         ]
     
     def __str__(self):
         return self.title
+    
+    def save(self, *args, **kwargs):
+        # One transaction for the row and its category counter (see
+        # articles.signals), which reads the previous row under a lock
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+    
+    def delete(self, *args, **kwargs):
+        with transaction.atomic():
+            return super().delete(*args, **kwargs)
 
@@ -1,9 +1,148 @@
 """
 articles/pagination.py
 """
-from rest_framework.pagination import PageNumberPagination
+import json
+
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import Cursor, CursorPagination, PageNumberPagination, _reverse_ordering
 
 class ArticlePagination(PageNumberPagination):
     page_size = 10
     page_size_query_param = 'page_size'
-    max_page_size = 100
\ No newline at end of file
+    max_page_size = 100
+
+class ArticleCursorPagination(CursorPagination):
+    """
+    Keyset pagination keyed on (ordering field, id).
+
+    Unlike ArticlePagination there is no COUNT(*) and no OFFSET: every page is
+    a range scan starting right after the last row of the previous page, so
+    deep pages cost the same as the first one. The ordering field comes from
+    OrderingFilter (default '-created_at'), with 'id' as the tie-breaker;
+    annotated fields like search_rank are not used as keys.
+    """
+    page_size = 10
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    ordering = ('-created_at', '-id')
+    mode_query_param = 'pagination'
+    tiebreaker = 'id'
+
+    @classmethod
+    def is_requested(cls, request):
+        """
+        Cursor mode is opt-in via ?pagination=cursor; links we hand out
+        carry the cursor param so follow-up pages stay in this mode.
+        """
+        if request is None:
+            return False
+        params = request.query_params
+        return params.get(cls.mode_query_param) == 'cursor' or cls.cursor_query_param in params
+
+    def get_ordering(self, request, queryset, view):
+        """
+        Key on the first requested ordering field plus the primary key,
+        sorted in the same direction.
+
+        Annotations such as search_rank are skipped: a float computed per
+        query does not round-trip exactly through the cursor, so pages would
+        skip or repeat rows. A search paged by cursor is therefore ordered
+        by the next field, or by the default '-created_at'.
+        """
+        fields = [
+            field for field in super().get_ordering(request, queryset, view)
+            if field.lstrip('-') not in queryset.query.annotations
+        ]
+        field = (fields or self.ordering)[0]
+        if field.lstrip('-') == self.tiebreaker:
+            return (field,)
+        prefix = '-' if field.startswith('-') else ''
+        return (field, prefix + self.tiebreaker)
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+
+        self.base_url = request.build_absolute_uri()
+        self.ordering = self.get_ordering(request, queryset, view)
+        self.cursor = self.decode_cursor(request)
+
+        reverse = bool(self.cursor and self.cursor.reverse)
+        position = self._decode_position(self.cursor.position) if self.cursor else None
+        ordering = _reverse_ordering(self.ordering) if reverse else self.ordering
+
+        queryset = queryset.order_by(*ordering)
+        if position is not None:
+            queryset = queryset.filter(self._seek_filter(ordering, position))
+
+        # Fetch one extra row to know whether another page follows
+        results = list(queryset[:self.page_size + 1])
+        has_more = len(results) > self.page_size
+        self.page = results[:self.page_size]
+
+        if reverse:
+            self.page.reverse()
+            self.has_next = position is not None
+            self.has_previous = has_more
+        else:
+            self.has_next = has_more
+            self.has_previous = position is not None
+
+        return self.page
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        position = self._get_position_from_instance(self.page[-1], self.ordering)
+        return self.encode_cursor(Cursor(offset=0, reverse=False, position=position))
+
+    def get_previous_link(self):
+        if not self.has_previous or not self.page:
+            return None
+        position = self._get_position_from_instance(self.page[0], self.ordering)
+        return self.encode_cursor(Cursor(offset=0, reverse=True, position=position))
+
+    def _get_position_from_instance(self, instance, ordering):
+        values = []
+        for field in ordering:
+            field_name = field.lstrip('-')
+            if isinstance(instance, dict):
+                value = instance[field_name]
+            else:
+                value = getattr(instance, field_name)
+            values.append(value if isinstance(value, int) else str(value))
+        return json.dumps(values)
+
+    def _decode_position(self, position):
+        if position is None:
+            return None
+        try:
+            values = json.loads(position)
+        except ValueError:
+            raise NotFound(self.invalid_cursor_message)
+        if not isinstance(values, list) or len(values) != len(self.ordering):
+            raise NotFound(self.invalid_cursor_message)
+        return values
+
+    def _seek_filter(self, ordering, position):
+        """
+        Rows strictly after `position` in `ordering`, i.e.
+        (field, id) < (value, pk) for descending keys.
+
+        The redundant bound on the leading field lets the database answer
+        with a plain range scan on its index.
+        """
+        names = [field.lstrip('-') for field in ordering]
+        lookup = 'lt' if ordering[0].startswith('-') else 'gt'
+
+        if len(names) == 1:
+            return Q(**{f'{names[0]}__{lookup}': position[0]})
+
+        (field, tiebreaker), (value, pk) = names, position
+        return Q(**{f'{field}__{lookup}e': value}) & (
+            Q(**{f'{field}__{lookup}': value}) |
+            Q(**{field: value, f'{tiebreaker}__{lookup}': pk})
+        )
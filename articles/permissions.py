@@ -31,4 +31,11 @@ class IsAuthorOrAdmin(permissions.BasePermission):
         if request.method in permissions.SAFE_METHODS:
             return True
         # Write operations: must be article author or admin
-        return obj.author == request.user or request.user.is_admin
\ No newline at end of file
+        return obj.author == request.user or request.user.is_admin
+
+class IsAdmin(permissions.BasePermission):
+    """
+    Custom permission to only allow admins, for any method.
+    """
+    def has_permission(self, request, view):
+        return bool(request.user and request.user.is_authenticated and request.user.is_admin)
@@ -0,0 +1,86 @@
+"""
+articles/projection.py
+"""
+from django.core.exceptions import FieldDoesNotExist
+from rest_framework import serializers
+
+def serializer_columns(serializer, model, prefix=''):
+    """
+    The model field paths `serializer` reads, e.g.
+    ['id', 'title', 'author', 'author__id', 'author__username', ...].
+
+    Nested serializers are followed through their relation. Attributes that
+    are not model fields but also not defined on the model class are assumed
+    to be queryset annotations and skipped. Returns None when the serializer
+    reads something that cannot be mapped to columns (source='*', model
+    properties and methods, reverse relations), in which case the caller
+    must not project.
+    """
+    if isinstance(serializer, serializers.ListSerializer):
+        serializer = serializer.child
+
+    columns = [prefix + model._meta.pk.name]
+    for field in serializer.fields.values():
+        if field.write_only:
+            continue
+        if field.source == '*' or len(field.source_attrs) != 1:
+            return None
+
+        name = field.source_attrs[0]
+        try:
+            model_field = model._meta.get_field(name)
+        except FieldDoesNotExist:
+            if hasattr(model, name):
+                return None
+            continue
+
+        if not model_field.concrete:
+            return None
+
+        if isinstance(field, serializers.BaseSerializer):
+            if not model_field.is_relation:
+                return None
+            nested = serializer_columns(field, model_field.related_model, prefix=f'{prefix}{name}__')
+            if nested is None:
+                return None
+            columns.append(prefix + name)
+            columns.extend(nested)
+        else:
+            columns.append(prefix + name)
+
+    return list(dict.fromkeys(columns))
+
+class SerializerProjectionMixin:
+    """
+    Load only the columns the active serializer renders.
+
+    ArticleListSerializer, for instance, never shows `content`, and the
+    nested UserSerializer/CategorySerializer only need a few columns of
+    `users` and `categories`; everything else is deferred.
+    """
+    projected_actions = ('list', 'retrieve')
+
+    def project_queryset(self, queryset):
+        if self.request is None or self.request.method not in ('GET', 'HEAD'):
+            return queryset
+        if self.action not in self.projected_actions:
+            return queryset
+
+        columns = serializer_columns(self.get_serializer(), queryset.model)
+        if columns is None:
+            return queryset
+
+        # Stop joining relations the (possibly sparse) serializer dropped
+        related = queryset.query.select_related
+        related = related if isinstance(related, dict) else {}
+        if any(name not in columns for name in related):
+            kept = [name for name in related if name in columns]
+            queryset = queryset.select_related(None)
+            if kept:
+                queryset = queryset.select_related(*kept)
+            related = {name: related[name] for name in kept}
+
+        # Columns of relations that are not joined are loaded separately
+        # (see articles.loaders), only their foreign keys are needed here
+        columns = [c for c in columns if '__' not in c or c.split('__', 1)[0] in related]
+        return queryset.only(*columns)
@@ -0,0 +1,107 @@
+"""
+articles/renderers.py
+"""
+import csv
+import io
+import json
+from abc import ABC, abstractmethod
+
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
+class FastJSONRenderer(JSONRenderer):
+    """
+    JSONRenderer that encodes with orjson when it is installed.
+
+    Output is compact UTF-8 like the stock renderer's default. Types orjson
+    does not know natively (Decimal, lazy translation strings, ...) and
+    dates/times, which DRF formats its own way ('Z' suffix, milliseconds),
+    go through DRF's JSONEncoder. Only the spelling of some floats differs
+    (1e-6 for 1e-06). Indented output (?indent= in the Accept
+    header) and installs without orjson use the stock implementation.
+    """
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if orjson is None or data is None:
+            return super().render(data, accepted_media_type, renderer_context)
+        if self.get_indent(accepted_media_type, renderer_context or {}):
+            return super().render(data, accepted_media_type, renderer_context)
+
+        ret = orjson.dumps(
+            data,
+            default=self.encoder_class().default,
+            option=orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME,
+        )
+        # Same escaping as JSONRenderer for embedding in <script> tags
+        return ret.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
+
+class StreamingRenderer(BaseRenderer, ABC):
+    """
+    Base for export formats: stream(columns, rows) encodes an iterable of
+    row tuples lazily, `batch_size` rows per chunk, for StreamingHttpResponse.
+    render() handles ordinary (e.g. error) payloads.
+    """
+    charset = 'utf-8'
+    batch_size = 500
+
+    def stream(self, columns, rows):
+        batch = []
+        for row in rows:
+            batch.append(row)
+            if len(batch) >= self.batch_size:
+                yield self.encode(columns, batch)
+                batch = []
+        if batch:
+            yield self.encode(columns, batch)
+
+    @abstractmethod
+    def encode(self, columns, rows):
+        """Encode one batch of rows as bytes; subclasses implement the format"""
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        items = data if isinstance(data, list) else [data]
+        if not items or not isinstance(items[0], dict):
+            items = [{'detail': item} for item in items]
+        columns = list(items[0])
+        return b''.join(self.stream(columns, ([item.get(column) for column in columns] for item in items)))
+
+class NDJSONRenderer(StreamingRenderer):
+    """
+    Newline-delimited JSON, one object per row
+    """
+    media_type = 'application/x-ndjson'
+    format = 'ndjson'
+
+    def encode(self, columns, rows):
+        if orjson is not None:
+            default = JSONEncoder().default
+            return b''.join(
+                orjson.dumps(dict(zip(columns, row)), default=default, option=orjson.OPT_APPEND_NEWLINE)
+                for row in rows
+            )
+        return ''.join(
+            json.dumps(dict(zip(columns, row)), cls=JSONEncoder, ensure_ascii=False, separators=(',', ':')) + '\n'
+            for row in rows
+        ).encode(self.charset)
+
+class CSVRenderer(StreamingRenderer):
+    """
+    CSV with a header row before the first chunk
+    """
+    media_type = 'text/csv'
+    format = 'csv'
+
+    def stream(self, columns, rows):
+        yield self.encode(columns, [columns])
+        yield from super().stream(columns, rows)
+
+    def encode(self, columns, rows):
+        buffer = io.StringIO()
+        csv.writer(buffer, quoting=csv.QUOTE_NONNUMERIC).writerows(rows)
+        return buffer.getvalue().encode(self.charset)
@@ -0,0 +1,91 @@
+"""
+articles/search.py
+"""
+from django.contrib.postgres.search import SearchHeadline, SearchQuery, SearchRank, SearchVectorField
+from django.db import connections
+from django.db.models import CharField, F, FloatField
+from django.db.models.expressions import RawSQL
+from rest_framework import filters
+
+class ArticleSearchFilter(filters.SearchFilter):
+    """
+    Ranked full-text search for ?search=.
+
+    - PostgreSQL: matches the generated `search_vector` tsvector column
+      (GIN indexed, weighted title > description > content) with
+      websearch_to_tsquery, ranks with ts_rank and highlights with ts_headline.
+    - SQLite: matches the `articles_fts` FTS5 table, ranks with weighted bm25
+      and highlights with snippet().
+    - Anything else: falls back to DRF's ILIKE SearchFilter over search_fields.
+
+    Matching rows are annotated with `search_rank` (higher is better) and
+    `search_headline` (a content snippet with <mark> around hits).
+    """
+    search_config = 'english'
+    highlight_start = '<mark>'
+    highlight_stop = '</mark>'
+    # bm25 column weights for title, description, content
+    fts5_weights = (10.0, 4.0, 1.0)
+    fts5_table = 'articles_fts'
+
+    def filter_queryset(self, request, queryset, view):
+        search_terms = self.get_search_terms(request)
+        if not search_terms:
+            return queryset
+
+        vendor = connections[queryset.db].vendor
+        if vendor == 'postgresql':
+            return self.filter_postgresql(queryset, search_terms)
+        if vendor == 'sqlite':
+            return self.filter_sqlite(queryset, search_terms)
+        return super().filter_queryset(request, queryset, view)
+
+    def filter_postgresql(self, queryset, search_terms):
+        query = SearchQuery(' '.join(search_terms), config=self.search_config, search_type='websearch')
+        vector = RawSQL(f'"{queryset.model._meta.db_table}"."search_vector"', [], output_field=SearchVectorField())
+        return queryset.alias(search_document=vector).filter(search_document=query).annotate(
+            search_rank=SearchRank(F('search_document'), query),
+            search_headline=SearchHeadline(
+                'content', query,
+                config=self.search_config,
+                start_sel=self.highlight_start,
+                stop_sel=self.highlight_stop,
+                max_words=35,
+                min_words=15,
+            ),
+        )
+
+    def filter_sqlite(self, queryset, search_terms):
+        # Quote every term so FTS5 operators in user input are taken literally
+        match = ' '.join('"{}"'.format(term.replace('"', '""')) for term in search_terms)
+        table = queryset.model._meta.db_table
+        correlated = f'FROM {self.fts5_table} WHERE {self.fts5_table} MATCH %s AND rowid = "{table}"."id"'
+        weights = ', '.join(str(weight) for weight in self.fts5_weights)
+
+        return queryset.filter(
+            pk__in=RawSQL(f'SELECT rowid FROM {self.fts5_table} WHERE {self.fts5_table} MATCH %s', [match])
+        ).annotate(
+            # bm25() is lower-is-better, flip it to match ts_rank
+            search_rank=RawSQL(
+                f'SELECT -bm25({self.fts5_table}, {weights}) {correlated}', [match],
+                output_field=FloatField(),
+            ),
+            search_headline=RawSQL(
+                f"SELECT snippet({self.fts5_table}, 2, %s, %s, '…', 32) {correlated}",
+                [self.highlight_start, self.highlight_stop, match],
+                output_field=CharField(),
+            ),
+        )
+
+class ArticleOrderingFilter(filters.OrderingFilter):
+    """
+    OrderingFilter that puts the best search matches first when the client
+    searched but did not ask for an explicit ordering.
+    """
+    def get_ordering(self, request, queryset, view):
+        ordering = super().get_ordering(request, queryset, view)
+        if request.query_params.get(self.ordering_param):
+            return ordering
+        if 'search_rank' in queryset.query.annotations:
+            return ['-search_rank', *(ordering or [])]
+        return ordering
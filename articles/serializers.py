@@ -6,18 +6,72 @@ from rest_framework import serializers
 from django.utils.text import slugify
 from .models import Category, Article
 from accounts.serializers import UserSerializer
+from .loaders import BatchLoadingListSerializer, MemoizedRepresentationMixin
 
-class CategorySerializer(serializers.ModelSerializer):
-    articles_count = serializers.SerializerMethodField()
+def parse_field_paths(value):
+    """
+    'id,title,author.username' -> {'id': {}, 'title': {}, 'author': {'username': {}}}
+    """
+    tree = {}
+    for path in value.split(','):
+        node = tree
+        for name in filter(None, path.strip().split('.')):
+            node = node.setdefault(name, {})
+    return tree
+
+class DynamicFieldsMixin:
+    """
+    Sparse fieldsets for read requests: ?fields=id,title,author.username
+    keeps only the listed fields and ?exclude=description,category drops
+    them. Dotted names reach into nested serializers, and nested serializers
+    that are not asked for are removed entirely, so SerializerProjectionMixin
+    stops loading their columns too.
+    
+    Only the serializer built for the request reads the query params;
+    nested serializers are pruned by their parent.
+    """
+    fields_query_param = 'fields'
+    exclude_query_param = 'exclude'
+    
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        request = self.context.get('request')
+        if request is None or request.method not in ('GET', 'HEAD'):
+            return
+        
+        params = getattr(request, 'query_params', request.GET)
+        if params.get(self.fields_query_param):
+            self._keep_fields(self, parse_field_paths(params[self.fields_query_param]))
+        if params.get(self.exclude_query_param):
+            self._drop_fields(self, parse_field_paths(params[self.exclude_query_param]))
+    
+    @classmethod
+    def _keep_fields(cls, serializer, tree):
+        for name in list(serializer.fields):
+            if name not in tree:
+                serializer.fields.pop(name)
+            elif tree[name] and isinstance(serializer.fields[name], serializers.Serializer):
+                cls._keep_fields(serializer.fields[name], tree[name])
+    
+    @classmethod
+    def _drop_fields(cls, serializer, tree):
+        for name, subtree in tree.items():
+            if name not in serializer.fields:
+                continue
+            if not subtree:
+                serializer.fields.pop(name)
+            elif isinstance(serializer.fields[name], serializers.Serializer):
+                cls._drop_fields(serializer.fields[name], subtree)
+
+class CategorySerializer(DynamicFieldsMixin, serializers.ModelSerializer):
+    # Denormalized counter, so serializing a category costs no queries
+    articles_count = serializers.IntegerField(source='published_articles_count', read_only=True)
     
     class Meta:
         model = Category
         fields = ['id', 'name', 'slug', 'description', 'articles_count', 'created_at', 'updated_at']
         read_only_fields = ['id', 'slug', 'created_at', 'updated_at']
     
-    def get_articles_count(self, obj):
-        return obj.articles.filter(status='published').count()
-    
     def create(self, validated_data):
         validated_data['slug'] = slugify(validated_data['name'])
         return super().create(validated_data)
@@ -27,16 +81,27 @@ class CategorySerializer(serializers.ModelSerializer):
             validated_data['slug'] = slugify(validated_data['name'])
         return super().update(instance, validated_data)
 
-class ArticleListSerializer(serializers.ModelSerializer):
-    author = UserSerializer(read_only=True)
-    category = CategorySerializer(read_only=True)
+class NestedUserSerializer(MemoizedRepresentationMixin, UserSerializer):
+    pass
+
+class NestedCategorySerializer(MemoizedRepresentationMixin, CategorySerializer):
+    pass
+
+class ArticleListSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
+    # Authors and categories are batch-loaded per page and rendered once each
+    author = NestedUserSerializer(read_only=True)
+    category = NestedCategorySerializer(read_only=True)
+    # Only present on ?search= results (see articles.search.ArticleSearchFilter)
+    search_rank = serializers.FloatField(read_only=True)
+    search_headline = serializers.CharField(read_only=True)
     
     class Meta:
         model = Article
-        fields = ['id', 'title', 'slug', 'description', 'category', 'author', 'status', 'featured_image', 'views_count', 'created_at', 'updated_at']
+        fields = ['id', 'title', 'slug', 'description', 'category', 'author', 'status', 'featured_image', 'views_count', 'created_at', 'updated_at', 'search_rank', 'search_headline']
         read_only_fields = ['id', 'slug', 'author', 'views_count', 'created_at', 'updated_at']
+        list_serializer_class = BatchLoadingListSerializer
 
-class ArticleDetailSerializer(serializers.ModelSerializer):
+class ArticleDetailSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     author = UserSerializer(read_only=True)
     category = CategorySerializer(read_only=True)
     
@@ -75,4 +140,37 @@ class ArticleCreateUpdateSerializer(serializers.ModelSerializer):
         representation = super().to_representation(instance)
         # Ensure id is always in the response
         representation['id'] = instance.id
-        return representation
\ No newline at end of file
+        return representation
+
+
+class PreloadedPrimaryKeyRelatedField(serializers.PrimaryKeyRelatedField):
+    """
+    PrimaryKeyRelatedField that looks pks up in a {pk: obj} dict loaded once
+    into context[context_key], instead of one query per value; for
+    validating many items in one pass.
+    """
+    def __init__(self, context_key, **kwargs):
+        self.context_key = context_key
+        super().__init__(**kwargs)
+
+    def to_internal_value(self, data):
+        if isinstance(data, bool):
+            self.fail('incorrect_type', data_type=type(data).__name__)
+        try:
+            pk = int(data)
+        except (TypeError, ValueError):
+            self.fail('incorrect_type', data_type=type(data).__name__)
+        obj = self.context[self.context_key].get(pk)
+        if obj is None:
+            self.fail('does_not_exist', pk_value=data)
+        return obj
+
+class BulkArticleSerializer(ArticleCreateUpdateSerializer):
+    """
+    Validates one item of a /api/articles/bulk/ request. Nothing is saved
+    through it; articles.bulk writes all valid items at once.
+    """
+    category = PreloadedPrimaryKeyRelatedField('categories', queryset=Category.objects.all())
+    
+    class Meta(ArticleCreateUpdateSerializer.Meta):
+        fields = ['id', 'title', 'slug', 'description', 'content', 'category', 'status']
@@ -0,0 +1,77 @@
+"""
+articles/signals.py
+"""
+from django.db import transaction
+from django.db.models.signals import pre_save, post_save, pre_delete, post_delete
+from django.dispatch import receiver
+from .models import Category, Article
+from .counters import adjust_published_count
+from .caching import response_cache
+
+def _published_category(status, category_id):
+    """
+    The category an article counts towards, or None for drafts
+    """
+    return category_id if status == 'published' else None
+
+def _locked_published_category(sender, pk):
+    """
+    The category the stored row counts towards, read with SELECT ... FOR
+    UPDATE so that concurrent saves of the article wait for this one
+    """
+    previous = sender.objects.select_for_update().filter(pk=pk).order_by().values_list('status', 'category_id').first()
+    return _published_category(*previous) if previous is not None else None
+
+@receiver(pre_save, sender=Article)
+def remember_published_category(sender, instance, raw=False, update_fields=None, **kwargs):
+    """
+    Capture the stored status/category before the row is overwritten.
+    Runs inside the transaction of Article.save(), so the locked read, the
+    row write and the counter change commit or roll back together.
+    """
+    instance._published_category_before = None
+    if raw or instance._state.adding or instance.pk is None:
+        return
+    if update_fields is not None and not {'status', 'category', 'category_id'} & set(update_fields):
+        instance._published_category_before = _published_category(instance.status, instance.category_id)
+        return
+    instance._published_category_before = _locked_published_category(sender, instance.pk)
+
+@receiver(post_save, sender=Article)
+def update_counts_on_save(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    before = getattr(instance, '_published_category_before', None)
+    after = _published_category(instance.status, instance.category_id)
+    if before == after:
+        return
+    adjust_published_count(before, -1)
+    adjust_published_count(after, 1)
+
+@receiver(pre_delete, sender=Article)
+def remember_deleted_category(sender, instance, **kwargs):
+    """
+    Capture the stored status/category of a row about to be deleted (the
+    instance may be stale)
+    """
+    instance._published_category_before = _locked_published_category(sender, instance.pk)
+
+@receiver(post_delete, sender=Article)
+def update_counts_on_delete(sender, instance, **kwargs):
+    if hasattr(instance, '_published_category_before'):
+        before = instance._published_category_before
+    else:
+        before = _published_category(instance.status, instance.category_id)
+    adjust_published_count(before, -1)
+
+def invalidate_response_cache(sender, **kwargs):
+    """
+    Bump the response cache generation now, and again once the surrounding
+    transaction commits so nothing cached mid-transaction survives
+    """
+    response_cache.bump()
+    transaction.on_commit(response_cache.bump)
+
+for model in (Category, Article):
+    post_save.connect(invalidate_response_cache, sender=model, dispatch_uid=f'invalidate-cache-on-save-{model.__name__}')
+    post_delete.connect(invalidate_response_cache, sender=model, dispatch_uid=f'invalidate-cache-on-delete-{model.__name__}')
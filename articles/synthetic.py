@@ -0,0 +1,174 @@
+"""
+articles/synthetic.py
+"""
+import functools
+import itertools
+import math
+import random
+import time
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.db import transaction
+from .models import Article, Category
+from .counters import rebuild_published_counts
+from .importer import insert_articles
+
+User = get_user_model()
+
+USERNAME_PREFIX = 'sample_user_'
+CATEGORY_SLUG_PREFIX = 'sample-category-'
+ARTICLE_SLUG_PREFIX = 'sample-article-'
+# Rows drawn from one RNG; the unit of determinism
+BLOCK_SIZE = 1000
+SENTENCE_POOL_SIZE = 200
+SAMPLE_PASSWORD = 'sample123'
+# Fixed end of the generated date range, so a seed always means the same rows
+DEFAULT_END = datetime(2025, 1, 1, tzinfo=dt_timezone.utc)
+
+WORDS = (
+    'django python api database index query cache latency throughput cursor '
+    'server client request response token schema model view router filter '
+    'search ranking vector postgres replica shard queue worker thread process '
+    'memory profile benchmark deploy container cluster network socket stream '
+    'batch import export scaling release migration feature pattern design '
+    'testing security session rendering template frontend backend storage'
+).split()
+
+@functools.lru_cache(maxsize=8)
+def zipf_weights(n, exponent=1.1):
+    """
+    Cumulative weights of a Zipf distribution over n items, so a few authors
+    and categories get most of the articles, like in a real catalog
+    """
+    return tuple(itertools.accumulate(1 / (rank + 1) ** exponent for rank in range(n)))
+
+def _sentence(rng, low, high):
+    words = rng.choices(WORDS, k=rng.randint(low, high))
+    return ' '.join(words).capitalize() + '.'
+
+def generate_users(count, batch_size=10000, log=None):
+    """
+    Make sure `count` sample users exist; returns their pks in index order
+    """
+    existing = User.objects.filter(username__startswith=USERNAME_PREFIX).count()
+    if existing < count:
+        if log:
+            log(f'Creating {count - existing} users...')
+        password = make_password(SAMPLE_PASSWORD)
+        for start in range(existing, count, batch_size):
+            User.objects.bulk_create([
+                User(
+                    username=f'{USERNAME_PREFIX}{i:08d}',
+                    email=f'{USERNAME_PREFIX}{i:08d}@example.com',
+                    password=password,
+                    role='admin' if i % 500 == 0 else 'author',
+                )
+                for i in range(start, min(start + batch_size, count))
+            ])
+    return list(
+        User.objects.filter(username__startswith=USERNAME_PREFIX)
+        .order_by('username').values_list('pk', flat=True)[:count]
+    )
+
+def generate_categories(count, log=None):
+    """
+    Make sure `count` sample categories exist; returns their pks in index order
+    """
+    existing = Category.objects.filter(slug__startswith=CATEGORY_SLUG_PREFIX).count()
+    if existing < count:
+        if log:
+            log(f'Creating {count - existing} categories...')
+        Category.objects.bulk_create([
+            Category(
+                name=f'Sample Category {i:05d}',
+                slug=f'{CATEGORY_SLUG_PREFIX}{i:05d}',
+                description=f'Generated category {i}',
+            )
+            for i in range(existing, count)
+        ])
+    return list(
+        Category.objects.filter(slug__startswith=CATEGORY_SLUG_PREFIX)
+        .order_by('slug').values_list('pk', flat=True)[:count]
+    )
+
+def article_records(start, stop, user_ids, category_ids, seed=42, draft_ratio=0.2, years=5, end=DEFAULT_END):
+    """
+    Article rows `start`..`stop` of the synthetic catalog as dicts for
+    articles.importer.insert_articles.
+
+    Every block of BLOCK_SIZE rows is drawn from its own RNG seeded with
+    (seed, block), so row i is the same however the dataset is batched or
+    topped up.
+
+    - authors and categories: Zipf distributed (a long tail of rare ones)
+    - created_at: over `years` years up to `end`, denser towards the end
+      (the catalog grows over time); updated_at a few days later
+    - status: `draft_ratio` drafts
+    - views_count: log-normal, larger for older published articles
+    """
+    author_weights = zipf_weights(len(user_ids))
+    category_weights = zipf_weights(len(category_ids))
+    span = years * 365 * 24 * 3600
+
+    records = []
+    first = start - start % BLOCK_SIZE
+    for i in range(first, stop):
+        if i % BLOCK_SIZE == 0:
+            rng = random.Random(f'{seed}:{i // BLOCK_SIZE}')
+            # Text is assembled from a per-block pool of sentences; drawing
+            # every word separately would dominate generation time
+            sentences = [_sentence(rng, 6, 14) for _ in range(SENTENCE_POOL_SIZE)]
+            titles = [_sentence(rng, 3, 8)[:-1].title() for _ in range(SENTENCE_POOL_SIZE)]
+        age = 1 - math.sqrt(rng.random())
+        created_at = end - timedelta(seconds=int(age * span))
+        updated_at = min(created_at + timedelta(seconds=int(rng.expovariate(1 / (3 * 24 * 3600)))), end)
+        draft = rng.random() < draft_ratio
+        records.append({
+            'title': rng.choice(titles),
+            'slug': f'{ARTICLE_SLUG_PREFIX}{i:09d}',
+            'description': rng.choice(sentences),
+            'content': '\n\n'.join(
+                ' '.join(rng.choices(sentences, k=rng.randint(2, 5)))
+                for _ in range(rng.randint(1, 4))
+            ),
+            'category_id': rng.choices(category_ids, cum_weights=category_weights)[0],
+            'author_id': rng.choices(user_ids, cum_weights=author_weights)[0],
+            'status': 'draft' if draft else 'published',
+            'featured_image': '',
+            'views_count': 0 if draft else int(rng.lognormvariate(3 + 2 * age, 1.2)),
+            'created_at': created_at,
+            'updated_at': updated_at,
+        })
+    return records[start - first:]
+
+def generate_dataset(users=1000, categories=50, articles=100000, seed=42, draft_ratio=0.2,
+                     years=5, end=DEFAULT_END, batch_size=10000, use_copy=None, log=None):
+    """
+    Grow the database to at least `users` sample users, `categories` sample
+    categories and `articles` sample articles, deterministically for a given
+    seed, in batches of `batch_size` rows (one transaction each). Category
+    counters are rebuilt at the end. Returns the number of articles written.
+    """
+    user_ids = generate_users(users, batch_size=batch_size, log=log)
+    category_ids = generate_categories(categories, log=log)
+
+    existing = Article.objects.filter(slug__startswith=ARTICLE_SLUG_PREFIX).count()
+    if existing >= articles:
+        return 0
+
+    if log:
+        log(f'Generating {articles - existing} articles...')
+    started = time.perf_counter()
+    for start in range(existing, articles, batch_size):
+        stop = min(start + batch_size, articles)
+        records = article_records(start, stop, user_ids, category_ids, seed, draft_ratio, years, end)
+        with transaction.atomic():
+            insert_articles(records, use_copy)
+        if log:
+            elapsed = time.perf_counter() - started
+            log(f'  {stop - existing} articles ({(stop - existing) / elapsed:,.0f} rows/s)')
+
+    rebuild_published_counts()
+    return articles - existing
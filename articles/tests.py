@@ -1,11 +1,26 @@
 """
 articles/tests.py
 """
-from django.test import TestCase
+import csv
+import io
+import json
+import os
+import tempfile
+from datetime import timedelta
+from unittest import mock
+
+from django.conf import settings
+from django.core.management import call_command
+from django.db import connection
+from django.db.models.signals import post_save
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.contrib.auth import get_user_model
 from rest_framework.test import APIClient
 from rest_framework import status
 from .models import Category, Article
+from .view_counter import ViewCountBuffer, view_counter
+from .caching import response_cache
 
 User = get_user_model()
 
@@ -198,3 +213,996 @@ class ArticleTests(TestCase):
         })
         
         self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+
+class ArticleCursorPaginationTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.author = User.objects.create_user(
+            username='author',
+            email='author@example.com',
+            password='author123',
+            role='author'
+        )
+        self.category = Category.objects.create(name='Technology', slug='technology')
+        self.articles = [
+            Article.objects.create(
+                title=f'Article {i}',
+                slug=f'article-{i}',
+                description='Test',
+                content='Content',
+                category=self.category,
+                author=self.author,
+                status='published'
+            )
+            for i in range(5)
+        ]
+    
+    def _walk(self, url):
+        ids = []
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertNotIn('count', response.data)
+            ids.extend(item['id'] for item in response.data['results'])
+            url = response.data['next']
+        return ids
+    
+    def test_cursor_pages_cover_all_articles_once(self):
+        """Test that following next links yields every article exactly once, newest first"""
+        ids = self._walk('/api/articles/?pagination=cursor&page_size=2')
+        expected = [a.id for a in sorted(self.articles, key=lambda a: (a.created_at, a.id), reverse=True)]
+        self.assertEqual(ids, expected)
+    
+    def test_cursor_respects_ordering_param(self):
+        """Test that cursor pagination keys on the requested ordering field"""
+        ids = self._walk('/api/articles/?pagination=cursor&page_size=2&ordering=title')
+        self.assertEqual(ids, [a.id for a in self.articles])
+    
+    def test_cursor_previous_link(self):
+        """Test that the previous link returns the preceding page"""
+        first = self.client.get('/api/articles/?pagination=cursor&page_size=2')
+        second = self.client.get(first.data['next'])
+        previous = self.client.get(second.data['previous'])
+        self.assertEqual(
+            [item['id'] for item in previous.data['results']],
+            [item['id'] for item in first.data['results']]
+        )
+    
+    def test_cursor_search_with_equal_ranks(self):
+        """Test that paging a search by cursor yields every match once despite equal ranks"""
+        # Lowest id is newest, so created_at order differs from the id tie-break
+        for offset, article in enumerate(self.articles):
+            Article.objects.filter(pk=article.pk).update(created_at=article.created_at - timedelta(minutes=offset))
+        ids = self._walk('/api/articles/?pagination=cursor&page_size=2&search=content')
+        self.assertEqual(ids, [a.id for a in self.articles])
+    
+    def test_invalid_cursor(self):
+        """Test that a malformed cursor is rejected"""
+        response = self.client.get('/api/articles/?cursor=bogus')
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+
+@override_settings(ARTICLE_VIEWS_FLUSH_INTERVAL=3600)
+class ArticleViewCountTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.author = User.objects.create_user(
+            username='author',
+            email='author@example.com',
+            password='author123',
+            role='author'
+        )
+        self.category = Category.objects.create(name='Technology', slug='technology')
+        self.article = Article.objects.create(
+            title='Article',
+            slug='article',
+            description='Test',
+            content='Content',
+            category=self.category,
+            author=self.author,
+            status='published'
+        )
+        self.other = Article.objects.create(
+            title='Other',
+            slug='other',
+            description='Test',
+            content='Content',
+            category=self.category,
+            author=self.author,
+            status='published'
+        )
+        # A buffer of our own whose flusher cannot fire mid-test
+        self.buffer = ViewCountBuffer()
+        self.addCleanup(self.buffer.flush)
+        patcher = mock.patch('articles.views.view_counter', self.buffer)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+    
+    def test_retrieve_does_not_write(self):
+        """Test that detail reads are buffered instead of written"""
+        for _ in range(3):
+            response = self.client.get(f'/api/articles/{self.article.id}/')
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+        
+        self.article.refresh_from_db()
+        self.assertEqual(self.article.views_count, 0)
+        self.assertEqual(self.buffer.pending(self.article.id), 3)
+    
+    def test_flush_applies_deltas_in_one_query(self):
+        """Test that a flush writes every pending delta with a single UPDATE"""
+        self.client.get(f'/api/articles/{self.article.id}/')
+        self.client.get(f'/api/articles/{self.article.id}/')
+        self.client.get(f'/api/articles/{self.other.id}/')
+        
+        with self.assertNumQueries(1):
+            self.assertEqual(self.buffer.flush(), 2)
+        
+        self.article.refresh_from_db()
+        self.other.refresh_from_db()
+        self.assertEqual(self.article.views_count, 2)
+        self.assertEqual(self.other.views_count, 1)
+        self.assertEqual(self.buffer.pending(), 0)
+    
+    @override_settings(ARTICLE_VIEWS_FLUSH_INTERVAL=0)
+    def test_write_through_when_interval_disabled(self):
+        """Test that an interval of 0 writes each view immediately"""
+        self.client.get(f'/api/articles/{self.article.id}/')
+        
+        self.article.refresh_from_db()
+        self.assertEqual(self.article.views_count, 1)
+
+
+class CategoryPublishedCountTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.author = User.objects.create_user(
+            username='author',
+            email='author@example.com',
+            password='author123',
+            role='author'
+        )
+        self.tech = Category.objects.create(name='Technology', slug='technology')
+        self.science = Category.objects.create(name='Science', slug='science')
+    
+    def _create(self, slug, status_value='published', category=None):
+        return Article.objects.create(
+            title=slug,
+            slug=slug,
+            description='Test',
+            content='Content',
+            category=category or self.tech,
+            author=self.author,
+            status=status_value
+        )
+    
+    def _counts(self):
+        self.tech.refresh_from_db()
+        self.science.refresh_from_db()
+        return self.tech.published_articles_count, self.science.published_articles_count
+    
+    def test_counter_follows_article_lifecycle(self):
+        """Test that create, publish, move and delete keep the counter in sync"""
+        published = self._create('published')
+        draft = self._create('draft', status_value='draft')
+        self.assertEqual(self._counts(), (1, 0))
+        
+        draft.status = 'published'
+        draft.save()
+        self.assertEqual(self._counts(), (2, 0))
+        
+        published.category = self.science
+        published.save()
+        self.assertEqual(self._counts(), (1, 1))
+        
+        draft.status = 'draft'
+        draft.save()
+        self.assertEqual(self._counts(), (0, 1))
+        
+        published.delete()
+        self.assertEqual(self._counts(), (0, 0))
+    
+    def test_failed_save_leaves_count_unchanged(self):
+        """Test that the counter change rolls back with a save that fails after it"""
+        draft = self._create('draft', status_value='draft')
+        
+        def fail(sender, instance, **kwargs):
+            raise RuntimeError('save failed')
+        post_save.connect(fail, sender=Article, dispatch_uid='test-fail-after-save')
+        self.addCleanup(post_save.disconnect, sender=Article, dispatch_uid='test-fail-after-save')
+        
+        draft.status = 'published'
+        with self.assertRaises(RuntimeError):
+            draft.save()
+        self.assertEqual(self._counts(), (0, 0))
+        self.assertEqual(Article.objects.get(pk=draft.pk).status, 'draft')
+    
+    def test_stale_delete_uses_stored_row(self):
+        """Test that deleting a stale instance adjusts the counter of the stored row"""
+        article = self._create('article', status_value='draft')
+        stored = Article.objects.get(pk=article.pk)
+        stored.status = 'published'
+        stored.save()
+        self.assertEqual(self._counts(), (1, 0))
+        
+        article.delete()
+        self.assertEqual(self._counts(), (0, 0))
+    
+    def test_rebuild_command(self):
+        """Test that rebuild_category_counts repairs drifted counters"""
+        self._create('a')
+        self._create('b', category=self.science)
+        Category.objects.update(published_articles_count=42)
+        
+        call_command('rebuild_category_counts', stdout=io.StringIO())
+        self.assertEqual(self._counts(), (1, 1))
+    
+    def test_serializing_categories_costs_no_extra_queries(self):
+        """Test that the category list is a validator probe, a page COUNT and one SELECT"""
+        self._create('a')
+        self._create('b', category=self.science)
+        
+        with self.assertNumQueries(3):
+            response = self.client.get('/api/categories/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            {c['slug']: c['articles_count'] for c in response.data['results']},
+            {'technology': 1, 'science': 1}
+        )
+
+
+class ArticleSearchTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.author = User.objects.create_user(
+            username='author',
+            email='author@example.com',
+            password='author123',
+            role='author'
+        )
+        self.category = Category.objects.create(name='Technology', slug='technology')
+        self.in_content = Article.objects.create(
+            title='Web frameworks',
+            slug='web-frameworks',
+            description='An overview',
+            content='Flask is small, while Django ships with batteries included.',
+            category=self.category,
+            author=self.author,
+            status='published'
+        )
+        self.in_title = Article.objects.create(
+            title='Django tips',
+            slug='django-tips',
+            description='Practical advice',
+            content='Use select_related wisely.',
+            category=self.category,
+            author=self.author,
+            status='published'
+        )
+        Article.objects.create(
+            title='Cooking',
+            slug='cooking',
+            description='Recipes',
+            content='Pasta and sauces.',
+            category=self.category,
+            author=self.author,
+            status='published'
+        )
+    
+    def test_search_ranks_title_matches_first(self):
+        """Test that title hits outrank content hits"""
+        response = self.client.get('/api/articles/?search=django')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [item['id'] for item in response.data['results']],
+            [self.in_title.id, self.in_content.id]
+        )
+    
+    def test_search_highlights_content(self):
+        """Test that results carry a highlighted content snippet"""
+        response = self.client.get('/api/articles/?search=batteries')
+        self.assertEqual(response.data['count'], 1)
+        self.assertIn('<mark>batteries</mark>', response.data['results'][0]['search_headline'])
+    
+    def test_search_tracks_updates(self):
+        """Test that the search index follows edits"""
+        self.in_title.title = 'Python tips'
+        self.in_title.content = 'Nothing relevant.'
+        self.in_title.save()
+        
+        response = self.client.get('/api/articles/?search=django')
+        self.assertEqual([item['id'] for item in response.data['results']], [self.in_content.id])
+    
+    def test_explicit_ordering_overrides_rank(self):
+        """Test that ?ordering= wins over relevance"""
+        response = self.client.get('/api/articles/?search=django&ordering=-title')
+        self.assertEqual(
+            [item['id'] for item in response.data['results']],
+            [self.in_content.id, self.in_title.id]
+        )
+    
+    def test_list_without_search_has_no_search_fields(self):
+        """Test that plain listings keep their original shape"""
+        response = self.client.get('/api/articles/')
+        self.assertNotIn('search_rank', response.data['results'][0])
+        self.assertNotIn('search_headline', response.data['results'][0])
+
+
+class ResponseCacheTests(TestCase):
+    def setUp(self):
+        response_cache.cache.clear()
+        self.client = APIClient()
+        self.admin = User.objects.create_user(
+            username='admin',
+            email='admin@example.com',
+            password='admin123',
+            role='admin'
+        )
+        self.author = User.objects.create_user(
+            username='author',
+            email='author@example.com',
+            password='author123',
+            role='author'
+        )
+        self.category = Category.objects.create(name='Technology', slug='technology')
+        self.article = Article.objects.create(
+            title='Article',
+            slug='article',
+            description='Test',
+            content='Content',
+            category=self.category,
+            author=self.author,
+            status='published'
+        )
+    
+    def tearDown(self):
+        view_counter.flush()
+    
+    def test_anonymous_reads_are_cached(self):
+        """Test that a repeated anonymous GET is served without queries"""
+        for url in ['/api/articles/', '/api/articles/published/', f'/api/articles/{self.article.id}/', '/api/categories/']:
+            first = self.client.get(url)
+            self.assertEqual(first['X-Cache'], 'MISS')
+            with self.assertNumQueries(0):
+                second = self.client.get(url)
+            self.assertEqual(second['X-Cache'], 'HIT')
+            self.assertEqual(second.data, first.data)
+    
+    def test_query_string_is_part_of_the_key(self):
+        """Test that different query strings are cached separately"""
+        self.client.get('/api/articles/?page_size=1')
+        response = self.client.get('/api/articles/?page_size=2')
+        self.assertEqual(response['X-Cache'], 'MISS')
+    
+    @override_settings(ALLOWED_HOSTS=['testserver', 'evil.example'])
+    def test_host_is_part_of_the_key(self):
+        """Test that a response cached for another Host is not served with its links"""
+        Article.objects.create(
+            title='Second', slug='second', description='Test', content='Content',
+            category=self.category, author=self.author, status='published'
+        )
+        spoofed = self.client.get('/api/articles/?page_size=1', HTTP_HOST='evil.example')
+        self.assertIn('evil.example', spoofed.data['next'])
+        
+        response = self.client.get('/api/articles/?page_size=1')
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertTrue(response.data['next'].startswith('http://testserver/'))
+    
+    def test_writes_invalidate(self):
+        """Test that saving an article or category invalidates cached responses"""
+        self.client.get('/api/articles/')
+        self.article.title = 'Renamed'
+        self.article.save()
+        
+        response = self.client.get('/api/articles/')
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertEqual(response.data['results'][0]['title'], 'Renamed')
+        
+        self.client.get('/api/categories/')
+        self.category.name = 'Tech'
+        self.category.save()
+        
+        response = self.client.get('/api/categories/')
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertEqual(response.data['results'][0]['name'], 'Tech')
+    
+    def test_authenticated_reads_bypass_cache(self):
+        """Test that authenticated users never see cached responses"""
+        self.client.force_authenticate(user=self.author)
+        self.client.get('/api/articles/')
+        response = self.client.get('/api/articles/')
+        self.assertFalse(response.has_header('X-Cache'))
+    
+    def test_stats_admin_only(self):
+        """Test that hit/miss counters are exposed to admins"""
+        self.client.get('/api/categories/')
+        self.client.get('/api/categories/')
+        
+        self.client.force_authenticate(user=self.author)
+        self.assertEqual(self.client.get('/api/cache/stats/').status_code, status.HTTP_403_FORBIDDEN)
+        
+        self.client.force_authenticate(user=self.admin)
+        response = self.client.get('/api/cache/stats/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual((response.data['hits'], response.data['misses']), (1, 1))
+
+
+class ConditionalGetTests(TestCase):
+    def setUp(self):
+        response_cache.cache.clear()
+        self.client = APIClient()
+        self.author = User.objects.create_user(
+            username='author',
+            email='author@example.com',
+            password='author123',
+            role='author'
+        )
+        self.category = Category.objects.create(name='Technology', slug='technology')
+        self.article = Article.objects.create(
+            title='Article',
+            slug='article',
+            description='Test',
+            content='Content',
+            category=self.category,
+            author=self.author,
+            status='published'
+        )
+    
+    def tearDown(self):
+        view_counter.flush()
+    
+    def test_validators_present(self):
+        """Test that list and detail responses carry ETag and Last-Modified"""
+        for url in ['/api/articles/', f'/api/articles/{self.article.id}/', '/api/articles/published/', '/api/categories/']:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertTrue(response['ETag'].startswith('"'))
+            self.assertTrue(response.has_header('Last-Modified'))
+    
+    def test_not_modified_for_authenticated_user(self):
+        """Test that a matching If-None-Match gets a 304 after a single probe query"""
+        self.client.force_authenticate(user=self.author)
+        etag = self.client.get('/api/articles/')['ETag']
+        
+        with self.assertNumQueries(1):
+            response = self.client.get('/api/articles/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response['ETag'], etag)
+    
+    def test_not_modified_from_cache_for_anonymous(self):
+        """Test that anonymous revalidation is answered from the cache without queries"""
+        first = self.client.get(f'/api/articles/{self.article.id}/')
+        
+        with self.assertNumQueries(0):
+            response = self.client.get(f'/api/articles/{self.article.id}/', HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+    
+    def test_if_modified_since(self):
+        """Test that If-Modified-Since is honoured"""
+        self.client.force_authenticate(user=self.author)
+        last_modified = self.client.get(f'/api/articles/{self.article.id}/')['Last-Modified']
+        
+        response = self.client.get(f'/api/articles/{self.article.id}/', HTTP_IF_MODIFIED_SINCE=last_modified)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+    
+    def test_changes_produce_new_etag(self):
+        """Test that edits and new view counts change the ETag"""
+        self.client.force_authenticate(user=self.author)
+        etag = self.client.get('/api/articles/')['ETag']
+        
+        Article.objects.filter(pk=self.article.pk).update(views_count=10)
+        response = self.client.get('/api/articles/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        
+        etag = response['ETag']
+        self.article.title = 'Renamed'
+        self.article.save()
+        response = self.client.get('/api/articles/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response['ETag'], etag)
+    
+    def test_missing_article_still_404(self):
+        """Test that unknown or malformed ids are not affected"""
+        self.assertEqual(self.client.get('/api/articles/999999/').status_code, status.HTTP_404_NOT_FOUND)
+        self.assertEqual(self.client.get('/api/articles/abc/').status_code, status.HTTP_404_NOT_FOUND)
+
+
+class ArticleProjectionTests(TestCase):
+    def setUp(self):
+        response_cache.cache.clear()
+        self.client = APIClient()
+        self.author = User.objects.create_user(
+            username='author',
+            email='author@example.com',
+            password='author123',
+            role='author'
+        )
+        self.category = Category.objects.create(name='Technology', slug='technology')
+        self.article = Article.objects.create(
+            title='Article',
+            slug='article',
+            description='Test',
+            content='A very long body',
+            category=self.category,
+            author=self.author,
+            status='published'
+        )
+        Article.objects.create(
+            title='Draft',
+            slug='draft',
+            description='Test',
+            content='Another long body',
+            category=self.category,
+            author=self.author,
+            status='draft'
+        )
+    
+    def tearDown(self):
+        view_counter.flush()
+    
+    def _select_sql(self, url):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response, [q['sql'] for q in queries.captured_queries if '"articles"."title"' in q['sql']][-1]
+    
+    def test_list_defers_unused_columns(self):
+        """Test that list endpoints do not load article bodies or user credentials"""
+        self.client.force_authenticate(user=self.author)
+        for url in ['/api/articles/', '/api/articles/published/', '/api/articles/my_articles/', '/api/articles/drafts/']:
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.get(url)
+            sql = '\n'.join(q['sql'] for q in queries.captured_queries)
+            self.assertNotIn('"articles"."content"', sql)
+            self.assertNotIn('"users"."password"', sql)
+            self.assertIn('"users"."username"', sql)
+            self.assertNotIn('content', response.data['results'][0])
+    
+    def test_detail_loads_content(self):
+        """Test that the detail endpoint still renders the body"""
+        response, sql = self._select_sql(f'/api/articles/{self.article.id}/')
+        self.assertIn('"articles"."content"', sql)
+        self.assertNotIn('"users"."password"', sql)
+        self.assertEqual(response.data['content'], 'A very long body')
+
+
+class SparseFieldsetTests(TestCase):
+    def setUp(self):
+        response_cache.cache.clear()
+        self.client = APIClient()
+        self.author = User.objects.create_user(
+            username='author',
+            email='author@example.com',
+            password='author123',
+            role='author'
+        )
+        self.category = Category.objects.create(name='Technology', slug='technology')
+        self.article = Article.objects.create(
+            title='Article',
+            slug='article',
+            description='Test',
+            content='Content',
+            category=self.category,
+            author=self.author,
+            status='published'
+        )
+    
+    def tearDown(self):
+        view_counter.flush()
+    
+    def test_fields_selects_top_level_fields(self):
+        """Test that ?fields= limits the payload and skips the related joins"""
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/api/articles/?fields=id,title,slug,created_at')
+        self.assertEqual(list(response.data['results'][0]), ['id', 'title', 'slug', 'created_at'])
+        select = queries.captured_queries[-1]['sql']
+        self.assertNotIn('"users"', select)
+        self.assertNotIn('"categories"', select)
+        self.assertNotIn('"articles"."description"', select)
+    
+    def test_dotted_fields_prune_nested_serializers(self):
+        """Test that dotted names pick fields of nested serializers"""
+        response = self.client.get('/api/articles/?fields=id,author.username,category.name')
+        item = response.data['results'][0]
+        self.assertEqual(item['author'], {'username': 'author'})
+        self.assertEqual(item['category'], {'name': 'Technology'})
+    
+    def test_exclude(self):
+        """Test that ?exclude= drops fields, including nested ones"""
+        response = self.client.get(f'/api/articles/{self.article.id}/?exclude=content,author,category.description')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotIn('content', response.data)
+        self.assertNotIn('author', response.data)
+        self.assertNotIn('description', response.data['category'])
+        self.assertIn('name', response.data['category'])
+    
+    def test_categories(self):
+        """Test that category listings support sparse fieldsets"""
+        response = self.client.get('/api/categories/?fields=id,name')
+        self.assertEqual(response.data['results'], [{'id': self.category.id, 'name': 'Technology'}])
+    
+    def test_writes_ignore_fields_param(self):
+        """Test that write requests are never pruned"""
+        admin = User.objects.create_user(username='admin', password='admin123', role='admin')
+        self.client.force_authenticate(user=admin)
+        response = self.client.post('/api/categories/?fields=id', {'name': 'Science'})
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data['slug'], 'science')
+
+
+@override_settings(API_FAST_LIST_ENABLED=False)
+class NestedBatchLoadingTests(TestCase):
+    def setUp(self):
+        response_cache.cache.clear()
+        self.client = APIClient()
+        self.authors = [
+            User.objects.create_user(username=f'author{i}', password='author123', role='author')
+            for i in range(3)
+        ]
+        self.categories = [
+            Category.objects.create(name=f'Category {i}', slug=f'category-{i}')
+            for i in range(2)
+        ]
+        for i in range(12):
+            Article.objects.create(
+                title=f'Article {i}',
+                slug=f'article-{i}',
+                description='Test',
+                content='Content',
+                category=self.categories[i % 2],
+                author=self.authors[i % 3],
+                status='published'
+            )
+    
+    def test_page_query_count_is_constant(self):
+        """Test that a page costs the same queries whatever its size"""
+        for page_size in (1, 12):
+            with self.assertNumQueries(5):
+                # probe, count, articles, users, categories
+                response = self.client.get(f'/api/articles/?page_size={page_size}')
+            self.assertEqual(len(response.data['results']), page_size)
+    
+    def test_each_related_object_is_serialized_once(self):
+        """Test that repeated authors/categories share one rendered dict"""
+        response = self.client.get('/api/articles/?page_size=12')
+        results = response.data['results']
+        self.assertEqual(len({id(item['author']) for item in results}), 3)
+        self.assertEqual(len({id(item['category']) for item in results}), 2)
+        self.assertEqual(results[0]['author']['username'], Article.objects.get(pk=results[0]['id']).author.username)
+
+
+@override_settings(API_FAST_LIST_ENABLED=True)
+class FastListPathTests(TestCase):
+    def setUp(self):
+        response_cache.cache.clear()
+        self.client = APIClient()
+        self.authors = [
+            User.objects.create_user(username=f'author{i}', password='author123', role='author')
+            for i in range(3)
+        ]
+        self.categories = [
+            Category.objects.create(name=f'Category {i}', slug=f'category-{i}')
+            for i in range(2)
+        ]
+        for i in range(12):
+            Article.objects.create(
+                title=f'Article {i} about python',
+                slug=f'article-{i}',
+                description='Test',
+                content='Content',
+                category=self.categories[i % 2],
+                author=self.authors[i % 3],
+                status='published' if i % 4 else 'draft',
+                featured_image='articles/cover.png' if i % 2 else '',
+                views_count=i
+            )
+    
+    def _compare(self, url):
+        fast = self.client.get(url)
+        response_cache.cache.clear()
+        with override_settings(API_FAST_LIST_ENABLED=False):
+            slow = self.client.get(url)
+        self.assertEqual(fast.status_code, status.HTTP_200_OK)
+        self.assertEqual(json.loads(fast.content), json.loads(slow.content))
+        return fast
+    
+    def test_output_matches_serializer(self):
+        """Test that values()-based pages render the same JSON as serializer pages"""
+        for url in [
+            '/api/articles/?page_size=12',
+            '/api/articles/published/',
+            '/api/articles/?search=python&page_size=5',
+            '/api/articles/?fields=id,title,author.username&ordering=views_count',
+            '/api/articles/?pagination=cursor&page_size=4',
+        ]:
+            self._compare(url)
+        
+        self.client.force_authenticate(user=self.authors[0])
+        for url in ['/api/articles/', '/api/articles/drafts/', '/api/articles/my_articles/']:
+            self._compare(url)
+    
+    def test_cursor_links_follow(self):
+        """Test that cursor pagination walks values() rows like model instances"""
+        response = self._compare('/api/articles/?pagination=cursor&page_size=4&ordering=views_count')
+        self.assertEqual([item['views_count'] for item in response.data['results']], [1, 2, 3, 5])
+        response = self._compare(response.data['next'])
+        self.assertEqual([item['views_count'] for item in response.data['results']], [6, 7, 9, 10])
+    
+    def test_single_query_page(self):
+        """Test that a page is read with one joined values() query"""
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/api/articles/?page_size=9')
+        # probe, count, page
+        self.assertEqual(len(queries.captured_queries), 3)
+        self.assertEqual(len(response.data['results']), 9)
+        self.assertIsInstance(response.data['results'][0], dict)
+    
+    def test_renderer_matches_stock_json(self):
+        """Test that FastJSONRenderer produces the same bytes as JSONRenderer"""
+        import datetime
+        from decimal import Decimal
+        from rest_framework.renderers import JSONRenderer
+        from .renderers import FastJSONRenderer
+        data = {
+            'text': 'caf\u00e9 \u2028', 'n': [1, 2.5, None, True], 'd': Decimal('1.10'),
+            'at': datetime.datetime(2025, 1, 2, 3, 4, 5, 678901, tzinfo=datetime.timezone.utc),
+            'on': datetime.date(2025, 1, 2), 'time': datetime.time(3, 4, 5, 678901),
+        }
+        self.assertEqual(FastJSONRenderer().render(data), JSONRenderer().render(data))
+    
+    def test_renderer_only_on_fast_path(self):
+        """Test that only fast list actions use FastJSONRenderer, and only when enabled"""
+        from .renderers import FastJSONRenderer
+        response = self.client.get('/api/articles/')
+        self.assertIsInstance(response.accepted_renderer, FastJSONRenderer)
+        response = self.client.get('/api/categories/')
+        self.assertNotIsInstance(response.accepted_renderer, FastJSONRenderer)
+        response_cache.cache.clear()
+        with override_settings(API_FAST_LIST_ENABLED=False):
+            response = self.client.get('/api/articles/')
+        self.assertNotIsInstance(response.accepted_renderer, FastJSONRenderer)
+
+
+class ArticleExportTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.author = User.objects.create_user(
+            username='author',
+            email='author@example.com',
+            password='author123',
+            role='author'
+        )
+        self.category = Category.objects.create(name='Technology', slug='technology')
+        for i in range(5):
+            Article.objects.create(
+                title=f'Article {i}',
+                slug=f'article-{i}',
+                description='Test',
+                content='Line one\nLine "two"',
+                category=self.category,
+                author=self.author,
+                status='published' if i < 3 else 'draft'
+            )
+    
+    def _lines(self, response):
+        self.assertTrue(response.streaming)
+        return b''.join(response.streaming_content).decode().splitlines()
+    
+    def test_ndjson_export_public(self):
+        """Test that anonymous exports stream only published articles as NDJSON"""
+        response = self.client.get('/api/articles/export/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response['Content-Type'].startswith('application/x-ndjson'))
+        rows = [json.loads(line) for line in self._lines(response)]
+        self.assertEqual(len(rows), 3)
+        self.assertEqual(rows[0]['author_username'], 'author')
+        self.assertEqual(rows[0]['category_slug'], 'technology')
+        self.assertEqual(rows[0]['content'], 'Line one\nLine "two"')
+        self.assertEqual({row['status'] for row in rows}, {'published'})
+    
+    def test_csv_export_matches_schema(self):
+        """Test that the CSV export has the columns of the shipped CSV export"""
+        self.client.force_authenticate(user=self.author)
+        response = self.client.get('/api/articles/export/?format=csv')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn('articles.csv', response['Content-Disposition'])
+        
+        body = b''.join(response.streaming_content).decode()
+        rows = list(csv.DictReader(io.StringIO(body)))
+        with open(settings.BASE_DIR / 'Complete Article Information with All Relations.csv', newline='') as f:
+            self.assertEqual(list(rows[0]), next(csv.reader(f)))
+        self.assertEqual(len(rows), 5)
+        self.assertEqual(rows[0]['content'], 'Line one\nLine "two"')
+    
+    def test_export_honours_filters(self):
+        """Test that list filters and ordering apply to the export"""
+        self.client.force_authenticate(user=self.author)
+        response = self.client.get('/api/articles/export/?status=draft&ordering=title')
+        rows = [json.loads(line) for line in self._lines(response)]
+        self.assertEqual([row['title'] for row in rows], ['Article 3', 'Article 4'])
+        
+        response = self.client.get('/api/articles/export/?status=bogus')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class ArticleBulkTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.author = User.objects.create_user(username='author', password='author123', role='author')
+        self.other = User.objects.create_user(username='other', password='other123', role='author')
+        self.category = Category.objects.create(name='Technology', slug='technology')
+        self.science = Category.objects.create(name='Science', slug='science')
+        self.existing = Article.objects.create(
+            title='Hello World',
+            slug='hello-world',
+            description='Test',
+            content='Content',
+            category=self.category,
+            author=self.author,
+            status='published'
+        )
+        self.client.force_authenticate(user=self.author)
+    
+    def _item(self, title, **extra):
+        return {'title': title, 'description': 'Test', 'content': 'Content', 'category': self.category.id, **extra}
+    
+    def test_bulk_create(self):
+        """Test that a batch is created with unique slugs and a fixed number of queries"""
+        items = [self._item('Hello World', status='published') for _ in range(3)]
+        items += [self._item(f'Article {i}') for i in range(20)]
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post('/api/articles/bulk/', items, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertLess(len(queries.captured_queries), 12)
+        
+        slugs = [result['slug'] for result in response.data['results']]
+        self.assertEqual(slugs[:3], ['hello-world-2', 'hello-world-3', 'hello-world-4'])
+        self.assertEqual(len(set(slugs)), 23)
+        self.assertEqual(Article.objects.filter(author=self.author).count(), 24)
+        self.category.refresh_from_db()
+        self.assertEqual(self.category.published_articles_count, 4)
+    
+    def test_bulk_create_reports_item_errors(self):
+        """Test that invalid items are reported while valid ones are written"""
+        items = [self._item('Good'), self._item('Bad', category=999), {'title': 'Incomplete'}]
+        response = self.client.post('/api/articles/bulk/', items, format='json')
+        self.assertEqual(response.status_code, status.HTTP_207_MULTI_STATUS)
+        self.assertEqual(response.data['written'], 1)
+        self.assertEqual([result['status'] for result in response.data['results']], [201, 400, 400])
+        self.assertIn('category', response.data['results'][1]['errors'])
+        self.assertIn('content', response.data['results'][2]['errors'])
+        
+        response = self.client.post('/api/articles/bulk/', [{'title': 'Incomplete'}], format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        response = self.client.post('/api/articles/bulk/', {'title': 'Not a list'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+    
+    def test_bulk_update(self):
+        """Test that PATCH updates own articles and refuses others'"""
+        others = Article.objects.create(
+            title='Not Mine',
+            slug='not-mine',
+            description='Test',
+            content='Content',
+            category=self.category,
+            author=self.other,
+            status='published'
+        )
+        items = [
+            {'id': self.existing.id, 'title': 'Renamed', 'category': self.science.id},
+            {'id': others.id, 'title': 'Hijacked'},
+            {'id': 999999, 'title': 'Missing'},
+        ]
+        response = self.client.patch('/api/articles/bulk/', items, format='json')
+        self.assertEqual(response.status_code, status.HTTP_207_MULTI_STATUS)
+        self.assertEqual([result['status'] for result in response.data['results']], [200, 403, 404])
+        
+        self.existing.refresh_from_db()
+        self.assertEqual(self.existing.title, 'Renamed')
+        self.assertEqual(self.existing.slug, 'renamed')
+        self.assertEqual(self.existing.category, self.science)
+        self.assertEqual(Article.objects.get(pk=others.pk).title, 'Not Mine')
+        self.science.refresh_from_db()
+        self.assertEqual(self.science.published_articles_count, 1)
+    
+    def test_bulk_requires_authentication(self):
+        """Test that anonymous bulk writes are rejected"""
+        self.client.force_authenticate(user=None)
+        response = self.client.post('/api/articles/bulk/', [self._item('Anon')], format='json')
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+
+class ImportArticlesCommandTests(TestCase):
+    source = str(settings.BASE_DIR / 'Complete Article Information with All Relations.csv')
+    
+    def _import(self, *args):
+        out = io.StringIO()
+        call_command('import_articles', *args, stdout=out)
+        return out.getvalue()
+    
+    def test_import_shipped_csv(self):
+        """Test that the checked-in CSV export imports with authors, categories and counters"""
+        with open(self.source, newline='') as f:
+            rows = list(csv.DictReader(f))
+        
+        output = self._import(self.source, '--batch-size', '4')
+        self.assertIn('rows/s', output)
+        self.assertEqual(Article.objects.count(), len(rows))
+        
+        article = Article.objects.get(slug=rows[0]['slug'])
+        self.assertEqual(article.author.username, rows[0]['author_username'])
+        self.assertEqual(article.category.slug, rows[0]['category_slug'])
+        self.assertEqual(article.created_at.isoformat(), '2025-12-28T04:58:45.491918+00:00')
+        self.assertFalse(article.author.has_usable_password())
+        
+        published = sum(1 for row in rows if row['status'] == 'published' and row['category_slug'] == rows[0]['category_slug'])
+        self.assertEqual(article.category.published_articles_count, published)
+        
+        # Re-running skips everything that is already there
+        self.assertIn(f'{len(rows)} already present', self._import(self.source))
+        self.assertEqual(Article.objects.count(), len(rows))
+    
+    def test_import_jsonl(self):
+        """Test that JSON Lines input is supported and slugs are allocated"""
+        author = User.objects.create_user(username='author', password='author123', role='author')
+        Category.objects.create(name='Technology', slug='technology')
+        Article.objects.create(
+            title='Hello',
+            slug='hello',
+            description='Test',
+            content='Content',
+            category=Category.objects.get(),
+            author=author,
+        )
+        records = [
+            {'title': 'Hello', 'content': 'Body', 'status': 'published', 'author_username': 'author', 'category_name': 'Technology'},
+            {'title': 'No author', 'content': 'Body', 'category_name': 'Technology'},
+        ]
+        with tempfile.NamedTemporaryFile('w', suffix='.jsonl', delete=False) as f:
+            f.write('\n'.join(json.dumps(record) for record in records))
+        self.addCleanup(os.unlink, f.name)
+        
+        output = self._import(f.name)
+        self.assertIn('1 invalid', output)
+        imported = Article.objects.exclude(pk__in=[a.pk for a in author.articles.filter(slug='hello')]).get()
+        self.assertEqual(imported.slug, 'hello-2')
+        self.assertEqual(imported.author, author)
+        self.assertEqual(Category.objects.get().published_articles_count, 1)
+
+    
+    def test_category_slugs_and_names_are_separate(self):
+        """Test that a category slug never matches another category's name"""
+        User.objects.create_user(username='author', password='author123', role='author')
+        by_name = Category.objects.create(name='python', slug='programming')
+        by_slug = Category.objects.create(name='Python', slug='python')
+        records = [
+            {'title': 'By slug', 'content': 'Body', 'author_username': 'author', 'category_slug': 'python'},
+            {'title': 'By name', 'content': 'Body', 'author_username': 'author', 'category_name': 'python'},
+            {'title': 'New', 'content': 'Body', 'author_username': 'author', 'category_name': 'Rust Lang'},
+        ]
+        with tempfile.NamedTemporaryFile('w', suffix='.jsonl', delete=False) as f:
+            f.write('\n'.join(json.dumps(record) for record in records))
+        self.addCleanup(os.unlink, f.name)
+        
+        self._import(f.name)
+        self.assertEqual(Article.objects.get(title='By slug').category, by_slug)
+        self.assertEqual(Article.objects.get(title='By name').category, by_name)
+        self.assertEqual(Article.objects.get(title='New').category.slug, 'rust-lang')
+    
+    def test_timestamps_kept_without_touching_auto_now(self):
+        """Test that imported timestamps are stored as given and the model fields stay auto_now"""
+        User.objects.create_user(username='author', password='author123', role='author')
+        records = [{
+            'title': 'Old', 'content': 'Body', 'author_username': 'author', 'category_name': 'History',
+            'created_at': '2020-01-02T03:04:05+00:00', 'updated_at': '2021-01-02T03:04:05+00:00',
+        }]
+        with tempfile.NamedTemporaryFile('w', suffix='.jsonl', delete=False) as f:
+            f.write('\n'.join(json.dumps(record) for record in records))
+        self.addCleanup(os.unlink, f.name)
+        
+        self._import(f.name)
+        article = Article.objects.get()
+        self.assertEqual(article.created_at.isoformat(), '2020-01-02T03:04:05+00:00')
+        self.assertEqual(article.updated_at.isoformat(), '2021-01-02T03:04:05+00:00')
+        self.assertTrue(Article._meta.get_field('updated_at').auto_now)
+        self.assertTrue(Article._meta.get_field('created_at').auto_now_add)
@@ -3,10 +3,12 @@ articles/urls.py
 """
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from rest_framework.decorators import api_view
+from rest_framework.decorators import api_view, permission_classes
 from rest_framework.response import Response
 from rest_framework.reverse import reverse
 from .views import ArticleViewSet, CategoryViewSet
+from .permissions import IsAdmin
+from .caching import response_cache
 
 # Create router for viewsets
 router = DefaultRouter()
@@ -24,9 +26,19 @@ def api_root(request, format=None):
         'my_articles': request.build_absolute_uri('/api/articles/my_articles/'),
         'drafts': request.build_absolute_uri('/api/articles/drafts/'),
         'published': request.build_absolute_uri('/api/articles/published/'),
+        'export': request.build_absolute_uri('/api/articles/export/'),
     })
 
+@api_view(['GET'])
+@permission_classes([IsAdmin])
+def cache_stats(request, format=None):
+    """
+    Response cache hit/miss counters (admin only)
+    """
+    return Response(response_cache.stats())
+
 urlpatterns = [
     path('', api_root, name='api-root'),
+    path('cache/stats/', cache_stats, name='cache-stats'),
     path('', include(router.urls)),
 ]
\ No newline at end of file
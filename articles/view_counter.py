@@ -0,0 +1,118 @@
+"""
+articles/view_counter.py
+"""
+import atexit
+import logging
+import os
+import threading
+from collections import Counter
+
+from django.conf import settings
+from django.db import close_old_connections
+from django.db.models import Case, F, IntegerField, Value, When
+
+logger = logging.getLogger(__name__)
+
+class ViewCountBuffer:
+    """
+    Buffers article view increments in memory and writes them back in bulk.
+
+    record() only touches a per-process Counter, so detail GETs never write
+    to the database. A daemon thread flushes the accumulated deltas every
+    ARTICLE_VIEWS_FLUSH_INTERVAL seconds with a single
+    UPDATE ... SET views_count = views_count + CASE id WHEN ... END,
+    and whatever is still pending is drained when the worker exits.
+
+    An interval of 0 writes every increment through immediately.
+    """
+    default_interval = 5.0
+
+    def __init__(self):
+        self._deltas = Counter()
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._thread = None
+        self._pid = None
+
+    @property
+    def interval(self):
+        return getattr(settings, 'ARTICLE_VIEWS_FLUSH_INTERVAL', self.default_interval)
+
+    def record(self, article_id, count=1):
+        """
+        Add `count` views for `article_id`
+        """
+        if self.interval <= 0:
+            self._write({article_id: count})
+            return
+
+        with self._lock:
+            self._deltas[article_id] += count
+            self._ensure_flusher()
+
+    def pending(self, article_id=None):
+        """
+        Views recorded but not yet written (for one article or in total)
+        """
+        with self._lock:
+            if article_id is None:
+                return sum(self._deltas.values())
+            return self._deltas.get(article_id, 0)
+
+    def flush(self):
+        """
+        Write all pending deltas in one UPDATE. Returns the number of
+        articles touched.
+        """
+        with self._lock:
+            deltas, self._deltas = self._deltas, Counter()
+
+        if not deltas:
+            return 0
+
+        try:
+            self._write(deltas)
+        except Exception:
+            # Put the deltas back so the next flush retries them
+            with self._lock:
+                self._deltas.update(deltas)
+            raise
+        return len(deltas)
+
+    def _write(self, deltas):
+        from .models import Article
+
+        increment = Case(
+            *[When(pk=pk, then=Value(delta)) for pk, delta in deltas.items()],
+            default=Value(0),
+            output_field=IntegerField(),
+        )
+        Article.objects.filter(pk__in=list(deltas)).update(views_count=F('views_count') + increment)
+
+    def _ensure_flusher(self):
+        # Threads do not survive a fork, so restart the flusher in each
+        # worker process (e.g. gunicorn --preload)
+        if self._thread is not None and self._pid == os.getpid():
+            return
+
+        if self._pid is None:
+            atexit.register(self._drain)
+
+        self._pid = os.getpid()
+        self._thread = threading.Thread(target=self._run, name='article-view-flusher', daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        while not self._wakeup.wait(self.interval):
+            self._drain()
+
+    def _drain(self):
+        close_old_connections()
+        try:
+            self.flush()
+        except Exception:
+            logger.exception('Failed to flush %s buffered article views', self.pending())
+        finally:
+            close_old_connections()
+
+view_counter = ViewCountBuffer()
@@ -6,7 +6,10 @@ from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticatedOrReadOnly, IsAuthenticated
 from django_filters.rest_framework import DjangoFilterBackend
-from django.db.models import Prefetch, Q
+from django.db import IntegrityError
+from django.db.models import Q
+from django.http import StreamingHttpResponse
+from mini_cms.middleware import SerializerTimingMixin
 from .models import Category, Article
 from .serializers import (
     CategorySerializer, ArticleListSerializer, 
@@ -14,12 +17,24 @@ from .serializers import (
 )
 from .permissions import IsAdminOrReadOnly, IsAuthorOrAdmin
 from .filters import ArticleFilter
-from .pagination import ArticlePagination
+from .pagination import ArticlePagination, ArticleCursorPagination
+from .view_counter import view_counter
+from .search import ArticleSearchFilter, ArticleOrderingFilter
+from .caching import AnonymousResponseCacheMixin
+from .conditional import ConditionalGetMixin
+from .projection import SerializerProjectionMixin
+from .fastpath import FastListMixin
+from .export import EXPORT_COLUMNS, export_rows
+from .renderers import NDJSONRenderer, CSVRenderer
+from .bulk import write_bulk_request
 
-class CategoryViewSet(viewsets.ModelViewSet):
+class CategoryViewSet(SerializerTimingMixin, AnonymousResponseCacheMixin, ConditionalGetMixin, SerializerProjectionMixin, viewsets.ModelViewSet):
     """
     ViewSet for managing categories.
     Only admins can create, update, or delete categories.
+    Anonymous list/retrieve responses are served from the response cache.
+    List/retrieve answer conditional GETs (ETag / Last-Modified).
+    Reads support ?fields= / ?exclude= and only load the rendered columns.
     """
     queryset = Category.objects.all()
     serializer_class = CategorySerializer
@@ -28,31 +43,55 @@ class CategoryViewSet(viewsets.ModelViewSet):
     search_fields = ['name', 'description']
     ordering_fields = ['name', 'created_at']
     ordering = ['name']
+    conditional_checksum_field = 'published_articles_count'
     
     def get_queryset(self):
-        """
-        Optimize query by prefetching related articles
-        """
-        return Category.objects.prefetch_related(
-            Prefetch('articles', queryset=Article.objects.filter(status='published'))
-        )
+        return self.project_queryset(super().get_queryset())
 
-class ArticleViewSet(viewsets.ModelViewSet):
+class ArticleViewSet(SerializerTimingMixin, AnonymousResponseCacheMixin, ConditionalGetMixin, SerializerProjectionMixin, FastListMixin, viewsets.ModelViewSet):
     """
     ViewSet for managing articles.
     - Public users can only view published articles
     - Authors can create and edit their own articles (any status)
     - Admins can edit any article
+    - Anonymous list/retrieve/published responses are served from the response cache
+    - List/retrieve/published answer conditional GETs (ETag / Last-Modified)
+    - Reads support ?fields= / ?exclude= and only load the columns the
+      active serializer renders
+    - With API_FAST_LIST_ENABLED, list actions render straight from .values()
+      rows (see articles.fastpath)
     
     CRITICAL FIX: Authors must be able to access their own articles regardless of status.
     """
     permission_classes = [IsAuthenticatedOrReadOnly, IsAuthorOrAdmin]
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
+    filter_backends = [DjangoFilterBackend, ArticleSearchFilter, ArticleOrderingFilter]
     filterset_class = ArticleFilter
     search_fields = ['title', 'description', 'content']
     ordering_fields = ['created_at', 'updated_at', 'views_count', 'title']
     ordering = ['-created_at']
     pagination_class = ArticlePagination
+    cached_actions = ('list', 'retrieve', 'published')
+    conditional_actions = ('list', 'retrieve', 'published')
+    conditional_checksum_field = 'views_count'
+    projected_actions = ('list', 'retrieve', 'published', 'drafts', 'my_articles')
+    # Pages resolve author/category through BatchLoadingListSerializer
+    batch_loaded_actions = ('list', 'published', 'drafts', 'my_articles')
+    fast_list_actions = ('list', 'published', 'drafts', 'my_articles')
+    export_chunk_size = 2000
+    bulk_max_items = 5000
+    
+    @property
+    def paginator(self):
+        """
+        Page-number pagination by default; keyset pagination when the client
+        asks for it with ?pagination=cursor (no COUNT, no OFFSET).
+        """
+        if not hasattr(self, '_paginator'):
+            if ArticleCursorPagination.is_requested(self.request):
+                self._paginator = ArticleCursorPagination()
+            else:
+                self._paginator = self.pagination_class()
+        return self._paginator
     
     def get_queryset(self):
         """
@@ -63,8 +102,12 @@ class ArticleViewSet(viewsets.ModelViewSet):
         3. Authors → Their own articles (ANY status) + published articles by others
         
         This applies to ALL actions (list, retrieve, update, delete).
+        Read actions only load the columns their serializer needs.
         """
-        queryset = Article.objects.select_related('author', 'category')
+        queryset = Article.objects.all()
+        if self.action not in self.batch_loaded_actions:
+            queryset = queryset.select_related('author', 'category')
+        queryset = self.project_queryset(queryset)
         user = self.request.user
         
         # Case 1: Unauthenticated users
@@ -79,7 +122,10 @@ class ArticleViewSet(viewsets.ModelViewSet):
         # They can access:
         # - All their own articles (draft or published)
         # - Published articles by other authors
-        return queryset.filter(Q(author=user) | Q(status='published')).distinct()
+        # The two branches are disjoint and each matches one of the
+        # (status, created_at) / (author, created_at) indexes; the joins are
+        # all to-one, so no DISTINCT is needed.
+        return queryset.filter(Q(status='published') | Q(author=user, status='draft'))
     
     def get_serializer_class(self):
         """
@@ -93,13 +139,17 @@ class ArticleViewSet(viewsets.ModelViewSet):
     
     def retrieve(self, request, *args, **kwargs):
         """
-        Retrieve single article and increment view count
+        Retrieve single article and record the view.
+        
+        The increment goes into view_counter and is written back in batches,
+        so the request itself never writes to the articles table.
+        Responses served from the cache are counted too; 304 revalidations
+        are not.
         """
-        instance = self.get_object()
-        instance.views_count += 1
-        instance.save(update_fields=['views_count'])
-        serializer = self.get_serializer(instance)
-        return Response(serializer.data)
+        response = super().retrieve(request, *args, **kwargs)
+        if response.status_code == status.HTTP_200_OK:
+            view_counter.record(int(kwargs[self.lookup_url_kwarg or self.lookup_field]))
+        return response
     
     def perform_create(self, serializer):
         """
@@ -127,14 +177,7 @@ class ArticleViewSet(viewsets.ModelViewSet):
         Get all articles by the current user (both draft and published)
         """
         queryset = self.get_queryset().filter(author=request.user)
-        page = self.paginate_queryset(queryset)
-        
-        if page is not None:
-            serializer = self.get_serializer(page, many=True)
-            return self.get_paginated_response(serializer.data)
-        
-        serializer = self.get_serializer(queryset, many=True)
-        return Response(serializer.data)
+        return self.list_response(queryset)
     
     @action(detail=False, methods=['get'])
     def published(self, request):
@@ -142,14 +185,13 @@ class ArticleViewSet(viewsets.ModelViewSet):
         Get all published articles (public endpoint)
         """
         queryset = self.get_queryset().filter(status='published')
-        page = self.paginate_queryset(queryset)
         
-        if page is not None:
-            serializer = self.get_serializer(page, many=True)
-            return self.get_paginated_response(serializer.data)
+        def build():
+            return self.list_response(queryset)
         
-        serializer = self.get_serializer(queryset, many=True)
-        return Response(serializer.data)
+        return self.cached_response(
+            request, lambda: self.conditional_response(request, queryset, build)
+        )
     
     @action(detail=False, methods=['get'])
     def drafts(self, request):
@@ -170,11 +212,68 @@ class ArticleViewSet(viewsets.ModelViewSet):
         else:
             queryset = self.get_queryset().filter(status='draft', author=request.user)
         
-        page = self.paginate_queryset(queryset)
+        return self.list_response(queryset)
+    
+    @action(detail=False, methods=['get'], renderer_classes=[NDJSONRenderer, CSVRenderer])
+    def export(self, request):
+        """
+        Stream every article the user can see, with author and category
+        columns, as NDJSON (default) or CSV (?format=csv or Accept: text/csv).
+        
+        Accepts the same filters, search and ordering as the list endpoint.
+        Rows are read from a server-side cursor and encoded chunk by chunk,
+        so memory stays flat regardless of the number of rows.
+        """
+        queryset = self.filter_queryset(self.get_queryset())
+        renderer = request.accepted_renderer
+        rows = export_rows(queryset, chunk_size=self.export_chunk_size)
         
-        if page is not None:
-            serializer = self.get_serializer(page, many=True)
-            return self.get_paginated_response(serializer.data)
+        response = StreamingHttpResponse(
+            renderer.stream(list(EXPORT_COLUMNS), rows),
+            content_type=f'{renderer.media_type}; charset={renderer.charset}'
+        )
+        response['Content-Disposition'] = f'attachment; filename="articles.{renderer.format}"'
+        return response
+    
+    @action(detail=False, methods=['post', 'patch'], permission_classes=[IsAuthenticated])
+    def bulk(self, request):
+        """
+        Create (POST) or partially update (PATCH, each item with an "id")
+        many articles from a JSON array (see articles.bulk.write_bulk_request);
+        invalid items are reported per item. Responds 201/200 when every
+        item was written, 207 when some were, 400 when none were.
+        """
+        items = request.data
+        if not isinstance(items, list):
+            return Response({"detail": "Expected a list of articles."}, status=status.HTTP_400_BAD_REQUEST)
+        if len(items) > self.bulk_max_items:
+            return Response(
+                {"detail": f"At most {self.bulk_max_items} articles per request."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
         
-        serializer = self.get_serializer(queryset, many=True)
-        return Response(serializer.data)
\ No newline at end of file
+        creating = request.method == 'POST'
+        try:
+            written, results = write_bulk_request(
+                items,
+                request.user,
+                self.get_serializer_context(),
+                instances=None if creating else self.get_queryset(),
+                can_change=lambda article: IsAuthorOrAdmin().has_object_permission(request, self, article),
+            )
+        except IntegrityError:
+            return Response(
+                {"detail": "Conflicting concurrent write, nothing was saved. Retry the request."},
+                status=status.HTTP_409_CONFLICT
+            )
+        
+        if written == len(items):
+            response_status = status.HTTP_201_CREATED if creating else status.HTTP_200_OK
+        elif written:
+            response_status = status.HTTP_207_MULTI_STATUS
+        else:
+            response_status = status.HTTP_400_BAD_REQUEST
+        return Response(
+            {'written': written, 'failed': len(items) - written, 'results': results},
+            status=response_status
+        )
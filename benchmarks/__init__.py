@@ -0,0 +1,15 @@
+"""
+benchmarks/
+
+Performance experiments for the Mini CMS API. Everything runs against a
+separate benchmark database (never the configured one).
+
+The endpoint suite (benchmarks.suite) is a management command:
+
+    python manage.py run_benchmarks --articles 1000000 --output before.json
+    python manage.py run_benchmarks --articles 1000000 --compare before.json
+
+Focused experiments are modules, e.g.:
+
+    python -m benchmarks.visibility_queryset --articles 1000000
+"""
@@ -0,0 +1,89 @@
+"""
+benchmarks/list_fast_path.py
+
+Rows per second for one article list page, serializer path vs fast path:
+
+    serializer:  ArticleListSerializer (batch-loaded nested relations)
+                 rendered with the stock JSONRenderer
+    fast:        one joined .values() query turned into dicts by
+                 articles.fastpath.ValuesPlan, rendered with FastJSONRenderer
+
+Both build and render the same bytes; each variant is measured for
+fetch + build and fetch + build + render.
+
+Run: python -m benchmarks.list_fast_path --articles 100000
+"""
+import argparse
+from .utils import setup_django, benchmark_database, ensure_dataset, measure, print_table
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--articles', type=int, default=100000)
+    parser.add_argument('--authors', type=int, default=50)
+    parser.add_argument('--page-sizes', type=int, nargs='+', default=[10, 100, 1000])
+    parser.add_argument('--repeat', type=int, default=50)
+    parser.add_argument('--fresh', action='store_true', help='Rebuild the benchmark database')
+    args = parser.parse_args(argv)
+
+    setup_django()
+    from rest_framework.renderers import JSONRenderer
+    from rest_framework.request import Request
+    from rest_framework.test import APIRequestFactory
+    from articles.fastpath import ValuesPlan
+    from articles.models import Article
+    from articles.renderers import FastJSONRenderer
+    from articles.serializers import ArticleListSerializer
+
+    request = Request(APIRequestFactory().get('/api/articles/published/'))
+    ordering_fields = ['created_at', 'updated_at', 'views_count', 'title']
+
+    def published():
+        return Article.objects.filter(status='published').order_by('-created_at', '-id')
+
+    def serializer_page(page_size):
+        page = list(published()[:page_size])
+        return ArticleListSerializer(page, many=True, context={'request': request}).data
+
+    def fast_page(page_size):
+        queryset = published()
+        serializer = ArticleListSerializer(context={'request': request})
+        plan = ValuesPlan.for_serializer(serializer, queryset, request, ordering_fields)
+        return plan.render(queryset.values(*plan.paths)[:page_size])
+
+    variants = {
+        'serializer': (serializer_page, JSONRenderer()),
+        'fast': (fast_page, FastJSONRenderer()),
+    }
+
+    with benchmark_database(keepdb=not args.fresh):
+        ensure_dataset(args.articles, authors=args.authors)
+
+        rows = []
+        for page_size in args.page_sizes:
+            expected = None
+            for name, (build, renderer) in variants.items():
+                body = renderer.render(build(page_size))
+                if expected is None:
+                    expected = body
+                elif body != expected:
+                    raise SystemExit(f'{name} output differs from the serializer path at page_size={page_size}')
+
+                measures = [
+                    ('fetch + build', lambda: build(page_size)),
+                    ('fetch + build + render', lambda: renderer.render(build(page_size))),
+                ]
+                for label, fn in measures:
+                    stats = measure(fn, repeat=args.repeat)
+                    rows.append({
+                        'page_size': page_size,
+                        'variant': name,
+                        'measure': label,
+                        'rows_per_s': round(page_size / (stats['mean_ms'] / 1000)),
+                        **stats,
+                    })
+
+        print()
+        print_table(rows, ['page_size', 'variant', 'measure', 'rows_per_s', 'p50_ms', 'p95_ms', 'mean_ms'])
+
+if __name__ == '__main__':
+    main()
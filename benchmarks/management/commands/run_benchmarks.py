@@ -0,0 +1,91 @@
+"""
+benchmarks/management/commands/run_benchmarks.py
+"""
+import json
+from datetime import datetime, timezone
+
+from django.core.management.base import BaseCommand, CommandError
+from django.test.utils import override_settings
+from benchmarks.suite import (
+    SuiteRunner, default_scenarios, ensure_scraped_articles, load_fixtures, environment, compare,
+)
+from benchmarks.utils import benchmark_database, ensure_dataset, print_table
+
+class Command(BaseCommand):
+    help = (
+        'Benchmark every API endpoint in-process (test client) against a '
+        'synthetic dataset in the test database; writes JSON results'
+    )
+    
+    def add_arguments(self, parser):
+        parser.add_argument('--articles', type=int, default=100000, help='Dataset size (default: 100000)')
+        parser.add_argument('--users', type=int, default=1000, help='Sample users (default: 1000)')
+        parser.add_argument('--categories', type=int, default=50, help='Sample categories (default: 50)')
+        parser.add_argument('--scraped', type=int, default=10000, help='Scraped articles (default: 10000)')
+        parser.add_argument('--repeat', type=int, default=30, help='Timed requests per scenario (default: 30)')
+        parser.add_argument('--warmup', type=int, default=3, help='Untimed requests per scenario (default: 3)')
+        parser.add_argument('--only', nargs='+', metavar='NAME', help='Scenario names or tags to run')
+        parser.add_argument('--output', help='Write the results to this JSON file')
+        parser.add_argument('--compare', metavar='JSON', help='Print the change against an earlier results file')
+        parser.add_argument(
+            '--with-cache', action='store_true',
+            help='Keep the anonymous response cache on (default: off, so the real work is measured)'
+        )
+        parser.add_argument('--no-allocations', action='store_true', help='Skip the tracemalloc pass')
+        parser.add_argument('--fresh', action='store_true', help='Rebuild the benchmark database')
+    
+    def handle(self, *args, **options):
+        scenarios = default_scenarios()
+        if options['only']:
+            wanted = set(options['only'])
+            scenarios = [s for s in scenarios if s.name in wanted or wanted & set(s.tags)]
+            if not scenarios:
+                raise CommandError('No scenario matches --only')
+        
+        previous = None
+        if options['compare']:
+            with open(options['compare']) as f:
+                previous = json.load(f)
+        
+        with benchmark_database(keepdb=not options['fresh']):
+            ensure_dataset(
+                options['articles'], authors=options['users'], categories=options['categories'],
+                log=self.stdout.write,
+            )
+            ensure_scraped_articles(options['scraped'])
+            
+            runner = SuiteRunner(
+                load_fixtures(),
+                repeat=options['repeat'],
+                warmup=options['warmup'],
+                trace_allocations=not options['no_allocations'],
+            )
+            results = []
+            with override_settings(API_CACHE_ENABLED=options['with_cache']):
+                for scenario in scenarios:
+                    self.stdout.write(f'  {scenario.name}...')
+                    results.append(runner.run(scenario))
+        
+        document = {
+            'created': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+            'environment': environment(),
+            'dataset': {key: options[key] for key in ('articles', 'users', 'categories', 'scraped')},
+            'settings': {key: options[key] for key in ('repeat', 'warmup', 'with_cache')},
+            'results': results,
+        }
+        
+        self.stdout.write('')
+        print_table(results, ['name', 'status', 'queries', 'p50_ms', 'p95_ms', 'p99_ms', 'alloc_peak_kb'], write=self.stdout.write)
+        failed = [r['name'] for r in results if not r['ok']]
+        if failed:
+            self.stdout.write(self.style.WARNING(f'⚠ Unexpected status for: {", ".join(failed)}'))
+        
+        if previous is not None:
+            self.stdout.write('')
+            print_table(compare(previous, document), ['name', 'p50_before', 'p50_after', 'p50_change', 'queries'], write=self.stdout.write)
+        
+        if options['output']:
+            with open(options['output'], 'w') as f:
+                json.dump(document, f, indent=2, sort_keys=True)
+                f.write('\n')
+            self.stdout.write(self.style.SUCCESS(f'✓ Results written to {options["output"]}'))
@@ -0,0 +1,82 @@
+"""
+benchmarks/nested_serialization.py
+
+Serialization cost of one article page, before and after batch-loading
+and memoizing the nested author/category serializers:
+
+    before:  select_related('author', 'category') + plain nested
+             UserSerializer/CategorySerializer for every row
+    after:   ArticleListSerializer (BatchLoadingListSerializer, one query
+             per relation, each distinct author/category rendered once)
+
+Run: python -m benchmarks.nested_serialization --articles 100000
+"""
+import argparse
+from .utils import setup_django, benchmark_database, ensure_dataset, measure, print_table
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--articles', type=int, default=100000)
+    parser.add_argument('--authors', type=int, default=50)
+    parser.add_argument('--page-sizes', type=int, nargs='+', default=[10, 100])
+    parser.add_argument('--repeat', type=int, default=50)
+    parser.add_argument('--fresh', action='store_true', help='Rebuild the benchmark database')
+    args = parser.parse_args(argv)
+
+    setup_django()
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+    from rest_framework import serializers
+    from accounts.serializers import UserSerializer
+    from articles.models import Article
+    from articles.serializers import ArticleListSerializer, CategorySerializer
+
+    class LegacyArticleListSerializer(serializers.ModelSerializer):
+        author = UserSerializer(read_only=True)
+        category = CategorySerializer(read_only=True)
+
+        class Meta:
+            model = Article
+            fields = ['id', 'title', 'slug', 'description', 'category', 'author', 'status', 'featured_image', 'views_count', 'created_at', 'updated_at']
+
+    variants = {
+        'before': (LegacyArticleListSerializer, lambda: Article.objects.select_related('author', 'category')),
+        'after': (ArticleListSerializer, lambda: Article.objects.all()),
+    }
+
+    with benchmark_database(keepdb=not args.fresh):
+        ensure_dataset(args.articles, authors=args.authors)
+
+        rows = []
+        for page_size in args.page_sizes:
+            for name, (serializer_class, queryset) in variants.items():
+                def page():
+                    return list(queryset().order_by('-created_at')[:page_size])
+
+                def fetch_and_serialize():
+                    return serializer_class(page(), many=True).data
+
+                # Serialization alone; the page is fetched outside the timer
+                # but a fresh copy is used every time so nothing is cached
+                pages = iter([page() for _ in range(args.repeat + 2)])
+
+                def serialize_only():
+                    return serializer_class(next(pages), many=True).data
+
+                with CaptureQueriesContext(connection) as queries:
+                    fetch_and_serialize()
+
+                for label, fn in [('serialize (incl. batch loads)', serialize_only), ('fetch + serialize', fetch_and_serialize)]:
+                    rows.append({
+                        'page_size': page_size,
+                        'variant': name,
+                        'measure': label,
+                        'queries': len(queries.captured_queries),
+                        **measure(fn, repeat=args.repeat),
+                    })
+
+        print()
+        print_table(rows, ['page_size', 'variant', 'measure', 'queries', 'p50_ms', 'p95_ms', 'mean_ms'])
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,60 @@
+"""
+benchmarks/scraper_concurrency.py
+
+Wall-clock time of one scrape of every source, sequential vs concurrent:
+
+    sequential:  scrape_hackernews() then scrape_dev_to(), one after the
+                 other (how scrape_all used to work)
+    concurrent:  scrape_all(), every source fetched in its own thread
+    unchanged:   scrape_all() of pages that have not changed since the
+                 previous run (conditional requests answered with 304)
+
+Sources are served by a local stub server (scraper.testing) answering
+after --delay seconds, so the numbers measure the scraper, not the
+network.
+
+Run: python -m benchmarks.scraper_concurrency --delay 0.2 0.5 1
+"""
+import argparse
+from .utils import setup_django, benchmark_database, measure, print_table
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--delay', type=float, nargs='+', default=[0.1, 0.5], help='Seconds each source takes to answer')
+    parser.add_argument('--items', type=int, default=30, help='Articles per source page')
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args(argv)
+
+    setup_django()
+    from scraper.models import CrawlSourceState
+    from scraper.scraper import ArticleScraper
+    from scraper.testing import stub_server, hackernews_page, dev_to_page
+
+    with benchmark_database(keepdb=False):
+        rows = []
+        for delay in args.delay:
+            pages = {'/hn': (hackernews_page(args.items), delay), '/devto': (dev_to_page(args.items), delay)}
+            with stub_server(pages) as server:
+                scraper = ArticleScraper(urls={'Hacker News': server.url('/hn'), 'dev.to': server.url('/devto')})
+
+                def full(scrape):
+                    # Forget the validators, so pages are downloaded and parsed
+                    def run():
+                        CrawlSourceState.objects.all().delete()
+                        return scrape()
+                    return run
+
+                variants = {
+                    'sequential': full(lambda: scraper.scrape_hackernews(args.items) + scraper.scrape_dev_to(args.items)),
+                    'concurrent': full(lambda: scraper.scrape_all(limit=None, per_source_limit=args.items)),
+                    'unchanged': lambda: scraper.scrape_all(limit=None, per_source_limit=args.items),
+                }
+                for name, fn in variants.items():
+                    stats = measure(fn, repeat=args.repeat, warmup=1)
+                    rows.append({'delay_s': delay, 'variant': name, **stats})
+
+        print()
+        print_table(rows, ['delay_s', 'variant', 'p50_ms', 'p95_ms', 'mean_ms'])
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,262 @@
+"""
+benchmarks/suite.py
+
+In-process benchmark of every API endpoint: each scenario is one request
+sent through the Django test client (full middleware, authentication,
+routing, serialization and rendering) against the synthetic dataset.
+
+For every scenario the suite records latency percentiles, the number of
+SQL queries of one request and its memory allocations (tracemalloc peak,
+measured in a separate pass because tracing slows Python down).
+"""
+import platform
+import subprocess
+import time
+import tracemalloc
+from dataclasses import dataclass, field
+from typing import Callable, Optional
+
+import django
+from django.db import connection, transaction
+from .utils import summarize
+
+@dataclass
+class Scenario:
+    name: str
+    method: str
+    path: str
+    user: Optional[str] = None  # None (anonymous), 'author' or 'admin'
+    data: Optional[Callable] = None  # builds the request body from the fixtures
+    rollback: bool = False  # run inside a transaction that is rolled back
+    expected_status: int = 200
+    tags: tuple = field(default_factory=tuple)
+
+def default_scenarios():
+    """
+    One scenario per endpoint (and per interesting variant of it)
+    """
+    return [
+        # accounts
+        Scenario('auth-login', 'post', '/api/auth/login/', data=lambda f: {'username': f['author'].username, 'password': f['password']}, tags=('auth',)),
+        Scenario('auth-token-refresh', 'post', '/api/auth/token/refresh/', data=lambda f: {'refresh': f['refresh_token']}, tags=('auth',)),
+        Scenario('auth-profile', 'get', '/api/auth/profile/', user='author', tags=('auth',)),
+        Scenario(
+            'auth-register', 'post', '/api/auth/register/', rollback=True, expected_status=201,
+            data=lambda f: {'username': 'bench_new_user', 'email': 'new@example.com', 'password': 'Bench-pass-123', 'password2': 'Bench-pass-123'},
+            tags=('auth',),
+        ),
+        # articles
+        Scenario('articles-list-anon', 'get', '/api/articles/', tags=('articles',)),
+        Scenario('articles-list-author', 'get', '/api/articles/', user='author', tags=('articles',)),
+        Scenario('articles-list-admin-100', 'get', '/api/articles/?page_size=100', user='admin', tags=('articles',)),
+        Scenario('articles-list-deep-page', 'get', '/api/articles/?page={deep_page}', tags=('articles',)),
+        Scenario('articles-list-cursor', 'get', '/api/articles/?pagination=cursor&page_size=100', tags=('articles',)),
+        Scenario('articles-list-filtered', 'get', '/api/articles/?category={category}&ordering=-views_count', tags=('articles',)),
+        Scenario('articles-list-sparse', 'get', '/api/articles/?fields=id,title,author.username&page_size=100', tags=('articles',)),
+        Scenario('articles-search', 'get', '/api/articles/?search=python%20cache', tags=('articles',)),
+        Scenario('articles-retrieve', 'get', '/api/articles/{article}/', tags=('articles',)),
+        Scenario('articles-published', 'get', '/api/articles/published/', tags=('articles',)),
+        Scenario('articles-drafts', 'get', '/api/articles/drafts/', user='author', tags=('articles',)),
+        Scenario('articles-my-articles', 'get', '/api/articles/my_articles/', user='author', tags=('articles',)),
+        Scenario('articles-export-author', 'get', '/api/articles/export/?author={author}', user='author', tags=('articles',)),
+        Scenario(
+            'articles-create', 'post', '/api/articles/', user='author', rollback=True, expected_status=201,
+            data=lambda f: {'title': 'Benchmark create', 'description': 'd', 'content': 'c', 'category': f['category'].pk, 'status': 'published'},
+            tags=('articles', 'write'),
+        ),
+        Scenario(
+            'articles-bulk-create-100', 'post', '/api/articles/bulk/', user='author', rollback=True, expected_status=201,
+            data=lambda f: [
+                {'title': f'Benchmark bulk {i}', 'description': 'd', 'content': 'c', 'category': f['category'].pk}
+                for i in range(100)
+            ],
+            tags=('articles', 'write'),
+        ),
+        # categories
+        Scenario('categories-list', 'get', '/api/categories/', tags=('categories',)),
+        Scenario('categories-retrieve', 'get', '/api/categories/{category}/', tags=('categories',)),
+        # scraper
+        Scenario('scraper-list', 'get', '/api/scraper/articles/', tags=('scraper',)),
+        Scenario('scraper-latest', 'get', '/api/scraper/articles/latest/?limit=50', tags=('scraper',)),
+        Scenario('scraper-retrieve', 'get', '/api/scraper/articles/{scraped}/', tags=('scraper',)),
+    ]
+
+def ensure_scraped_articles(count, batch_size=10000):
+    """
+    Make sure at least `count` scraped articles exist
+    """
+    from scraper.models import ScrapedArticle
+
+    existing = ScrapedArticle.objects.count()
+    for start in range(existing, count, batch_size):
+        ScrapedArticle.objects.bulk_create([
+            ScrapedArticle(title=f'Scraped article {i}', url=f'https://example.com/bench/{i}', source='benchmark')
+            for i in range(start, min(start + batch_size, count))
+        ])
+
+def load_fixtures():
+    """
+    Objects the scenarios refer to: the busiest sample author, an admin,
+    a category, an article and a scraped article, plus JWT credentials
+    """
+    from django.conf import settings
+    from django.contrib.auth import get_user_model
+    from django.db.models import Count
+    from rest_framework_simplejwt.tokens import RefreshToken
+    from articles.models import Article, Category
+    from articles.synthetic import SAMPLE_PASSWORD
+    from scraper.models import ScrapedArticle
+
+    User = get_user_model()
+    author = User.objects.filter(role='author').annotate(n=Count('articles')).order_by('-n').first()
+    admin = User.objects.filter(role='admin').order_by('pk').first()
+    if admin is None:
+        admin = User.objects.create_user(username='bench_admin', password=SAMPLE_PASSWORD, role='admin')
+    refresh = RefreshToken.for_user(author)
+    return {
+        'author': author,
+        'admin': admin,
+        'password': SAMPLE_PASSWORD,
+        'refresh_token': str(refresh),
+        'tokens': {
+            'author': str(refresh.access_token),
+            'admin': str(RefreshToken.for_user(admin).access_token),
+        },
+        'category': Category.objects.order_by('-published_articles_count').first(),
+        'article': Article.objects.filter(status='published').order_by('-created_at').first(),
+        'scraped': ScrapedArticle.objects.order_by('pk').first(),
+        # Halfway through the anonymous listing
+        'deep_page': max(Article.objects.filter(status='published').count() // (2 * settings.REST_FRAMEWORK['PAGE_SIZE']), 1),
+    }
+
+class SuiteRunner:
+    def __init__(self, fixtures, repeat=30, warmup=3, trace_allocations=True):
+        from rest_framework.test import APIClient
+
+        self.fixtures = fixtures
+        self.repeat = repeat
+        self.warmup = warmup
+        self.trace_allocations = trace_allocations
+        self.client = APIClient()
+
+    def resolve_path(self, scenario):
+        return scenario.path.format(
+            author=self.fixtures['author'].pk,
+            category=self.fixtures['category'].pk,
+            article=self.fixtures['article'].pk,
+            scraped=self.fixtures['scraped'].pk if self.fixtures['scraped'] else 0,
+            deep_page=self.fixtures['deep_page'],
+        )
+
+    def request(self, scenario):
+        """
+        Send the scenario's request once and return the status code; the
+        body of streaming responses is consumed
+        """
+        headers = {}
+        if scenario.user:
+            headers['HTTP_AUTHORIZATION'] = f'Bearer {self.fixtures["tokens"][scenario.user]}'
+        data = scenario.data(self.fixtures) if scenario.data else None
+
+        def send():
+            response = getattr(self.client, scenario.method)(self.resolve_path(scenario), data, format='json', **headers)
+            if response.streaming:
+                for _ in response.streaming_content:
+                    pass
+            return response.status_code
+
+        if not scenario.rollback:
+            return send()
+        with transaction.atomic():
+            status_code = send()
+            transaction.set_rollback(True)
+        return status_code
+
+    def run(self, scenario):
+        from articles.view_counter import view_counter
+
+        for _ in range(self.warmup):
+            self.request(scenario)
+
+        # An execute_wrapper rather than CaptureQueriesContext: the latter
+        # reads connection.queries_log, which stops growing once full
+        queries = []
+
+        def record(execute, sql, params, many, context):
+            queries.append(sql)
+            return execute(sql, params, many, context)
+
+        with connection.execute_wrapper(record):
+            status_code = self.request(scenario)
+
+        samples = []
+        for _ in range(self.repeat):
+            started = time.perf_counter()
+            self.request(scenario)
+            samples.append((time.perf_counter() - started) * 1000)
+
+        result = {
+            'name': scenario.name,
+            'method': scenario.method.upper(),
+            'path': scenario.path,
+            'user': scenario.user or 'anonymous',
+            'status': status_code,
+            'ok': status_code == scenario.expected_status,
+            # A rolled-back write also runs SAVEPOINT/ROLLBACK; they are not
+            # part of the endpoint's cost
+            'queries': sum(1 for sql in queries if not sql.upper().startswith(('SAVEPOINT', 'RELEASE', 'ROLLBACK'))),
+            **summarize(samples),
+        }
+
+        if self.trace_allocations:
+            tracemalloc.start()
+            try:
+                before, _ = tracemalloc.get_traced_memory()
+                tracemalloc.reset_peak()
+                self.request(scenario)
+                after, peak = tracemalloc.get_traced_memory()
+            finally:
+                tracemalloc.stop()
+            result['alloc_peak_kb'] = round((peak - before) / 1024, 1)
+            result['alloc_retained_kb'] = round((after - before) / 1024, 1)
+
+        view_counter.flush()
+        return result
+
+def environment():
+    """
+    What the numbers were measured on, stored with the results
+    """
+    try:
+        commit = subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        'commit': commit,
+        'python': platform.python_version(),
+        'django': django.get_version(),
+        'database': connection.vendor,
+        'machine': platform.machine(),
+    }
+
+def compare(previous, current):
+    """
+    Rows pairing each scenario of `current` with the same one in
+    `previous` (both result documents as written by run_benchmarks)
+    """
+    before = {result['name']: result for result in previous['results']}
+    rows = []
+    for result in current['results']:
+        old = before.get(result['name'])
+        if old is None:
+            continue
+        rows.append({
+            'name': result['name'],
+            'p50_before': old['p50_ms'],
+            'p50_after': result['p50_ms'],
+            'p50_change': f"{(result['p50_ms'] / old['p50_ms'] - 1) * 100:+.1f}%" if old['p50_ms'] else '',
+            'queries': f"{old['queries']} -> {result['queries']}",
+        })
+    return rows
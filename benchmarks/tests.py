@@ -0,0 +1,34 @@
+"""
+benchmarks/tests.py
+"""
+from django.test import TestCase, override_settings
+from articles.synthetic import generate_dataset
+from articles.caching import response_cache
+from .suite import SuiteRunner, default_scenarios, ensure_scraped_articles, load_fixtures
+
+@override_settings(API_CACHE_ENABLED=False)
+class BenchmarkSuiteTests(TestCase):
+    def setUp(self):
+        response_cache.cache.clear()
+        generate_dataset(users=5, categories=3, articles=60, batch_size=100)
+        ensure_scraped_articles(5)
+    
+    def test_every_scenario_succeeds(self):
+        """Test that all scenarios hit a working endpoint and get measured"""
+        runner = SuiteRunner(load_fixtures(), repeat=2, warmup=0, trace_allocations=True)
+        for scenario in default_scenarios():
+            result = runner.run(scenario)
+            self.assertTrue(result['ok'], f'{scenario.name} answered {result["status"]}')
+            self.assertIsInstance(result['queries'], int)
+            self.assertIn('p99_ms', result)
+            self.assertIn('alloc_peak_kb', result)
+    
+    def test_writes_are_rolled_back(self):
+        """Test that write scenarios leave the dataset unchanged"""
+        from articles.models import Article
+        count = Article.objects.count()
+        runner = SuiteRunner(load_fixtures(), repeat=1, warmup=0, trace_allocations=False)
+        for scenario in default_scenarios():
+            if 'write' in scenario.tags:
+                runner.run(scenario)
+        self.assertEqual(Article.objects.count(), count)
@@ -0,0 +1,82 @@
+"""
+benchmarks/utils.py
+"""
+import os
+import statistics
+import time
+from contextlib import contextmanager
+
+def setup_django():
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'mini_cms.settings')
+    import django
+    django.setup()
+
+@contextmanager
+def benchmark_database(keepdb=True):
+    """
+    Run against the test database ("test_<NAME>") so benchmarks never touch
+    real data. With keepdb the generated dataset is reused between runs.
+    """
+    from django.db import connection
+    from django.test.utils import setup_test_environment, teardown_test_environment
+
+    setup_test_environment()
+    old_name = connection.settings_dict['NAME']
+    connection.creation.create_test_db(verbosity=0, keepdb=keepdb)
+    try:
+        yield connection
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0, keepdb=keepdb)
+        teardown_test_environment()
+
+def ensure_dataset(articles, authors=1000, categories=20, draft_ratio=0.2, seed=42, batch_size=10000, log=print):
+    """
+    Make sure the benchmark database holds at least `articles` articles
+    spread over `authors` authors and `categories` categories (the
+    deterministic dataset of create_sample_data --scale)
+    """
+    from articles.synthetic import generate_dataset
+
+    generate_dataset(
+        users=authors,
+        categories=categories,
+        articles=articles,
+        seed=seed,
+        draft_ratio=draft_ratio,
+        batch_size=batch_size,
+        log=log,
+    )
+
+def measure(fn, repeat=20, warmup=2):
+    """
+    Call `fn` repeatedly and return latency percentiles in milliseconds
+    """
+    for _ in range(warmup):
+        fn()
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - started) * 1000)
+    return summarize(samples)
+
+def summarize(samples):
+    samples = sorted(samples)
+    if len(samples) > 1:
+        cuts = statistics.quantiles(samples, n=100, method='inclusive')
+        p50, p95, p99 = cuts[49], cuts[94], cuts[98]
+    else:
+        p50 = p95 = p99 = samples[0]
+    return {
+        'n': len(samples),
+        'mean_ms': round(statistics.fmean(samples), 3),
+        'p50_ms': round(p50, 3),
+        'p95_ms': round(p95, 3),
+        'p99_ms': round(p99, 3),
+    }
+
+def print_table(rows, columns, write=print):
+    widths = [max(len(str(c)), *(len(str(r.get(c, ''))) for r in rows)) for c in columns]
+    write('  '.join(str(c).ljust(w) for c, w in zip(columns, widths)))
+    for row in rows:
+        write('  '.join(str(row.get(c, '')).ljust(w) for c, w in zip(columns, widths)))
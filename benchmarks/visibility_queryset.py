@@ -0,0 +1,66 @@
+"""
+benchmarks/visibility_queryset.py
+
+Compare the author-visibility queryset used by ArticleViewSet for logged-in
+non-admins before and after dropping OR + DISTINCT:
+
+    legacy:  filter(Q(author=user) | Q(status='published')).distinct()
+    current: filter(Q(status='published') | Q(author=user, status='draft'))
+
+and time the real /api/articles/ endpoint for that author.
+
+Run: python -m benchmarks.visibility_queryset --articles 1000000
+"""
+import argparse
+from .utils import setup_django, benchmark_database, ensure_dataset, measure, print_table
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--articles', type=int, default=1000000)
+    parser.add_argument('--authors', type=int, default=1000)
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('--deep-offset', type=int, default=10000)
+    parser.add_argument('--explain', action='store_true', help='Print the query plans')
+    parser.add_argument('--fresh', action='store_true', help='Rebuild the benchmark database')
+    args = parser.parse_args(argv)
+
+    setup_django()
+    from django.contrib.auth import get_user_model
+    from django.db.models import Q
+    from rest_framework.test import APIClient
+    from articles.models import Article
+
+    with benchmark_database(keepdb=not args.fresh):
+        ensure_dataset(args.articles, authors=args.authors)
+        author = get_user_model().objects.filter(role='author').order_by('pk').first()
+        base = Article.objects.select_related('author', 'category').order_by('-created_at')
+        querysets = {
+            'legacy (OR + DISTINCT)': base.filter(Q(author=author) | Q(status='published')).distinct(),
+            'current (disjoint OR)': base.filter(Q(status='published') | Q(author=author, status='draft')),
+        }
+
+        rows = []
+        for name, queryset in querysets.items():
+            offset = args.deep_offset
+            for label, fn in [
+                ('first page', lambda qs=queryset: list(qs[:10])),
+                (f'page at offset {offset}', lambda qs=queryset: list(qs[offset:offset + 10])),
+                ('count', lambda qs=queryset: qs.count()),
+            ]:
+                rows.append({'queryset': name, 'operation': label, **measure(fn, repeat=args.repeat)})
+            if args.explain:
+                print(f'\n{name}:\n{queryset[:10].explain()}\n')
+
+        client = APIClient()
+        client.force_authenticate(user=author)
+        for label, url in [
+            ('GET /api/articles/', '/api/articles/'),
+            ('GET /api/articles/?pagination=cursor', '/api/articles/?pagination=cursor'),
+        ]:
+            rows.append({'queryset': 'endpoint', 'operation': label, **measure(lambda u=url: client.get(u), repeat=args.repeat)})
+
+        print(f'\n{Article.objects.count()} articles, author id {author.pk}\n')
+        print_table(rows, ['queryset', 'operation', 'p50_ms', 'p95_ms', 'p99_ms', 'mean_ms'])
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,306 @@
+"""
+mini_cms/metrics.py
+"""
+import atexit
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from collections import defaultdict
+from contextlib import contextmanager
+from pathlib import Path
+
+from django.conf import settings
+from django.http import HttpResponse
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - not available on Windows
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+QUERY_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+SCRAPER_BUCKETS = (0.5, 1, 2.5, 5, 10, 30, 60, 120)
+
+# name: (type, help, histogram buckets)
+METRICS = {
+    'http_requests_total': ('counter', 'HTTP requests by view, method and status', None),
+    'http_request_duration_seconds': ('histogram', 'HTTP request latency', LATENCY_BUCKETS),
+    'http_request_queries': ('histogram', 'SQL queries per HTTP request', QUERY_BUCKETS),
+    'scraper_run_duration_seconds': ('histogram', 'Duration of one scrape of one source', SCRAPER_BUCKETS),
+    'scraper_articles_total': ('counter', 'Articles returned by scrapes', None),
+}
+
+class MetricsRegistry:
+    """
+    Prometheus counters and histograms shared by all worker processes.
+
+    Every process keeps its own totals in memory (one short lock per
+    update) and writes them to METRICS_DIR/<process>.json at most every
+    METRICS_FLUSH_INTERVAL seconds and at exit, replacing the file
+    atomically. /metrics adds up the files of all processes, so each
+    gunicorn worker can serve the whole picture without any IPC.
+
+    When /metrics is read, the files of processes that have exited are
+    folded into archive.json, so counters never go down and the directory
+    does not grow with every worker ever started. Clear METRICS_DIR when
+    the server is (re)started.
+    """
+    default_interval = 5.0
+    archive_name = 'archive.json'
+
+    def __init__(self):
+        self._counters = defaultdict(float)
+        # key -> [bucket counts..., +Inf count, sum]
+        self._histograms = {}
+        self._lock = threading.Lock()
+        self._last_flush = 0.0
+        self._pid = None
+        self._filename = None
+
+    @property
+    def directory(self):
+        return Path(getattr(settings, 'METRICS_DIR', settings.BASE_DIR / 'cache' / 'metrics'))
+
+    @property
+    def interval(self):
+        return getattr(settings, 'METRICS_FLUSH_INTERVAL', self.default_interval)
+
+    def inc(self, name, labels, amount=1):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._counters[key] += amount
+        self.maybe_flush()
+
+    def observe(self, name, labels, value):
+        buckets = METRICS[name][2]
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            counts = self._histograms.get(key)
+            if counts is None:
+                counts = self._histograms[key] = [0] * (len(buckets) + 1) + [0.0]
+            for i, bound in enumerate(buckets):
+                if value <= bound:
+                    counts[i] += 1
+                    break
+            else:
+                counts[len(buckets)] += 1
+            counts[-1] += value
+        self.maybe_flush()
+
+    def maybe_flush(self):
+        if time.monotonic() - self._last_flush >= self.interval:
+            self.flush()
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                'counters': [[name, dict(labels), value] for (name, labels), value in self._counters.items()],
+                'histograms': [[name, dict(labels), list(counts)] for (name, labels), counts in self._histograms.items()],
+            }
+
+    def flush(self):
+        """
+        Write this process's totals to its file in METRICS_DIR
+        """
+        self._last_flush = time.monotonic()
+        if self._pid != os.getpid():
+            # A forked worker starts from the parent's totals under its own
+            # name; the parent's file still accounts for them
+            if self._pid is None:
+                atexit.register(self.flush)
+            else:
+                self.reset()
+            self._pid = os.getpid()
+            self._filename = f'{self._pid}-{uuid.uuid4().hex[:8]}.json'
+
+        snapshot = self.snapshot()
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            path = self.directory / self._filename
+            temporary = path.with_suffix('.tmp')
+            temporary.write_text(json.dumps(snapshot))
+            os.replace(temporary, path)
+        except OSError:
+            logger.exception('Failed to write metrics to %s', self.directory)
+
+    def reset(self):
+        with self._lock:
+            self._counters.clear()
+            self._histograms.clear()
+
+    def collect(self):
+        """
+        Totals of all processes: ({key: value}, {key: counts})
+        """
+        self.flush()
+        with self.directory_lock():
+            self.prune()
+            return self.merge(self.directory.glob('*.json'))
+
+    @contextmanager
+    def directory_lock(self):
+        """
+        Serialize readers of METRICS_DIR across processes (a no-op without
+        fcntl), so that no file is counted twice while being archived
+        """
+        if fcntl is None:
+            yield
+            return
+        with open(self.directory / '.lock', 'a') as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+    def prune(self):
+        """
+        Fold the files of processes that have exited into archive.json
+        """
+        dead = [path for path in self.directory.glob('*.json') if not process_alive(path.stem)]
+        if not dead:
+            return
+        archive = self.directory / self.archive_name
+        counters, histograms = self.merge([archive, *dead])
+        temporary = archive.with_suffix('.tmp')
+        temporary.write_text(json.dumps({
+            'counters': [[name, dict(labels), value] for (name, labels), value in counters.items()],
+            'histograms': [[name, dict(labels), counts] for (name, labels), counts in histograms.items()],
+        }))
+        os.replace(temporary, archive)
+        for path in dead:
+            path.unlink(missing_ok=True)
+
+    def merge(self, paths):
+        """
+        Totals of the snapshot files `paths`; unreadable ones are skipped
+        """
+        counters = defaultdict(float)
+        histograms = {}
+        for path in paths:
+            try:
+                data = json.loads(path.read_text())
+            except (OSError, ValueError):
+                continue
+            for name, labels, value in data['counters']:
+                counters[(name, tuple(sorted(labels.items())))] += value
+            for name, labels, counts in data['histograms']:
+                key = (name, tuple(sorted(labels.items())))
+                if key in histograms:
+                    histograms[key] = [a + b for a, b in zip(histograms[key], counts)]
+                else:
+                    histograms[key] = counts
+        return counters, histograms
+
+    def render(self):
+        """
+        All metrics in the Prometheus text exposition format
+        """
+        counters, histograms = self.collect()
+        lines = []
+        for name, (kind, help_text, buckets) in METRICS.items():
+            lines.append(f'# HELP {name} {help_text}')
+            lines.append(f'# TYPE {name} {kind}')
+            if kind == 'counter':
+                for (metric, labels), value in sorted(counters.items()):
+                    if metric == name:
+                        lines.append(f'{name}{format_labels(labels)} {format_value(value)}')
+                continue
+            for (metric, labels), counts in sorted(histograms.items()):
+                if metric != name:
+                    continue
+                cumulative = 0
+                for bound, count in zip(buckets + ('+Inf',), counts):
+                    cumulative += count
+                    le = bound if bound == '+Inf' else format_value(bound)
+                    lines.append(f'{name}_bucket{format_labels(labels + (("le", le),))} {cumulative}')
+                lines.append(f'{name}_sum{format_labels(labels)} {format_value(counts[-1])}')
+                lines.append(f'{name}_count{format_labels(labels)} {cumulative}')
+        lines.extend(cache_metrics())
+        return '\n'.join(lines) + '\n'
+
+def process_alive(name):
+    """
+    Whether the process that wrote the file `<pid>-<id>` is still running
+    on this host; names without a pid (the archive) count as alive
+    """
+    pid = name.split('-', 1)[0]
+    if not pid.isdigit():
+        return True
+    try:
+        os.kill(int(pid), 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+def format_labels(labels):
+    if not labels:
+        return ''
+    escaped = (
+        (key, str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n'))
+        for key, value in labels
+    )
+    return '{' + ','.join(f'{key}="{value}"' for key, value in escaped) + '}'
+
+def format_value(value):
+    return repr(float(value)) if isinstance(value, float) and not value.is_integer() else str(int(value))
+
+def cache_metrics():
+    """
+    Response cache counters; they already add up across workers in the
+    cache itself (see articles.caching)
+    """
+    from articles.caching import response_cache
+
+    try:
+        stats = response_cache.stats()
+    except Exception:
+        logger.exception('Failed to read response cache statistics')
+        return []
+    lines = [
+        '# HELP api_response_cache_requests_total Response cache lookups by result',
+        '# TYPE api_response_cache_requests_total counter',
+        f'api_response_cache_requests_total{{result="hit"}} {stats["hits"]}',
+        f'api_response_cache_requests_total{{result="miss"}} {stats["misses"]}',
+        '# HELP api_response_cache_hit_ratio Share of response cache lookups that hit',
+        '# TYPE api_response_cache_hit_ratio gauge',
+    ]
+    if stats['hit_ratio'] is not None:
+        lines.append(f'api_response_cache_hit_ratio {stats["hit_ratio"]}')
+    return lines
+
+metrics = MetricsRegistry()
+
+def view_label(request, view_func):
+    """
+    `basename-action` for viewset routes (article-list, article-published,
+    scraped-article-scrape...), the URL name for other views
+    """
+    actions = getattr(view_func, 'actions', None)
+    basename = getattr(view_func, 'initkwargs', {}).get('basename')
+    if actions and basename:
+        action = actions.get(request.method.lower())
+        if action:
+            return f'{basename}-{action}'
+    match = request.resolver_match
+    return (match.url_name or match.view_name) if match else 'unmatched'
+
+def metrics_view(request):
+    """
+    Prometheus scrape endpoint. Expects `Authorization: Bearer <token>`
+    with METRICS_TOKEN; without a token it is only open when DEBUG is on.
+    """
+    token = getattr(settings, 'METRICS_TOKEN', '')
+    if not token:
+        if not settings.DEBUG:
+            return HttpResponse(status=403)
+    elif request.META.get('HTTP_AUTHORIZATION') != f'Bearer {token}':
+        return HttpResponse(status=401)
+    return HttpResponse(metrics.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
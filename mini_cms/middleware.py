@@ -0,0 +1,367 @@
+"""
+mini_cms/middleware.py
+"""
+import cProfile
+import io
+import logging
+import pstats
+import threading
+import time
+import uuid
+from contextlib import ExitStack, contextmanager
+from pathlib import Path
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import connections
+from django.http import FileResponse
+from django.utils.text import slugify
+
+timing_logger = logging.getLogger('mini_cms.timing')
+profiler_logger = logging.getLogger('mini_cms.profiler')
+
+class RequestTimings:
+    """
+    Where one request spent its time, in milliseconds.
+
+    - db: every SQL statement on every connection (count and duration)
+    - serialize: turning objects into response data, minus the SQL run
+      meanwhile (batch loads); measured by SerializerTimingMixin and the
+      fast list path
+    - app: time inside the view minus its SQL, i.e. all the Python work of
+      building the response data (permissions, filtering, serialization...)
+    - render: turning the response data into bytes (DRF renderers)
+    - total: the whole request as seen by this middleware
+
+    Streaming responses are only timed until the view returns them: the
+    body is generated (and its queries run) after the middleware is done,
+    so neither render nor total include it.
+
+    Available as request.timings to views and to middleware further out.
+    """
+    def __init__(self):
+        self.queries = 0
+        self.db_ms = 0.0
+        self.view_ms = 0.0
+        self.view_db_ms = 0.0
+        self.serialize_ms = 0.0
+        self.render_ms = 0.0
+        self.total_ms = 0.0
+        self._view_started = None
+        self._view_db_started = 0.0
+        self._serializer_depth = 0
+        self._serializer_started = None
+        self._serializer_db_started = 0.0
+        self._render_started = None
+
+    def record_query(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries += 1
+            self.db_ms += (time.perf_counter() - started) * 1000
+
+    def view_started(self):
+        self._view_started = time.perf_counter()
+        self._view_db_started = self.db_ms
+
+    def view_finished(self):
+        if self._view_started is not None:
+            self.view_ms = (time.perf_counter() - self._view_started) * 1000
+            self.view_db_ms = self.db_ms - self._view_db_started
+            self._view_started = None
+
+    def serializer_started(self):
+        # Nested calls (a serializer used inside another) count once
+        self._serializer_depth += 1
+        if self._serializer_depth == 1:
+            self._serializer_started = time.perf_counter()
+            self._serializer_db_started = self.db_ms
+
+    def serializer_finished(self):
+        self._serializer_depth -= 1
+        if self._serializer_depth == 0 and self._serializer_started is not None:
+            elapsed = (time.perf_counter() - self._serializer_started) * 1000
+            self.serialize_ms += max(elapsed - (self.db_ms - self._serializer_db_started), 0.0)
+            self._serializer_started = None
+
+    def render_started(self):
+        self._render_started = time.perf_counter()
+
+    def render_finished(self):
+        if self._render_started is not None:
+            self.render_ms = (time.perf_counter() - self._render_started) * 1000
+            self._render_started = None
+
+    @property
+    def app_ms(self):
+        return max(self.view_ms - self.view_db_ms, 0.0)
+
+    def as_dict(self):
+        return {
+            'queries': self.queries,
+            'db_ms': round(self.db_ms, 2),
+            'serialize_ms': round(self.serialize_ms, 2),
+            'app_ms': round(self.app_ms, 2),
+            'render_ms': round(self.render_ms, 2),
+            'total_ms': round(self.total_ms, 2),
+        }
+
+    def server_timing(self):
+        """
+        Value of the Server-Timing response header
+        """
+        return ', '.join([
+            f'db;dur={self.db_ms:.2f};desc="{self.queries} queries"',
+            f'serialize;dur={self.serialize_ms:.2f}',
+            f'app;dur={self.app_ms:.2f}',
+            f'render;dur={self.render_ms:.2f}',
+            f'total;dur={self.total_ms:.2f}',
+        ])
+
+@contextmanager
+def serializer_timing(request):
+    """
+    Count the block as serialization in request.timings, if it is measured
+    """
+    timings = getattr(request, 'timings', None)
+    if timings is None:
+        yield
+        return
+    timings.serializer_started()
+    try:
+        yield
+    finally:
+        timings.serializer_finished()
+
+class SerializerTimingMixin:
+    """
+    Viewset mixin timing the to_representation() of the serializers it
+    hands out (the work behind serializer.data) as `serialize` in
+    request.timings. List it first among the bases, so it wraps the final
+    serializer.
+    """
+    def get_serializer(self, *args, **kwargs):
+        serializer = super().get_serializer(*args, **kwargs)
+        if getattr(self.request, 'timings', None) is not None:
+            to_representation = serializer.to_representation
+
+            def timed_to_representation(instance):
+                with serializer_timing(self.request):
+                    return to_representation(instance)
+            serializer.to_representation = timed_to_representation
+        return serializer
+
+@contextmanager
+def observe_queries(timings):
+    """
+    Record every query run on any connection in the block into `timings`
+    """
+    with ExitStack() as stack:
+        for connection in connections.all():
+            stack.enter_context(connection.execute_wrapper(timings.record_query))
+        yield timings
+
+class ServerTimingMiddleware:
+    """
+    Measure every request (see RequestTimings), add a Server-Timing header
+    and log one structured line to the 'mini_cms.timing' logger.
+
+    Queries are observed with connection.execute_wrapper, so this works
+    with DEBUG=False. Switched on with SERVER_TIMING_ENABLED; place it near
+    the top of MIDDLEWARE so `total` covers the other middleware.
+    """
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not getattr(settings, 'SERVER_TIMING_ENABLED', False):
+            return self.get_response(request)
+
+        timings = request.timings = RequestTimings()
+        started = time.perf_counter()
+        with observe_queries(timings):
+            response = self.get_response(request)
+        # Responses without a render step (streaming, plain HttpResponse)
+        timings.view_finished()
+        timings.total_ms = (time.perf_counter() - started) * 1000
+
+        response['Server-Timing'] = timings.server_timing()
+        fields = {
+            'method': request.method,
+            'path': request.path,
+            'status': response.status_code,
+            **timings.as_dict(),
+        }
+        timing_logger.info(
+            ' '.join(f'{key}={value}' for key, value in fields.items()),
+            extra={'timings': fields},
+        )
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        timings = getattr(request, 'timings', None)
+        if timings is not None:
+            timings.view_started()
+
+    def process_template_response(self, request, response):
+        # Called after the view returns and right before the (lazy) DRF
+        # Response is rendered
+        timings = getattr(request, 'timings', None)
+        if timings is not None:
+            timings.view_finished()
+            timings.render_started()
+            response.add_post_render_callback(lambda rendered: timings.render_finished())
+        return response
+
+class ProfilerMiddleware:
+    """
+    Profile a single request on demand, in production.
+
+    An admin (User.is_admin, authenticated by session or JWT) sends
+    `X-Profile: 1` or `?profile=1` and the request runs under cProfile;
+    other values are ignored. Place it after AuthenticationMiddleware so
+    session users are recognised.
+    The stats are written to PROFILER_OUTPUT_DIR as NAME.prof (for pstats or
+    snakeviz) plus NAME.txt (top functions by cumulative time), and NAME
+    comes back in the X-Profile response header. With `download` instead
+    of `1` the .prof file is returned as an attachment instead of the
+    normal response.
+
+    Only one request is profiled at a time per process, and at most
+    PROFILER_MAX_PER_MINUTE per minute, counted in the PROFILER_CACHE
+    cache: site-wide when that cache is shared by all workers (file or
+    redis), per process with locmem. Other requests asking for a profile
+    run normally and get `X-Profile: skipped`.
+    """
+    header = 'HTTP_X_PROFILE'
+    query_param = 'profile'
+    modes = ('1', 'download')
+    _lock = threading.Lock()
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        mode = request.META.get(self.header) or request.GET.get(self.query_param)
+        if mode not in self.modes or not getattr(settings, 'PROFILER_ENABLED', False) or not self.is_admin(request):
+            return self.get_response(request)
+
+        if not self.acquire():
+            response = self.get_response(request)
+            response['X-Profile'] = 'skipped'
+            return response
+        try:
+            profile = cProfile.Profile()
+            response = profile.runcall(self.get_response, request)
+        finally:
+            self._lock.release()
+
+        name = self.save(request, profile)
+        profiler_logger.info('Profiled %s %s as %s', request.method, request.path, name)
+        if mode == 'download':
+            response = FileResponse(
+                open(self.output_dir() / f'{name}.prof', 'rb'),
+                as_attachment=True, filename=f'{name}.prof',
+            )
+        response['X-Profile'] = name
+        return response
+
+    def is_admin(self, request):
+        user = getattr(request, 'user', None)
+        if user is None or not user.is_authenticated:
+            # API clients authenticate with JWT, which DRF only checks
+            # inside the view
+            from rest_framework.exceptions import AuthenticationFailed
+            from rest_framework_simplejwt.authentication import JWTAuthentication
+            from rest_framework_simplejwt.exceptions import InvalidToken
+
+            try:
+                authenticated = JWTAuthentication().authenticate(request)
+            except (AuthenticationFailed, InvalidToken):
+                return False
+            if authenticated is None:
+                return False
+            user = authenticated[0]
+        return getattr(user, 'is_admin', False)
+
+    def acquire(self):
+        """
+        Whether this request may be profiled: no other profile running in
+        this process and under the per-minute cap. Holds the lock when true.
+        A request that finds the lock busy does not use up the cap.
+        """
+        if not self._lock.acquire(blocking=False):
+            return False
+        cache = caches[getattr(settings, 'PROFILER_CACHE', 'default')]
+        key = f'profiler:window:{int(time.time() // 60)}'
+        cache.add(key, 0, timeout=120)
+        try:
+            taken = cache.incr(key)
+        except ValueError:
+            taken = 1
+        if taken > getattr(settings, 'PROFILER_MAX_PER_MINUTE', 5):
+            self._lock.release()
+            return False
+        return True
+
+    def output_dir(self):
+        return Path(getattr(settings, 'PROFILER_OUTPUT_DIR', Path(settings.MEDIA_ROOT) / 'profiling'))
+
+    def save(self, request, profile):
+        """
+        Write NAME.prof and NAME.txt; returns NAME
+        """
+        directory = self.output_dir()
+        directory.mkdir(parents=True, exist_ok=True)
+        name = '-'.join([
+            time.strftime('%Y%m%dT%H%M%S'),
+            request.method.lower(),
+            slugify(request.path)[:60] or 'root',
+            uuid.uuid4().hex[:8],
+        ])
+        profile.dump_stats(directory / f'{name}.prof')
+        report = io.StringIO()
+        pstats.Stats(profile, stream=report).sort_stats('cumulative').print_stats(50)
+        (directory / f'{name}.txt').write_text(f'{request.method} {request.get_full_path()}\n{report.getvalue()}')
+        return name
+
+class MetricsMiddleware:
+    """
+    Count requests and observe their latency and number of queries in
+    mini_cms.metrics, labelled by view (`basename-action` for viewsets).
+
+    Reuses request.timings when ServerTimingMiddleware runs further out.
+    """
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not getattr(settings, 'METRICS_ENABLED', False):
+            return self.get_response(request)
+
+        from .metrics import metrics
+
+        timings = getattr(request, 'timings', None)
+        started = time.perf_counter()
+        if timings is None:
+            with observe_queries(RequestTimings()) as timings:
+                response = self.get_response(request)
+            queries = timings.queries
+        else:
+            queries_before = timings.queries
+            response = self.get_response(request)
+            queries = timings.queries - queries_before
+        duration = time.perf_counter() - started
+
+        view = getattr(request, 'metrics_view', 'unmatched')
+        metrics.inc('http_requests_total', {'view': view, 'method': request.method, 'status': str(response.status_code)})
+        metrics.observe('http_request_duration_seconds', {'view': view}, duration)
+        metrics.observe('http_request_queries', {'view': view}, queries)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        from .metrics import view_label
+
+        request.metrics_view = view_label(request, view_func)
@@ -31,15 +31,19 @@ INSTALLED_APPS = [
     'accounts',
     'articles',
     'scraper',
+    'benchmarks',
     
 ]
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'mini_cms.middleware.ServerTimingMiddleware',
+    'mini_cms.middleware.MetricsMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'mini_cms.middleware.ProfilerMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -76,6 +80,41 @@ DATABASES = {
     }
 }
 
+# Caches
+# Anonymous article/category responses are cached in 'api_responses'.
+# API_CACHE_BACKEND: 'locmem' (per process), 'file' (shared on one host) or
+# 'redis' (shared across hosts, needs the redis package).
+# locmem is for development only: writes invalidate the cache by bumping a
+# generation stored in the cache itself, so with several workers each
+# process would keep serving its own stale pages until they expire. It is
+# therefore only the default when DEBUG is on.
+API_CACHE_ENABLED = config('API_CACHE_ENABLED', default=True, cast=bool)
+API_CACHE_BACKEND = config('API_CACHE_BACKEND', default='locmem' if DEBUG else 'file')
+API_CACHE_BACKENDS = {
+    'locmem': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'api-responses',
+    },
+    'file': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': config('API_CACHE_LOCATION', default=str(BASE_DIR / 'cache' / 'api-responses')),
+    },
+    'redis': {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': config('API_CACHE_LOCATION', default='redis://127.0.0.1:6379/1'),
+    },
+}
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'api_responses': {
+        **API_CACHE_BACKENDS[API_CACHE_BACKEND],
+        'TIMEOUT': config('API_CACHE_TIMEOUT', default=300, cast=int),
+    },
+}
+
 # Custom User Model
 AUTH_USER_MODEL = 'accounts.User'
 
@@ -102,6 +141,62 @@ MEDIA_ROOT = BASE_DIR / 'media'
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
+# Article view counts are buffered in memory and flushed every N seconds
+# (0 = write every view through immediately)
+ARTICLE_VIEWS_FLUSH_INTERVAL = config('ARTICLE_VIEWS_FLUSH_INTERVAL', default=5.0, cast=float)
+
+# Article list actions render from .values() rows instead of ModelSerializer
+# and encode JSON with orjson (same output; see articles.fastpath)
+API_FAST_LIST_ENABLED = config('API_FAST_LIST_ENABLED', default=False, cast=bool)
+
+# Per-request query count, DB/serialize/app/render time as a Server-Timing header
+# and a log line on 'mini_cms.timing' (see mini_cms.middleware)
+SERVER_TIMING_ENABLED = config('SERVER_TIMING_ENABLED', default=False, cast=bool)
+
+# Prometheus metrics served at /metrics, aggregated across worker processes
+# through one file per process in METRICS_DIR (see mini_cms.metrics).
+# METRICS_TOKEN is required as a Bearer token to read them; without one
+# the endpoint answers 403 unless DEBUG is on.
+METRICS_ENABLED = config('METRICS_ENABLED', default=True, cast=bool)
+METRICS_DIR = config('METRICS_DIR', default=str(BASE_DIR / 'cache' / 'metrics'))
+METRICS_FLUSH_INTERVAL = config('METRICS_FLUSH_INTERVAL', default=5.0, cast=float)
+METRICS_TOKEN = config('METRICS_TOKEN', default='')
+
+# Scraper source address overrides ({'dev.to': 'https://...'}), how long
+# a scrape job may stay running before the worker gives up on it, and the
+# largest per-source limit POST /scrape/ accepts
+SCRAPER_SOURCE_URLS = {}
+SCRAPE_JOB_TIMEOUT = config('SCRAPE_JOB_TIMEOUT', default=600, cast=int)
+SCRAPE_MAX_LIMIT = config('SCRAPE_MAX_LIMIT', default=100, cast=int)
+
+# `manage.py crawl` schedule: seconds between runs per source (or the
+# default), +/- jitter as a fraction, and the longest backoff after errors
+SCRAPER_CRAWL_INTERVALS = {'Hacker News': 300, 'dev.to': 900}
+SCRAPER_CRAWL_DEFAULT_INTERVAL = config('SCRAPER_CRAWL_DEFAULT_INTERVAL', default=600, cast=int)
+SCRAPER_CRAWL_JITTER = config('SCRAPER_CRAWL_JITTER', default=0.1, cast=float)
+SCRAPER_CRAWL_MAX_BACKOFF = config('SCRAPER_CRAWL_MAX_BACKOFF', default=3600, cast=int)
+
+# Admins can profile one request with `X-Profile: 1` or `?profile=1`
+# (see mini_cms.middleware.ProfilerMiddleware)
+PROFILER_ENABLED = config('PROFILER_ENABLED', default=True, cast=bool)
+PROFILER_MAX_PER_MINUTE = config('PROFILER_MAX_PER_MINUTE', default=5, cast=int)
+# Cache counting profiles per minute. The cap is only site-wide when this
+# cache is shared by every worker; 'default' is locmem, i.e. per process.
+PROFILER_CACHE = config('PROFILER_CACHE', default='api_responses')
+PROFILER_OUTPUT_DIR = config('PROFILER_OUTPUT_DIR', default=str(MEDIA_ROOT / 'profiling'))
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {
+        'mini_cms.timing': {'handlers': ['console'], 'level': 'INFO', 'propagate': False},
+        'mini_cms.profiler': {'handlers': ['console'], 'level': 'INFO', 'propagate': False},
+    },
+}
+
 # REST Framework Settings
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
@@ -0,0 +1,64 @@
+"""
+mini_cms/testing.py
+
+Test helpers shared by the apps' test suites.
+"""
+from contextlib import contextmanager
+
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.test.utils import CaptureQueriesContext
+
+def format_queries(captured_queries):
+    """
+    Numbered SQL of captured queries, for failure messages
+    """
+    return '\n'.join(f'{i}. {query["sql"]}' for i, query in enumerate(captured_queries, start=1))
+
+class QueryCountMixin:
+    """
+    TestCase mixin guarding against query-count regressions.
+
+    assertMaxQueries pins an upper bound for a block; assertConstantQueries
+    checks that a request costs the same number of queries whatever its
+    size, which is what an N+1 breaks. Failures list the SQL that ran.
+    """
+
+    @contextmanager
+    def assertMaxQueries(self, limit, using=DEFAULT_DB_ALIAS):
+        with CaptureQueriesContext(connections[using]) as context:
+            yield context
+        executed = len(context.captured_queries)
+        if executed > limit:
+            self.fail(
+                f'{executed} queries executed, at most {limit} allowed:\n'
+                f'{format_queries(context.captured_queries)}'
+            )
+
+    def assertConstantQueries(self, request, sizes, limit=None, using=DEFAULT_DB_ALIAS):
+        """
+        Call request(size) for every size and check that all of them run
+        the same number of queries (and no more than `limit`). Returns the
+        responses by size.
+        """
+        counts = {}
+        captured = {}
+        responses = {}
+        for size in sizes:
+            with CaptureQueriesContext(connections[using]) as context:
+                responses[size] = request(size)
+            counts[size] = len(context.captured_queries)
+            captured[size] = context.captured_queries
+
+        smallest, largest = min(sizes), max(sizes)
+        if len(set(counts.values())) > 1:
+            self.fail(
+                f'Query count depends on size: {counts}\n'
+                f'--- size {smallest} ---\n{format_queries(captured[smallest])}\n'
+                f'--- size {largest} ---\n{format_queries(captured[largest])}'
+            )
+        if limit is not None and counts[largest] > limit:
+            self.fail(
+                f'{counts[largest]} queries executed, at most {limit} allowed:\n'
+                f'{format_queries(captured[largest])}'
+            )
+        return responses
@@ -0,0 +1,494 @@
+"""
+mini_cms/tests.py
+
+Query-count budgets for every action of the API viewsets. Lists are
+requested at sizes 1, 10 and 100 and must cost the same number of queries
+at every size; the pinned maximum catches extra queries per request.
+"""
+import json
+import os
+import subprocess
+import tempfile
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.test import TestCase, override_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+from rest_framework.test import APIClient
+from rest_framework import status
+from articles.models import Category, Article
+from articles.view_counter import view_counter
+from scraper.models import ScrapedArticle
+from .metrics import metrics
+from .middleware import ProfilerMiddleware
+from .testing import QueryCountMixin
+
+User = get_user_model()
+
+SIZES = (1, 10, 100)
+
+@override_settings(API_CACHE_ENABLED=False)
+class QueryBudgetTestCase(QueryCountMixin, TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_user(username='admin', password='admin123', role='admin')
+        # One author per size, each with their own categories, so related
+        # objects differ from row to row
+        cls.authors = {}
+        for size in SIZES:
+            author = User.objects.create_user(username=f'author{size}', password='author123', role='author')
+            cls.authors[size] = author
+            categories = Category.objects.bulk_create([
+                Category(name=f'Size{size} category {i}', slug=f'size{size}-category-{i}')
+                for i in range(min(size, 10))
+            ])
+            Article.objects.bulk_create([
+                Article(
+                    title=f'Size{size} article {i}',
+                    slug=f'size{size}-article-{i}',
+                    description='Test',
+                    content='Content',
+                    category=categories[i % len(categories)],
+                    author=author,
+                    status='published' if i % 2 == 0 or size == 1 else 'draft',
+                )
+                for i in range(size * 2)
+            ])
+        cls.author = cls.authors[100]
+        cls.article = Article.objects.filter(author=cls.author, status='published').first()
+        cls.category = cls.article.category
+
+    def setUp(self):
+        self.client = APIClient()
+
+    def tearDown(self):
+        view_counter.flush()
+
+    def get(self, url, user=None):
+        client = APIClient()
+        if user is not None:
+            client.force_authenticate(user=user)
+        response = client.get(url)
+        if response.status_code != status.HTTP_200_OK:
+            self.fail(f'GET {url} answered {response.status_code}: {response.content[:500]}')
+        return response
+
+class ArticleQueryBudgetTests(QueryBudgetTestCase):
+    def test_list(self):
+        """Test that the serializer path batch-loads nested objects"""
+        for user in [None, self.author, self.admin]:
+            self.assertConstantQueries(
+                lambda size: self.get(f'/api/articles/?page_size={size}', user), SIZES, limit=5
+            )
+
+    @override_settings(API_FAST_LIST_ENABLED=True)
+    def test_list_fast_path(self):
+        """Test that fast list pages are read with one values() query"""
+        for user in [None, self.author, self.admin]:
+            self.assertConstantQueries(
+                lambda size: self.get(f'/api/articles/?page_size={size}', user), SIZES, limit=3
+            )
+
+    def test_list_cursor(self):
+        """Test that cursor pages cost a fixed number of queries"""
+        self.assertConstantQueries(
+            lambda size: self.get(f'/api/articles/?pagination=cursor&page_size={size}'), SIZES, limit=4
+        )
+
+    def test_published(self):
+        """Test that /published/ costs a fixed number of queries"""
+        self.assertConstantQueries(
+            lambda size: self.get(f'/api/articles/published/?page_size={size}'), SIZES, limit=5
+        )
+
+    def test_my_articles(self):
+        """Test that /my_articles/ costs a fixed number of queries"""
+        self.assertConstantQueries(
+            lambda size: self.get('/api/articles/my_articles/?page_size=100', self.authors[size]), SIZES, limit=4
+        )
+
+    def test_drafts(self):
+        """Test that /drafts/ costs a fixed number of queries"""
+        self.assertConstantQueries(
+            lambda size: self.get(f'/api/articles/drafts/?page_size={size}', self.admin), SIZES, limit=4
+        )
+
+    def test_export(self):
+        """Test that exports stream any number of rows from one query"""
+        def export(size):
+            response = self.get(f'/api/articles/export/?author={self.authors[size].pk}', self.admin)
+            return b''.join(response.streaming_content)
+        self.assertConstantQueries(export, SIZES, limit=1)
+
+    def test_retrieve(self):
+        """Test that the detail endpoint has a fixed budget"""
+        with self.assertMaxQueries(2):
+            self.get(f'/api/articles/{self.article.pk}/')
+
+    def test_create_update_destroy(self):
+        """Test the budgets of single-article writes"""
+        self.client.force_authenticate(user=self.author)
+        # Each write includes the SAVEPOINT/RELEASE of Article.save()'s
+        # transaction (BEGIN/COMMIT outside tests)
+        with self.assertMaxQueries(7):
+            response = self.client.post('/api/articles/', {
+                'title': 'New article',
+                'description': 'Test',
+                'content': 'Content',
+                'category': self.category.pk,
+                'status': 'published',
+            })
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+        url = f'/api/articles/{response.data["id"]}/'
+        with self.assertMaxQueries(6):
+            response = self.client.put(url, {
+                'title': 'Renamed article',
+                'description': 'Test',
+                'content': 'Content',
+                'category': self.category.pk,
+                'status': 'published',
+            })
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        with self.assertMaxQueries(8):
+            response = self.client.patch(url, {'status': 'draft'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        with self.assertMaxQueries(5):
+            response = self.client.delete(url)
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+
+    def test_bulk(self):
+        """Test that bulk writes cost the same for 1, 10 or 50 items"""
+        self.client.force_authenticate(user=self.author)
+
+        def create(size):
+            items = [
+                {'title': f'Bulk {size} {i}', 'description': 'Test', 'content': 'Content', 'category': self.category.pk}
+                for i in range(size)
+            ]
+            response = self.client.post('/api/articles/bulk/', items, format='json')
+            self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+            return response
+        # 50, not 100: SQLite splits larger bulk_create calls into several
+        # INSERTs to stay under its bound-variable limit
+        self.assertConstantQueries(create, (1, 10, 50), limit=6)
+
+        def update(size):
+            ids = Article.objects.filter(author=self.author).values_list('pk', flat=True)[:size]
+            items = [{'id': pk, 'title': f'Retitled {size} {pk}'} for pk in ids]
+            response = self.client.patch('/api/articles/bulk/', items, format='json')
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            return response
+        self.assertConstantQueries(update, (1, 10, 50), limit=7)
+
+class CategoryQueryBudgetTests(QueryBudgetTestCase):
+    def test_list(self):
+        """Test that category list pages cost a fixed number of queries"""
+        self.assertConstantQueries(
+            lambda size: self.get(f'/api/categories/?search=Size{size}%20'), SIZES, limit=3
+        )
+
+    def test_retrieve(self):
+        """Test that the category detail endpoint has a fixed budget"""
+        with self.assertMaxQueries(2):
+            self.get(f'/api/categories/{self.category.pk}/')
+
+    def test_create_update_destroy(self):
+        """Test the budgets of category writes"""
+        self.client.force_authenticate(user=self.admin)
+        with self.assertMaxQueries(2):
+            response = self.client.post('/api/categories/', {'name': 'Science'})
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+        url = f'/api/categories/{response.data["id"]}/'
+        with self.assertMaxQueries(3):
+            response = self.client.put(url, {'name': 'Physics'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        with self.assertMaxQueries(2):
+            response = self.client.patch(url, {'description': 'Matter'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        with self.assertMaxQueries(3):
+            response = self.client.delete(url)
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+
+class ScrapedArticleQueryBudgetTests(QueryBudgetTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        # One source per size, with `size` articles each
+        ScrapedArticle.objects.bulk_create([
+            ScrapedArticle(title=f'Scraped {i}', url=f'https://example.com/size{size}/{i}', source=f'size{size}')
+            for size in SIZES
+            for i in range(size)
+        ])
+
+    def test_list(self):
+        """Test that scraped article list pages cost a fixed number of queries"""
+        responses = self.assertConstantQueries(
+            lambda size: self.get(f'/api/scraper/articles/?source=size{size}'), SIZES, limit=2
+        )
+        self.assertEqual(responses[10].data['count'], 10)
+
+    def test_latest(self):
+        """Test that /latest/ costs one query whatever the limit"""
+        self.assertConstantQueries(
+            lambda size: self.get(f'/api/scraper/articles/latest/?limit={size}'), SIZES, limit=1
+        )
+
+    def test_retrieve(self):
+        """Test that the scraped article detail endpoint has a fixed budget"""
+        scraped = {size: ScrapedArticle.objects.filter(source=f'size{size}').last() for size in SIZES}
+        self.assertConstantQueries(
+            lambda size: self.get(f'/api/scraper/articles/{scraped[size].pk}/'), SIZES, limit=1
+        )
+
+    def test_scrape(self):
+        """Test that queueing a scrape job has a fixed budget"""
+        staff = User.objects.create_user(username='staff', password='staff123', role='admin', is_staff=True)
+        self.client.force_authenticate(user=staff)
+        for coalesced in (False, True):
+            with self.assertMaxQueries(4):
+                response = self.client.post('/api/scraper/articles/scrape/', {'limit': 5}, format='json')
+            self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+            self.assertEqual(response.data['coalesced'], coalesced)
+
+@override_settings(SERVER_TIMING_ENABLED=True, API_CACHE_ENABLED=False)
+class ServerTimingTests(QueryCountMixin, TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user(username='author', password='author123', role='author')
+        category = Category.objects.create(name='Technology')
+        Article.objects.create(
+            title='Timed article', description='Test', content='Content',
+            category=category, author=cls.author, status='published',
+        )
+
+    def tearDown(self):
+        view_counter.flush()
+
+    def timing_metrics(self, response):
+        metrics = {}
+        for entry in response['Server-Timing'].split(', '):
+            name, *params = entry.split(';')
+            metrics[name] = dict(param.split('=', 1) for param in params)
+        return metrics
+
+    def test_header_and_log_line(self):
+        """Test that a request reports its queries and timings in a header and a log line"""
+        with self.assertLogs('mini_cms.timing', level='INFO') as logs:
+            with self.assertMaxQueries(10) as context:
+                response = APIClient().get('/api/articles/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        metrics = self.timing_metrics(response)
+        self.assertEqual(set(metrics), {'db', 'serialize', 'app', 'render', 'total'})
+        self.assertEqual(metrics['db']['desc'], f'"{len(context.captured_queries)} queries"')
+        self.assertGreater(float(metrics['render']['dur']), 0)
+        self.assertGreaterEqual(float(metrics['total']['dur']), float(metrics['db']['dur']))
+
+        record = logs.records[0]
+        self.assertEqual(record.timings['path'], '/api/articles/')
+        self.assertEqual(record.timings['status'], 200)
+        self.assertEqual(record.timings['queries'], len(context.captured_queries))
+        self.assertIn('serialize_ms', record.timings)
+        self.assertIn('queries=', record.getMessage())
+
+    def test_serializer_time(self):
+        """Test that serialization is measured on its own, within the app time"""
+        ScrapedArticle.objects.create(title='Scraped', url='https://example.com/1', source='test')
+        urls = ['/api/articles/', '/api/categories/', '/api/scraper/articles/', f'/api/articles/{Article.objects.get().pk}/']
+        for url in urls:
+            metrics = self.timing_metrics(APIClient().get(url))
+            self.assertGreater(float(metrics['serialize']['dur']), 0, url)
+            self.assertLessEqual(float(metrics['serialize']['dur']), float(metrics['app']['dur']), url)
+
+        with override_settings(API_FAST_LIST_ENABLED=True):
+            metrics = self.timing_metrics(APIClient().get('/api/articles/'))
+        self.assertGreater(float(metrics['serialize']['dur']), 0)
+
+    def test_streaming_response(self):
+        """Test that streaming responses are timed up to the view returning them"""
+        client = APIClient()
+        client.force_authenticate(user=self.author)
+        with self.assertLogs('mini_cms.timing', level='INFO'):
+            response = client.get('/api/articles/export/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        metrics = self.timing_metrics(response)
+        self.assertIn('total', metrics)
+        self.assertEqual(float(metrics['render']['dur']), 0)
+
+    def test_disabled(self):
+        """Test that nothing is measured when SERVER_TIMING_ENABLED is off"""
+        with override_settings(SERVER_TIMING_ENABLED=False):
+            response = APIClient().get('/api/articles/')
+        self.assertFalse(response.has_header('Server-Timing'))
+
+@override_settings(PROFILER_ENABLED=True, PROFILER_MAX_PER_MINUTE=2, API_CACHE_ENABLED=False)
+class ProfilerTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_user(username='admin', password='admin123', role='admin')
+        cls.author = User.objects.create_user(username='author', password='author123', role='author')
+
+    def setUp(self):
+        caches[settings.PROFILER_CACHE].clear()
+        self.output = tempfile.TemporaryDirectory()
+        self.addCleanup(self.output.cleanup)
+        settings_override = override_settings(PROFILER_OUTPUT_DIR=self.output.name)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+    def tearDown(self):
+        view_counter.flush()
+
+    def client_for(self, user):
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f'Bearer {RefreshToken.for_user(user).access_token}')
+        return client
+
+    def test_admin_request_is_profiled(self):
+        """Test that an admin's request is profiled and the stats stored"""
+        response = self.client_for(self.admin).get('/api/articles/', HTTP_X_PROFILE='1')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        name = response['X-Profile']
+        self.assertEqual(sorted(os.listdir(self.output.name)), [f'{name}.prof', f'{name}.txt'])
+        self.assertIn('GET /api/articles/', open(os.path.join(self.output.name, f'{name}.txt')).read())
+
+    def test_download(self):
+        """Test that ?profile=download returns the profile as an attachment"""
+        response = self.client_for(self.admin).get('/api/articles/?profile=download')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn('attachment', response['Content-Disposition'])
+        self.assertTrue(b''.join(response.streaming_content))
+
+    def test_session_admin(self):
+        """Test that an admin logged in with a session is recognised"""
+        client = APIClient()
+        client.force_login(self.admin)
+        response = client.get('/api/articles/', HTTP_X_PROFILE='1')
+        self.assertNotEqual(response.get('X-Profile', 'skipped'), 'skipped')
+
+    def test_unknown_mode(self):
+        """Test that values other than 1 and download do not profile"""
+        for value in ('true', '0', 'yes'):
+            response = self.client_for(self.admin).get('/api/articles/', HTTP_X_PROFILE=value)
+            self.assertFalse(response.has_header('X-Profile'))
+        self.assertEqual(os.listdir(self.output.name), [])
+
+    def test_not_admin(self):
+        """Test that other users and anonymous requests are never profiled"""
+        for client in (self.client_for(self.author), APIClient()):
+            response = client.get('/api/articles/', HTTP_X_PROFILE='1')
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertFalse(response.has_header('X-Profile'))
+        self.assertEqual(os.listdir(self.output.name), [])
+
+    def test_rate_cap(self):
+        """Test that profiles beyond the per-minute cap are skipped"""
+        client = self.client_for(self.admin)
+        headers = [client.get('/api/categories/', HTTP_X_PROFILE='1')['X-Profile'] for _ in range(3)]
+        self.assertNotEqual(headers[0], 'skipped')
+        self.assertNotEqual(headers[1], 'skipped')
+        self.assertEqual(headers[2], 'skipped')
+        self.assertEqual(len(os.listdir(self.output.name)), 4)
+
+    def test_busy_lock_keeps_cap(self):
+        """Test that a request skipped while another profile runs does not use up the cap"""
+        client = self.client_for(self.admin)
+        ProfilerMiddleware._lock.acquire()
+        try:
+            for _ in range(3):
+                self.assertEqual(client.get('/api/categories/', HTTP_X_PROFILE='1')['X-Profile'], 'skipped')
+        finally:
+            ProfilerMiddleware._lock.release()
+        self.assertNotEqual(client.get('/api/categories/', HTTP_X_PROFILE='1')['X-Profile'], 'skipped')
+
+@override_settings(METRICS_ENABLED=True, METRICS_FLUSH_INTERVAL=0, METRICS_TOKEN='secret', API_CACHE_ENABLED=False)
+class MetricsTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user(username='author', password='author123', role='author')
+        category = Category.objects.create(name='Technology')
+        Article.objects.create(
+            title='Counted article', description='Test', content='Content',
+            category=category, author=cls.author, status='published',
+        )
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        settings_override = override_settings(METRICS_DIR=self.directory.name)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        metrics.reset()
+        self.addCleanup(metrics.reset)
+
+    def tearDown(self):
+        view_counter.flush()
+
+    def scrape(self):
+        response = APIClient().get('/metrics', HTTP_AUTHORIZATION='Bearer secret')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.content.decode().splitlines()
+
+    def test_requests_labelled_by_view(self):
+        """Test that requests are counted and observed per basename-action"""
+        client = APIClient()
+        client.get('/api/articles/')
+        client.get('/api/articles/')
+        client.get('/api/articles/published/')
+        client.get('/api/categories/')
+
+        lines = self.scrape()
+        self.assertIn('http_requests_total{method="GET",status="200",view="article-list"} 2', lines)
+        self.assertIn('http_requests_total{method="GET",status="200",view="article-published"} 1', lines)
+        self.assertIn('http_requests_total{method="GET",status="200",view="category-list"} 1', lines)
+        self.assertIn('http_request_duration_seconds_count{view="article-list"} 2', lines)
+        self.assertIn('http_request_duration_seconds_bucket{view="article-list",le="+Inf"} 2', lines)
+        self.assertIn('http_request_queries_count{view="category-list"} 1', lines)
+        self.assertIn('# TYPE api_response_cache_hit_ratio gauge', lines)
+
+    def test_aggregates_worker_files(self):
+        """Test that the totals of other worker processes are added up"""
+        APIClient().get('/api/articles/')
+        with open(os.path.join(self.directory.name, '999999-other.json'), 'w') as f:
+            json.dump({
+                'counters': [['http_requests_total', {'view': 'article-list', 'method': 'GET', 'status': '200'}, 4]],
+                'histograms': [],
+            }, f)
+
+        self.assertIn('http_requests_total{method="GET",status="200",view="article-list"} 5', self.scrape())
+
+    def test_dead_workers_archived(self):
+        """Test that files of exited processes are folded into one archive"""
+        process = subprocess.Popen(['true'])
+        process.wait()
+        for name in (f'{process.pid}-a.json', f'{process.pid}-b.json'):
+            with open(os.path.join(self.directory.name, name), 'w') as f:
+                json.dump({
+                    'counters': [['scraper_articles_total', {'source': 'dev.to'}, 3]],
+                    'histograms': [],
+                }, f)
+
+        for _ in range(2):
+            self.assertIn('scraper_articles_total{source="dev.to"} 6', self.scrape())
+        files = sorted(name for name in os.listdir(self.directory.name) if name.endswith('.json'))
+        self.assertEqual(len(files), 2)
+        self.assertIn('archive.json', files)
+
+    def test_token(self):
+        """Test that METRICS_TOKEN protects the endpoint"""
+        self.assertEqual(APIClient().get('/metrics').status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertTrue(self.scrape())
+
+    @override_settings(METRICS_TOKEN='')
+    def test_closed_without_token(self):
+        """Test that the endpoint is only open without a token in DEBUG"""
+        self.assertEqual(APIClient().get('/metrics').status_code, status.HTTP_403_FORBIDDEN)
+        with override_settings(DEBUG=True):
+            self.assertEqual(APIClient().get('/metrics').status_code, status.HTTP_200_OK)
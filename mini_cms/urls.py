@@ -7,6 +7,7 @@ from drf_yasg.views import get_schema_view
 from drf_yasg import openapi
 from django.views.generic import RedirectView
 from django.http import JsonResponse
+from .metrics import metrics_view
 
 # Simple homepage view
 def api_root(request):
@@ -47,6 +48,9 @@ urlpatterns = [
     path('api/', include('articles.urls')),
     path('api/scraper/', include('scraper.urls')),
     
+    # Prometheus
+    path('metrics', metrics_view, name='metrics'),
+    
     # Swagger/OpenAPI documentation
     path('swagger/', schema_view.with_ui('swagger', cache_timeout=0), name='schema-swagger-ui'),
     path('redoc/', schema_view.with_ui('redoc', cache_timeout=0), name='schema-redoc'),
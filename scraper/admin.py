@@ -2,7 +2,7 @@
 scraper/admin.py
 """
 from django.contrib import admin
-from scraper.models import ScrapedArticle
+from scraper.models import ScrapedArticle, ScrapeJob, CrawlSourceState
 
 
 @admin.register(ScrapedArticle)
@@ -10,4 +10,17 @@ class ScrapedArticleAdmin(admin.ModelAdmin):
     list_display = ['title', 'source', 'scraped_at']
     list_filter = ['source', 'scraped_at']
     search_fields = ['title', 'url']
-    readonly_fields = ['scraped_at']
\ No newline at end of file
+    readonly_fields = ['scraped_at']
+
+
+@admin.register(ScrapeJob)
+class ScrapeJobAdmin(admin.ModelAdmin):
+    list_display = ['id', 'status', 'sources_key', 'limit', 'created_at', 'finished_at']
+    list_filter = ['status', 'created_at']
+    readonly_fields = ['created_at', 'started_at', 'finished_at']
+
+
+@admin.register(CrawlSourceState)
+class CrawlSourceStateAdmin(admin.ModelAdmin):
+    list_display = ['source', 'last_run_at', 'next_run_at', 'failure_count']
+    readonly_fields = ['last_run_at', 'last_success_at']
\ No newline at end of file
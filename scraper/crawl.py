@@ -0,0 +1,132 @@
+"""
+scraper/crawl.py
+
+Periodic crawling of the scraper sources (see `manage.py crawl`).
+"""
+import logging
+import random
+from datetime import timedelta
+
+from django.conf import settings
+from django.utils import timezone
+from scraper.models import CrawlSourceState, ScrapedArticle
+from scraper.scraper import ArticleScraper
+
+logger = logging.getLogger(__name__)
+
+
+class CrawlScheduler:
+    """
+    Runs every source of ArticleScraper on its own schedule.
+
+    - interval: SCRAPER_CRAWL_INTERVALS[source] seconds, or
+      SCRAPER_CRAWL_DEFAULT_INTERVAL
+    - jitter: every delay is randomly stretched or shrunk by up to
+      SCRAPER_CRAWL_JITTER (a fraction), so sources drift apart instead of
+      firing together
+    - backoff: after n consecutive failures a source waits interval * 2**n,
+      at most SCRAPER_CRAWL_MAX_BACKOFF seconds
+    - incremental: the latest `known_window` URLs of every source in
+      ScrapedArticle are not parsed again (see ArticleScraper.parse_*)
+
+    State is kept per source in CrawlSourceState, so a restarted crawler
+    carries on where it stopped.
+    """
+    known_window = 500
+
+    def __init__(self, scraper=None, limit=30, rng=None):
+        self.scraper = scraper or ArticleScraper()
+        self.limit = limit
+        self.rng = rng or random.Random()
+
+    def interval(self, source):
+        intervals = getattr(settings, 'SCRAPER_CRAWL_INTERVALS', {})
+        return intervals.get(source, getattr(settings, 'SCRAPER_CRAWL_DEFAULT_INTERVAL', 600))
+
+    def delay(self, source, failures=0):
+        """
+        Seconds until the next run of `source` after `failures` consecutive
+        failures (0 after a success)
+        """
+        seconds = self.interval(source)
+        if failures:
+            seconds = min(seconds * 2 ** failures, getattr(settings, 'SCRAPER_CRAWL_MAX_BACKOFF', 3600))
+        jitter = getattr(settings, 'SCRAPER_CRAWL_JITTER', 0.1)
+        return seconds * (1 + self.rng.uniform(-jitter, jitter))
+
+    def states(self):
+        """
+        CrawlSourceState of every source, created on first use
+        """
+        existing = CrawlSourceState.objects.in_bulk(list(self.scraper.sources), field_name='source')
+        missing = [CrawlSourceState(source=source) for source in self.scraper.sources if source not in existing]
+        if missing:
+            CrawlSourceState.objects.bulk_create(missing, ignore_conflicts=True)
+            existing = CrawlSourceState.objects.in_bulk(list(self.scraper.sources), field_name='source')
+        return existing
+
+    def known_urls(self, source):
+        """
+        URLs of the latest articles scraped from `source`
+        """
+        return set(
+            ScrapedArticle.objects.filter(source=source)
+            .order_by('-scraped_at', '-pk')
+            .values_list('url', flat=True)[:self.known_window]
+        )
+
+    def due(self, now=None):
+        now = now or timezone.now()
+        return [
+            state for state in self.states().values()
+            if state.next_run_at is None or state.next_run_at <= now
+        ]
+
+    def run_due(self, now=None):
+        """
+        Crawl the sources that are due, concurrently; returns their reports
+        """
+        due = self.due(now)
+        if not due:
+            return {}
+
+        articles = self.scraper.scrape_all(
+            limit=None,
+            per_source_limit=self.limit,
+            sources=[state.source for state in due],
+            known={state.source: self.known_urls(state.source) for state in due},
+        )
+        new = {}
+        for article in articles:
+            if article['is_new']:
+                new[article['source']] = new.get(article['source'], 0) + 1
+
+        finished = timezone.now()
+        reports = {}
+        for state in due:
+            report = self.scraper.report.get(state.source) or {'seconds': 0, 'items': 0, 'newest': None, 'error': 'not run'}
+            state.last_run_at = finished
+            if report['error']:
+                state.failure_count += 1
+                state.last_error = report['error']
+                logger.warning('Crawl of %s failed (%s in a row): %s', state.source, state.failure_count, report['error'])
+            else:
+                state.failure_count = 0
+                state.last_error = ''
+                state.last_success_at = finished
+                if report['newest']:
+                    state.last_seen_url = report['newest']
+            state.next_run_at = finished + timedelta(seconds=self.delay(state.source, state.failure_count))
+            reports[state.source] = {**report, 'new': new.get(state.source, 0), 'next_run_at': state.next_run_at}
+
+        CrawlSourceState.objects.bulk_update(
+            due, ['last_run_at', 'last_success_at', 'next_run_at', 'last_seen_url', 'failure_count', 'last_error'],
+        )
+        return reports
+
+    def seconds_until_next(self, now=None):
+        now = now or timezone.now()
+        upcoming = [state.next_run_at for state in self.states().values()]
+        if any(run_at is None for run_at in upcoming):
+            return 0
+        return max(min(upcoming) - now, timedelta(0)).total_seconds()
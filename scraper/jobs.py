@@ -0,0 +1,98 @@
+"""
+scraper/jobs.py
+
+Database-backed queue of scrape jobs. The API enqueues, a
+`manage.py run_scrape_worker` process claims and runs them.
+"""
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from scraper.models import ScrapeJob
+from scraper.scraper import ArticleScraper
+
+logger = logging.getLogger(__name__)
+
+
+def sources_key(sources):
+    return ','.join(sorted(sources))
+
+
+def enqueue_scrape(sources=None, limit=5, user=None):
+    """
+    Queue a scrape of `sources` (default: all) parsing `limit` items per
+    source. Returns (job, created): when a job for the same sources and
+    limit is already queued or running, that job is returned instead of a
+    new one.
+    """
+    if limit < 1:
+        raise ValueError(f'limit must be at least 1, not {limit}')
+    sources = sorted(set(sources or ArticleScraper.sources))
+    key = sources_key(sources)
+    active = ScrapeJob.objects.filter(sources_key=key, limit=limit, status__in=ScrapeJob.ACTIVE_STATUSES)
+    job = active.first()
+    if job is not None:
+        return job, False
+    try:
+        with transaction.atomic():
+            job = ScrapeJob.objects.create(sources=sources, sources_key=key, limit=limit, requested_by=user)
+        return job, True
+    except IntegrityError:
+        # Lost the race to another request (unique_active_scrape_job) if
+        # its job is there now; any other integrity error is not ours to hide
+        job = active.first()
+        if job is None:
+            raise
+        return job, False
+
+
+def claim_next_job():
+    """
+    Mark the oldest queued job running and return it (None if there is
+    none). The conditional UPDATE makes sure only one worker gets it.
+    """
+    while True:
+        job = ScrapeJob.objects.filter(status='queued').order_by('created_at', 'pk').first()
+        if job is None:
+            return None
+        now = timezone.now()
+        if ScrapeJob.objects.filter(pk=job.pk, status='queued').update(status='running', started_at=now):
+            job.status, job.started_at = 'running', now
+            return job
+
+
+def fail_stale_jobs(timeout=None):
+    """
+    Fail jobs left running longer than SCRAPE_JOB_TIMEOUT seconds (their
+    worker died), so they stop blocking new jobs for the same sources
+    """
+    timeout = timeout if timeout is not None else getattr(settings, 'SCRAPE_JOB_TIMEOUT', 600)
+    return ScrapeJob.objects.filter(
+        status='running', started_at__lt=timezone.now() - timedelta(seconds=timeout),
+    ).update(status='failed', error='Worker lost', finished_at=timezone.now())
+
+
+def run_job(job, scraper=None):
+    """
+    Scrape the sources of a claimed job, recording per-source progress as
+    sources finish
+    """
+    scraper = scraper or ArticleScraper()
+
+    def progress(source, report):
+        job.progress[source] = report
+        job.save(update_fields=['progress'])
+
+    try:
+        job.articles = scraper.scrape_all(limit=job.limit, sources=job.sources, progress=progress)
+        job.progress = scraper.report
+        job.status = 'done'
+    except Exception as e:
+        logger.exception('Scrape job %s failed', job.pk)
+        job.status = 'failed'
+        job.error = str(e)
+    job.finished_at = timezone.now()
+    job.save(update_fields=['articles', 'progress', 'status', 'error', 'finished_at'])
+    return job
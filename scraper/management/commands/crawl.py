@@ -0,0 +1,41 @@
+"""
+scraper/management/commands/crawl.py
+"""
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import close_old_connections
+from scraper.crawl import CrawlScheduler
+
+class Command(BaseCommand):
+    help = (
+        'Crawl the scraper sources on their schedules (SCRAPER_CRAWL_* settings), '
+        'parsing only items that were not scraped before'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help='Crawl the sources that are due and exit')
+        parser.add_argument('--limit', type=int, default=30, help='Items per source and run (default: 30)')
+        parser.add_argument(
+            '--max-sleep', type=float, default=60.0,
+            help='Longest sleep between checks of the schedule, in seconds (default: 60)'
+        )
+
+    def handle(self, *args, **options):
+        if options['limit'] < 1:
+            raise CommandError('--limit must be positive')
+
+        scheduler = CrawlScheduler(limit=options['limit'])
+        while True:
+            close_old_connections()
+            for source, report in scheduler.run_due().items():
+                if report['error']:
+                    self.stderr.write(f'{source}: {report["error"]} (next run {report["next_run_at"]:%H:%M:%S})')
+                else:
+                    self.stdout.write(
+                        f'{source}: {report["items"]} items, {report["new"]} new in {report["seconds"]}s '
+                        f'(next run {report["next_run_at"]:%H:%M:%S})'
+                    )
+            if options['once']:
+                break
+            time.sleep(min(max(scheduler.seconds_until_next(), 1), options['max_sleep']))
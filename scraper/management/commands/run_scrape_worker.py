@@ -0,0 +1,46 @@
+"""
+scraper/management/commands/run_scrape_worker.py
+"""
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+from scraper.jobs import claim_next_job, fail_stale_jobs, run_job
+from scraper.scraper import ArticleScraper
+
+class Command(BaseCommand):
+    help = 'Run scrape jobs queued through POST /api/scraper/articles/scrape/'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help='Run the queued jobs and exit instead of polling')
+        parser.add_argument('--poll-interval', type=float, default=2.0, help='Seconds between polls of an empty queue (default: 2)')
+        parser.add_argument('--max-jobs', type=int, default=0, help='Exit after this many jobs (default: no limit)')
+
+    def handle(self, *args, **options):
+        processed = 0
+        # One scraper for all jobs, so its connections are kept alive
+        scraper = ArticleScraper()
+        while True:
+            close_old_connections()
+            stale = fail_stale_jobs()
+            if stale:
+                self.stderr.write(f'Failed {stale} stale running jobs')
+
+            job = claim_next_job()
+            if job is None:
+                if options['once']:
+                    break
+                time.sleep(options['poll_interval'])
+                continue
+
+            started = time.perf_counter()
+            run_job(job, scraper)
+            processed += 1
+            self.stdout.write(
+                f'Job {job.pk} {job.status}: {len(job.articles)} articles from '
+                f'{", ".join(job.sources)} in {time.perf_counter() - started:.1f}s'
+            )
+            if options['max_jobs'] and processed >= options['max_jobs']:
+                break
+
+        self.stdout.write(self.style.SUCCESS(f'✓ Processed {processed} scrape jobs'))
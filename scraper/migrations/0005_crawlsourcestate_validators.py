@@ -0,0 +1,28 @@
+# Generated by Django 4.2.7 on 2026-10-18 01:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('scraper', '0004_crawlsourcestate'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='crawlsourcestate',
+            name='etag',
+            field=models.CharField(blank=True, max_length=255),
+        ),
+        migrations.AddField(
+            model_name='crawlsourcestate',
+            name='last_modified',
+            field=models.CharField(blank=True, max_length=64),
+        ),
+        migrations.AddField(
+            model_name='crawlsourcestate',
+            name='url',
+            field=models.URLField(blank=True, max_length=1000),
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 4.2.7 on 2026-10-18 02:04
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('scraper', '0005_crawlsourcestate_validators'),
+    ]
+
+    operations = [
+        migrations.RemoveConstraint(
+            model_name='scrapejob',
+            name='unique_active_scrape_job',
+        ),
+        migrations.AddConstraint(
+            model_name='scrapejob',
+            constraint=models.UniqueConstraint(condition=models.Q(('status__in', ('queued', 'running'))), fields=('sources_key', 'limit'), name='unique_active_scrape_job'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.7 on 2026-10-18 02:07
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('scraper', '0006_scrapejob_unique_active_limit'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='crawlsourcestate',
+            name='parsed_limit',
+            field=models.PositiveIntegerField(default=0),
+        ),
+    ]
@@ -1,6 +1,7 @@
 """
 scraper/models.py - FIXED VERSION
 """
+from django.conf import settings
 from django.db import models
 
 
@@ -16,4 +17,74 @@ class ScrapedArticle(models.Model):
         ordering = ['-scraped_at']
     
     def __str__(self):
-        return self.title
\ No newline at end of file
+        return self.title
+
+
+class ScrapeJob(models.Model):
+    """
+    A scrape requested through the API and run by `manage.py run_scrape_worker`
+    """
+    STATUS_CHOICES = (
+        ('queued', 'Queued'),
+        ('running', 'Running'),
+        ('done', 'Done'),
+        ('failed', 'Failed'),
+    )
+    ACTIVE_STATUSES = ('queued', 'running')
+    
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='queued')
+    sources = models.JSONField(default=list)
+    # Sorted source names; at most one active job per key and limit (see
+    # jobs.enqueue_scrape)
+    sources_key = models.CharField(max_length=255)
+    limit = models.PositiveIntegerField(default=5)
+    requested_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, blank=True, related_name='scrape_jobs'
+    )
+    # Source -> {'seconds', 'items', 'newest', 'error'}, filled in as sources finish
+    progress = models.JSONField(default=dict)
+    articles = models.JSONField(default=list)
+    error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['status', 'created_at']),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=['sources_key', 'limit'],
+                condition=models.Q(status__in=('queued', 'running')),
+                name='unique_active_scrape_job',
+            ),
+        ]
+    
+    def __str__(self):
+        return f"Scrape job {self.pk} ({self.status})"
+
+
+class CrawlSourceState(models.Model):
+    """
+    Per-source state: where `manage.py crawl` is with the source, and the
+    validators of its page for conditional requests (see ArticleScraper)
+    """
+    source = models.CharField(max_length=255, unique=True)
+    last_run_at = models.DateTimeField(null=True, blank=True)
+    last_success_at = models.DateTimeField(null=True, blank=True)
+    next_run_at = models.DateTimeField(null=True, blank=True)
+    # Newest URL seen by the last successful run
+    last_seen_url = models.URLField(max_length=1000, blank=True)
+    failure_count = models.PositiveIntegerField(default=0)
+    last_error = models.TextField(blank=True)
+    # ETag / Last-Modified of the last 200 from `url`, and how many items
+    # of that page were parsed
+    url = models.URLField(max_length=1000, blank=True)
+    etag = models.CharField(max_length=255, blank=True)
+    last_modified = models.CharField(max_length=64, blank=True)
+    parsed_limit = models.PositiveIntegerField(default=0)
+    
+    def __str__(self):
+        return f"{self.source} (next run {self.next_run_at})"
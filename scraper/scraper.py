@@ -1,122 +1,343 @@
 """
 scraper/scraper.py
 """
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed, TimeoutError as FuturesTimeoutError
+from urllib.parse import urljoin
+
 import requests
 from bs4 import BeautifulSoup
-from scraper.models import ScrapedArticle
+from django.conf import settings
+from requests.adapters import HTTPAdapter
+from urllib3.util.request import ACCEPT_ENCODING
+from articles.bulk import chunked
+from mini_cms.metrics import metrics
+from scraper.models import ScrapedArticle, CrawlSourceState
+
+logger = logging.getLogger(__name__)
 
 
 class ArticleScraper:
     """
     Web scraper to fetch latest articles from various sources
+
+    scrape_all() fetches and parses every source in its own thread,
+    merging items as they arrive, and saves them all at once (see save()).
+    Every source gets `timeout` seconds per connect/read; whatever has not
+    arrived after `deadline` seconds is given up on. Database writes stay
+    on the calling thread.
+
+    `urls` (or the SCRAPER_SOURCE_URLS setting) overrides the address of a
+    source ({'dev.to': 'http://...'}).
+
+    Every source has its own pooled requests.Session, so connections are
+    kept alive for as long as the scraper is reused without any Session
+    being shared between worker threads, and responses may be compressed.
+    Workers only read self.validators; collect() returns the new ones for
+    the calling thread to merge. The ETag/Last-Modified of every page is
+    stored in CrawlSourceState, with the limit it was parsed to, and sent
+    back as If-None-Match/If-Modified-Since; a 304 means nothing changed
+    and the source is not parsed at all. A scrape with a larger limit than
+    the stored one fetches the page unconditionally, to parse the items the
+    earlier scrape did not reach.
     """
-    
-    def __init__(self):
+    # Source name -> (URL, parse method)
+    sources = {
+        'Hacker News': ('https://news.ycombinator.com/', 'parse_hackernews'),
+        'dev.to': ('https://dev.to', 'parse_dev_to'),
+    }
+    timeout = 10
+    deadline = 20
+
+    def __init__(self, urls=None, timeout=None, deadline=None):
         self.headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
+            'Accept-Encoding': ACCEPT_ENCODING,
         }
-    
-    def scrape_dev_to(self, limit=5):
+        self.urls = {source: url for source, (url, _) in self.sources.items()}
+        self.urls.update(getattr(settings, 'SCRAPER_SOURCE_URLS', {}))
+        self.urls.update(urls or {})
+        # Source -> its Session, created up front so worker threads never
+        # write to this dict
+        self.sessions = {source: self.new_session() for source in self.urls}
+        if timeout is not None:
+            self.timeout = timeout
+        if deadline is not None:
+            self.deadline = deadline
+        # Source -> {'seconds', 'items', 'newest', 'not_modified', 'error'}
+        # of the last scrape
+        self.report = {}
+        # Source -> {'etag', 'last_modified', 'limit'} of its URL
+        self.validators = {}
+
+    def new_session(self):
         """
-        Scrape latest articles from dev.to
+        A Session for one source; a source fetches one page at a time, so
+        a single kept-alive connection per host is enough
         """
-        articles = []
+        session = requests.Session()
+        session.headers.update(self.headers)
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=1)
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+        return session
+
+    def fetch(self, source, limit=5):
+        """
+        Download the page of a source. Returns (content, validators), or
+        (None, None) when it has not changed since the validators in
+        self.validators and was parsed to at least `limit`.
+        """
+        headers = {}
+        validators = self.validators.get(source) or {}
+        if limit > validators.get('limit', 0):
+            validators = {}
+        if validators.get('etag'):
+            headers['If-None-Match'] = validators['etag']
+        if validators.get('last_modified'):
+            headers['If-Modified-Since'] = validators['last_modified']
+
+        response = self.sessions[source].get(self.urls[source], headers=headers, timeout=self.timeout)
+        if response.status_code == 304:
+            return None, None
+        response.raise_for_status()
+        return response.content, {
+            'etag': response.headers.get('ETag', ''),
+            'last_modified': response.headers.get('Last-Modified', ''),
+            'limit': limit,
+        }
+
+    def load_validators(self, sources):
+        """
+        Read the stored validators of `sources` (ignoring those recorded for
+        another URL)
+        """
+        states = CrawlSourceState.objects.filter(source__in=list(sources))
+        self.validators = {
+            state.source: {'etag': state.etag, 'last_modified': state.last_modified, 'limit': state.parsed_limit}
+            for state in states if state.url == self.urls[state.source]
+        }
+
+    def store_validators(self, sources):
+        """
+        Save the new validators of `sources` after their items were saved.
+        Sources that failed keep their previous validators, so that a page
+        is never reported unchanged before it was parsed once.
+        """
+        sources = [
+            source for source in sources
+            if source in self.validators
+            and not self.report.get(source, {}).get('error')
+            and not self.report.get(source, {}).get('not_modified')
+        ]
+        if not sources:
+            return
+        CrawlSourceState.objects.bulk_create(
+            [CrawlSourceState(source=source) for source in sources], ignore_conflicts=True,
+        )
+        states = list(CrawlSourceState.objects.filter(source__in=sources))
+        for state in states:
+            state.url = self.urls[state.source]
+            state.etag = self.validators[state.source]['etag']
+            state.last_modified = self.validators[state.source]['last_modified']
+            state.parsed_limit = self.validators[state.source]['limit']
+        CrawlSourceState.objects.bulk_update(states, ['url', 'etag', 'last_modified', 'parsed_limit'])
+
+    def parse_dev_to(self, html, limit=5, known=()):
+        """
+        Articles on a dev.to page, newest first. The feed is chronological,
+        so parsing stops at the first URL in `known` (already scraped).
+        """
+        items = []
+        soup = BeautifulSoup(html, 'html.parser')
+        article_elements = soup.find_all('article', class_='crayons-story', limit=limit)
+
+        for article in article_elements:
+            try:
+                title_elem = article.find('h2', class_='crayons-story__title') or article.find('h3', class_='crayons-story__title')
+                link_elem = title_elem.find('a') if title_elem else None
+
+                if link_elem and link_elem.get('href'):
+                    url = urljoin(self.urls['dev.to'], link_elem['href'])
+                    if url in known:
+                        break
+                    items.append({
+                        'title': link_elem.text.strip(),
+                        'url': url,
+                        'source': 'dev.to',
+                    })
+            except Exception as e:
+                logger.warning('Error parsing dev.to article: %s', e)
+
+        return items
+
+    def parse_hackernews(self, html, limit=5, known=()):
+        """
+        Stories on a Hacker News page, in page order, except the URLs in
+        `known` (already scraped). The page is ranked, so a new story can
+        follow known ones and parsing goes on past them.
+        """
+        items = []
+        soup = BeautifulSoup(html, 'html.parser')
+        storylinks = soup.find_all('span', class_='titleline', limit=limit)
+
+        for story in storylinks:
+            try:
+                link_elem = story.find('a')
+
+                if link_elem:
+                    url = urljoin(self.urls['Hacker News'], link_elem.get('href', ''))
+                    if url in known:
+                        continue
+                    items.append({
+                        'title': link_elem.text.strip(),
+                        'url': url,
+                        'source': 'Hacker News',
+                    })
+            except Exception as e:
+                logger.warning('Error parsing Hacker News story: %s', e)
+
+        return items
+
+    def collect(self, source, limit=5, known=()):
+        """
+        Fetch and parse one source without touching the database (safe to
+        run in a worker thread). URLs in `known` are left out (see the
+        parse methods). Returns (items, report, validators); validators is
+        None unless the page was downloaded and parsed, and is for the
+        caller to merge into self.validators.
+        """
+        started = time.perf_counter()
+        error = None
+        not_modified = False
+        validators = None
         try:
-            url = 'https://dev.to'
-            response = requests.get(url, headers=self.headers, timeout=10)
-            response.raise_for_status()
-            
-            soup = BeautifulSoup(response.content, 'html.parser')
-            article_elements = soup.find_all('article', class_='crayons-story', limit=limit)
-            
-            for article in article_elements:
-                try:
-                    title_elem = article.find('h2', class_='crayons-story__title') or article.find('h3', class_='crayons-story__title')
-                    link_elem = title_elem.find('a') if title_elem else None
-                    
-                    if link_elem and link_elem.get('href'):
-                        title = link_elem.text.strip()
-                        article_url = f"https://dev.to{link_elem['href']}"
-                        
-                        # Save to database
-                        scraped_article, created = ScrapedArticle.objects.get_or_create(
-                            url=article_url,
-                            defaults={
-                                'title': title,
-                                'source': 'dev.to'
-                            }
-                        )
-                        
-                        articles.append({
-                            'title': title,
-                            'url': article_url,
-                            'source': 'dev.to',
-                            'is_new': created
-                        })
-                except Exception as e:
-                    print(f"Error parsing article: {str(e)}")
-                    continue
-            
+            html, validators = self.fetch(source, limit)
+            if html is None:
+                items = []
+                not_modified = True
+            else:
+                items = getattr(self, self.sources[source][1])(html, limit, known)
         except Exception as e:
-            print(f"Error scraping dev.to: {str(e)}")
-        
+            logger.warning('Error scraping %s: %s', source, e)
+            items = []
+            error = str(e)
+            validators = None
+        seconds = time.perf_counter() - started
+        metrics.observe('scraper_run_duration_seconds', {'source': source}, seconds)
+        metrics.inc('scraper_articles_total', {'source': source}, len(items))
+        return items, {
+            'seconds': round(seconds, 3),
+            'items': len(items),
+            'newest': items[0]['url'] if items else None,
+            'not_modified': not_modified,
+            'error': error,
+        }, validators
+
+    def save(self, items):
+        """
+        Store scraped items; returns them flagged with is_new.
+
+        One url__in lookup tells which items are already known and one
+        bulk_create(ignore_conflicts=True) inserts the rest, whatever the
+        number of items. An item inserted concurrently by another scrape
+        between the two is silently skipped (and still reported new).
+        """
+        unique = {}
+        for item in items:
+            unique.setdefault(item['url'], item)
+
+        known = set()
+        for urls in chunked(unique):
+            known.update(ScrapedArticle.objects.filter(url__in=urls).values_list('url', flat=True))
+
+        ScrapedArticle.objects.bulk_create(
+            [
+                ScrapedArticle(url=url, title=item['title'], source=item['source'])
+                for url, item in unique.items() if url not in known
+            ],
+            ignore_conflicts=True,
+        )
+
+        articles = []
+        for item in items:
+            is_new = item['url'] not in known
+            # A URL listed twice is only new the first time
+            known.add(item['url'])
+            articles.append({**item, 'is_new': is_new})
+        return articles
+
+    def scrape_source(self, source, limit=5):
+        """
+        Scrape a single source
+        """
+        self.load_validators([source])
+        items, self.report[source], validators = self.collect(source, limit)
+        if validators:
+            self.validators[source] = validators
+        articles = self.save(items)
+        self.store_validators([source])
         return articles
-    
+
+    def scrape_dev_to(self, limit=5):
+        """
+        Scrape latest articles from dev.to
+        """
+        return self.scrape_source('dev.to', limit)
+
     def scrape_hackernews(self, limit=5):
         """
         Scrape latest articles from Hacker News
         """
-        articles = []
-        try:
-            url = 'https://news.ycombinator.com/'
-            response = requests.get(url, headers=self.headers, timeout=10)
-            response.raise_for_status()
-            
-            soup = BeautifulSoup(response.content, 'html.parser')
-            storylinks = soup.find_all('span', class_='titleline', limit=limit)
-            
-            for story in storylinks:
-                try:
-                    link_elem = story.find('a')
-                    
-                    if link_elem:
-                        title = link_elem.text.strip()
-                        article_url = link_elem.get('href', '')
-                        
-                        if not article_url.startswith('http'):
-                            article_url = f"https://news.ycombinator.com/{article_url}"
-                        
-                        # Save to database
-                        scraped_article, created = ScrapedArticle.objects.get_or_create(
-                            url=article_url,
-                            defaults={
-                                'title': title,
-                                'source': 'Hacker News'
-                            }
-                        )
-                        
-                        articles.append({
-                            'title': title,
-                            'url': article_url,
-                            'source': 'Hacker News',
-                            'is_new': created
-                        })
-                except Exception as e:
-                    print(f"Error parsing article: {str(e)}")
-                    continue
-            
-        except Exception as e:
-            print(f"Error scraping Hacker News: {str(e)}")
-        
-        return articles
-    
-    def scrape_all(self, limit=5):
+        return self.scrape_source('Hacker News', limit)
+
+    def scrape_all(self, limit=5, sources=None, progress=None, known=None, per_source_limit=None):
         """
-        Scrape articles from all sources
+        Scrape articles from all sources (or `sources`) concurrently.
+
+        Every source parses up to `per_source_limit` items (default:
+        `limit`) and at most `limit` articles are returned in all (None: no
+        cap). progress(source, report), if given, is called on the calling
+        thread as each source finishes; known maps sources to sets of URLs
+        already scraped (see collect()).
         """
-        all_articles = []
-        
-        all_articles.extend(self.scrape_hackernews(limit))
-        all_articles.extend(self.scrape_dev_to(limit))
-        
-        return all_articles[:limit]
\ No newline at end of file
+        sources = list(sources or self.sources)
+        all_items = []
+        completed = []
+        self.report = {}
+        self.load_validators(sources)
+
+        executor = ThreadPoolExecutor(max_workers=len(sources), thread_name_prefix='scraper')
+        known = known or {}
+        per_source_limit = limit if per_source_limit is None else per_source_limit
+        futures = {
+            executor.submit(self.collect, source, per_source_limit, known.get(source, ())): source
+            for source in sources
+        }
+        try:
+            for future in as_completed(futures, timeout=self.deadline):
+                source = futures[future]
+                items, self.report[source], validators = future.result()
+                if validators:
+                    self.validators[source] = validators
+                all_items.extend(items)
+                completed.append(source)
+                if progress:
+                    progress(source, self.report[source])
+        except FuturesTimeoutError:
+            for future, source in futures.items():
+                if not future.done():
+                    logger.warning('Gave up on %s after the %ss deadline', source, self.deadline)
+                    self.report[source] = {
+                        'seconds': self.deadline, 'items': 0, 'newest': None,
+                        'not_modified': False, 'error': 'deadline exceeded',
+                    }
+        finally:
+            # Do not wait for sources that missed the deadline; their
+            # threads end with their own timeout
+            executor.shutdown(wait=False, cancel_futures=True)
+
+        articles = self.save(all_items)
+        self.store_validators(completed)
+        return articles[:limit]
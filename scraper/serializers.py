@@ -1,12 +1,53 @@
 """
 scraper/serializers.py
 """
+from django.conf import settings
 from rest_framework import serializers
-from scraper.models import ScrapedArticle
+from rest_framework.reverse import reverse
+from scraper.models import ScrapedArticle, ScrapeJob
+from scraper.scraper import ArticleScraper
 
 
 class ScrapedArticleSerializer(serializers.ModelSerializer):
     class Meta:
         model = ScrapedArticle
         fields = ['id', 'title', 'url', 'source', 'scraped_at']
-        read_only_fields = ['id', 'scraped_at']
\ No newline at end of file
+        read_only_fields = ['id', 'scraped_at']
+
+
+class ScrapeJobSerializer(serializers.ModelSerializer):
+    url = serializers.SerializerMethodField()
+    
+    class Meta:
+        model = ScrapeJob
+        fields = [
+            'id', 'url', 'status', 'sources', 'limit', 'progress', 'articles', 'error',
+            'created_at', 'started_at', 'finished_at',
+        ]
+        read_only_fields = fields
+    
+    def get_url(self, obj):
+        return reverse('scraped-article-scrape-job', kwargs={'job_id': obj.pk}, request=self.context.get('request'))
+
+
+class ScrapeRequestSerializer(serializers.Serializer):
+    """
+    Body of POST /scrape/: the sources to scrape (default: all) and how
+    many items to parse per source, at most SCRAPE_MAX_LIMIT
+    """
+    sources = serializers.ListField(
+        child=serializers.ChoiceField(choices=list(ArticleScraper.sources)), required=False, default=list,
+    )
+    limit = serializers.IntegerField(min_value=1, default=5)
+    
+    def to_internal_value(self, data):
+        # A single source may be given as a plain string
+        if isinstance(data, dict) and isinstance(data.get('sources'), str):
+            data = {**data, 'sources': [data['sources']]}
+        return super().to_internal_value(data)
+    
+    def validate_limit(self, value):
+        maximum = getattr(settings, 'SCRAPE_MAX_LIMIT', 100)
+        if value > maximum:
+            raise serializers.ValidationError(f'Ensure this value is less than or equal to {maximum}.')
+        return value
@@ -0,0 +1,106 @@
+"""
+scraper/testing.py
+
+Local stand-ins for the scraped sites, for tests and benchmarks that must
+not depend on the network.
+"""
+import gzip
+import hashlib
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+def hackernews_page(count, prefix='hn'):
+    """
+    A front page shaped like news.ycombinator.com with stories `count` - 1
+    (the newest) down to 0
+    """
+    rows = ''.join(
+        f'<tr class="athing"><td><span class="titleline">'
+        f'<a href="https://example.com/{prefix}/{i}">Story {i}</a></span></td></tr>'
+        for i in reversed(range(count))
+    )
+    return f'<html><body><table>{rows}</table></body></html>'
+
+def dev_to_page(count, prefix='devto'):
+    """
+    A feed shaped like dev.to with posts `count` - 1 (the newest) down to 0
+    """
+    posts = ''.join(
+        f'<article class="crayons-story"><h2 class="crayons-story__title">'
+        f'<a href="/{prefix}/post-{i}">Post {i}</a></h2></article>'
+        for i in reversed(range(count))
+    )
+    return f'<html><body>{posts}</body></html>'
+
+class StubHandler(BaseHTTPRequestHandler):
+    # Keep-alive, like the real sites
+    protocol_version = 'HTTP/1.1'
+    last_modified = 'Wed, 01 Jan 2025 00:00:00 GMT'
+
+    def setup(self):
+        super().setup()
+        self.server.connections += 1
+
+    def do_GET(self):
+        page = self.server.pages.get(self.path)
+        if page is None:
+            self.send_error(404)
+            return
+        body, delay = page
+        self.server.hits[self.path] = self.server.hits.get(self.path, 0) + 1
+        if delay:
+            time.sleep(delay)
+
+        body = body.encode()
+        etag = f'"{hashlib.md5(body).hexdigest()}"'
+        if self.headers.get('If-None-Match') == etag:
+            self.server.not_modified += 1
+            self.send_response(304)
+            self.send_header('ETag', etag)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.send_header('ETag', etag)
+        self.send_header('Last-Modified', self.last_modified)
+        if 'gzip' in self.headers.get('Accept-Encoding', ''):
+            body = gzip.compress(body)
+            self.send_header('Content-Encoding', 'gzip')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+        self.server.bytes_sent += len(body)
+
+    def log_message(self, format, *args):
+        pass
+
+@contextmanager
+def stub_server(pages):
+    """
+    Serve `pages` ({path: (html, delay in seconds)}) on a free local port
+    from a thread per connection, with an ETag on every page (answered
+    with a 304 on a matching If-None-Match) and gzip when accepted.
+
+    Yields the server; server.url(path) is the absolute URL of a page,
+    server.hits counts requests per path, and server.connections,
+    server.not_modified and server.bytes_sent count what they say.
+    """
+    server = ThreadingHTTPServer(('127.0.0.1', 0), StubHandler)
+    server.daemon_threads = True
+    server.pages = pages
+    server.hits = {}
+    server.connections = 0
+    server.not_modified = 0
+    server.bytes_sent = 0
+    server.url = lambda path: f'http://127.0.0.1:{server.server_port}{path}'
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield server
+    finally:
+        server.shutdown()
+        server.server_close()
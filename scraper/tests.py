@@ -1,11 +1,22 @@
 """
 scraper/tests.py
 """
-from django.test import TestCase
+import time
+from datetime import timedelta
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
 from django.contrib.auth import get_user_model
 from rest_framework.test import APIClient
 from rest_framework import status
-from .models import ScrapedArticle
+from mini_cms.testing import QueryCountMixin
+from .crawl import CrawlScheduler
+from .jobs import enqueue_scrape, fail_stale_jobs
+from .models import ScrapedArticle, ScrapeJob, CrawlSourceState
+from .scraper import ArticleScraper
+from .testing import stub_server, hackernews_page, dev_to_page
 
 User = get_user_model()
 
@@ -46,7 +57,7 @@ class ScraperTests(TestCase):
             'limit': 5
         })
         
-        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
     
     def test_trigger_scraping_author_forbidden(self):
         """Test that author cannot trigger scraping"""
@@ -56,4 +67,348 @@ class ScraperTests(TestCase):
             'limit': 5
         })
         
-        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
\ No newline at end of file
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+class ConcurrentScrapeTests(TestCase):
+    def scraper_for(self, server, **kwargs):
+        return ArticleScraper(urls={'Hacker News': server.url('/hn'), 'dev.to': server.url('/devto')}, **kwargs)
+    
+    def test_sources_fetched_concurrently(self):
+        """Test that scrape_all waits for the slowest source, not the sum"""
+        pages = {'/hn': (hackernews_page(3), 0.5), '/devto': (dev_to_page(3), 0.5)}
+        with stub_server(pages) as server:
+            started = time.perf_counter()
+            articles = self.scraper_for(server).scrape_all(limit=10)
+            elapsed = time.perf_counter() - started
+        
+        self.assertLess(elapsed, 0.9)
+        self.assertEqual(len(articles), 6)
+        self.assertEqual(ScrapedArticle.objects.count(), 6)
+        self.assertTrue(ScrapedArticle.objects.filter(url=server.url('/devto/post-0')).exists())
+    
+    def test_deadline(self):
+        """Test that sources missing the global deadline are given up on"""
+        pages = {'/hn': (hackernews_page(3), 0), '/devto': (dev_to_page(3), 2)}
+        with stub_server(pages) as server:
+            scraper = self.scraper_for(server, deadline=0.5)
+            started = time.perf_counter()
+            articles = scraper.scrape_all(limit=10)
+            elapsed = time.perf_counter() - started
+        
+        self.assertLess(elapsed, 1.5)
+        self.assertEqual({article['source'] for article in articles}, {'Hacker News'})
+        self.assertEqual(scraper.report['dev.to']['error'], 'deadline exceeded')
+        self.assertEqual(scraper.report['Hacker News']['items'], 3)
+    
+    def test_failing_source(self):
+        """Test that a failing source does not stop the others"""
+        with stub_server({'/hn': (hackernews_page(2), 0)}) as server:
+            scraper = self.scraper_for(server)
+            articles = scraper.scrape_all(limit=10)
+        
+        self.assertEqual(len(articles), 2)
+        self.assertIsNotNone(scraper.report['dev.to']['error'])
+
+class ScrapedArticleSaveTests(QueryCountMixin, TestCase):
+    def items(self, count, prefix='item'):
+        return [
+            {'title': f'Item {i}', 'url': f'https://example.com/{prefix}/{i}', 'source': 'test'}
+            for i in range(count)
+        ]
+    
+    def test_constant_queries(self):
+        """Test that saving any number of scraped items costs two queries"""
+        # 200, not more: SQLite splits larger bulk_create calls into several
+        # INSERTs to stay under its bound-variable limit
+        self.assertConstantQueries(
+            lambda size: ArticleScraper().save(self.items(size, prefix=f'size{size}')), (1, 10, 200), limit=2
+        )
+        self.assertEqual(ScrapedArticle.objects.count(), 211)
+    
+    def test_is_new(self):
+        """Test that only unknown URLs are inserted and flagged new"""
+        ScrapedArticle.objects.create(title='Known', url='https://example.com/item/0', source='test')
+        items = self.items(3)
+        articles = ArticleScraper().save(items + items[2:])
+        
+        self.assertEqual([article['is_new'] for article in articles], [False, True, True, False])
+        self.assertEqual(ScrapedArticle.objects.count(), 3)
+        self.assertEqual(ScrapedArticle.objects.get(url='https://example.com/item/0').title, 'Known')
+
+class ScrapeJobTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.admin = User.objects.create_user(username='admin', password='admin123', role='admin', is_staff=True)
+        self.client.force_authenticate(user=self.admin)
+    
+    def test_scrape_is_queued(self):
+        """Test that POST /scrape/ answers 202 with a queued job"""
+        response = self.client.post('/api/scraper/articles/scrape/', {'limit': 10}, format='json')
+        
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(response.data['status'], 'queued')
+        self.assertFalse(response.data['coalesced'])
+        job = ScrapeJob.objects.get(pk=response.data['id'])
+        self.assertEqual(job.sources, ['Hacker News', 'dev.to'])
+        self.assertEqual(job.limit, 10)
+        self.assertFalse(ScrapedArticle.objects.exists())
+    
+    def test_duplicate_jobs_are_coalesced(self):
+        """Test that a scrape of sources already queued or running reuses that job"""
+        first = self.client.post('/api/scraper/articles/scrape/', {}, format='json').data
+        second = self.client.post('/api/scraper/articles/scrape/', {'sources': ['dev.to', 'Hacker News']}, format='json').data
+        other = self.client.post('/api/scraper/articles/scrape/', {'sources': ['dev.to']}, format='json').data
+        
+        self.assertEqual(second['id'], first['id'])
+        self.assertTrue(second['coalesced'])
+        self.assertNotEqual(other['id'], first['id'])
+        
+        ScrapeJob.objects.filter(pk=first['id']).update(status='done')
+        self.assertNotEqual(enqueue_scrape()[0].pk, first['id'])
+    
+    def test_unknown_source(self):
+        """Test that unknown sources are rejected"""
+        response = self.client.post('/api/scraper/articles/scrape/', {'sources': ['example']}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+    
+    def test_limit_bounds(self):
+        """Test that limits below 1 or above SCRAPE_MAX_LIMIT are rejected"""
+        for limit in (-1, 0, 101, 'many'):
+            response = self.client.post('/api/scraper/articles/scrape/', {'limit': limit}, format='json')
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+            self.assertIn('limit', response.data)
+        self.assertFalse(ScrapeJob.objects.exists())
+        with self.assertRaises(ValueError):
+            enqueue_scrape(limit=-1)
+    
+    def test_coalescing_keeps_limit(self):
+        """Test that only jobs with the same limit are coalesced"""
+        first = self.client.post('/api/scraper/articles/scrape/', {'limit': 5}, format='json').data
+        larger = self.client.post('/api/scraper/articles/scrape/', {'limit': 50}, format='json').data
+        self.assertNotEqual(larger['id'], first['id'])
+        self.assertEqual(larger['limit'], 50)
+        self.assertEqual(enqueue_scrape(limit=50)[0].pk, larger['id'])
+    
+    def test_worker_runs_job(self):
+        """Test that run_scrape_worker runs queued jobs and records progress"""
+        job_id = self.client.post('/api/scraper/articles/scrape/', {'limit': 10}, format='json').data['id']
+        
+        pages = {'/hn': (hackernews_page(3), 0), '/devto': (dev_to_page(2), 0)}
+        with stub_server(pages) as server:
+            urls = {'Hacker News': server.url('/hn'), 'dev.to': server.url('/devto')}
+            with override_settings(SCRAPER_SOURCE_URLS=urls):
+                out = StringIO()
+                call_command('run_scrape_worker', '--once', stdout=out)
+        self.assertIn('Processed 1 scrape jobs', out.getvalue())
+        
+        response = self.client.get(f'/api/scraper/articles/scrape/jobs/{job_id}/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['status'], 'done')
+        self.assertEqual(len(response.data['articles']), 5)
+        self.assertEqual(response.data['progress']['Hacker News']['items'], 3)
+        self.assertIn('seconds', response.data['progress']['dev.to'])
+        self.assertIsNotNone(response.data['finished_at'])
+        self.assertEqual(ScrapedArticle.objects.count(), 5)
+    
+    def test_stale_jobs_fail(self):
+        """Test that jobs whose worker died stop blocking new ones"""
+        job, _ = enqueue_scrape()
+        ScrapeJob.objects.filter(pk=job.pk).update(status='running', started_at=timezone.now() - timedelta(hours=1))
+        
+        self.assertEqual(fail_stale_jobs(timeout=600), 1)
+        self.assertEqual(ScrapeJob.objects.get(pk=job.pk).status, 'failed')
+        self.assertTrue(enqueue_scrape()[1])
+    
+    def test_job_detail_admin_only(self):
+        """Test that authors cannot read scrape jobs"""
+        job, _ = enqueue_scrape()
+        author = User.objects.create_user(username='author', password='author123', role='author')
+        self.client.force_authenticate(user=author)
+        response = self.client.get(f'/api/scraper/articles/scrape/jobs/{job.pk}/')
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+@override_settings(
+    SCRAPER_CRAWL_INTERVALS={'Hacker News': 300, 'dev.to': 900},
+    SCRAPER_CRAWL_JITTER=0,
+    SCRAPER_CRAWL_MAX_BACKOFF=5000,
+)
+class CrawlTests(TestCase):
+    def scheduler_for(self, server):
+        scraper = ArticleScraper(urls={'Hacker News': server.url('/hn'), 'dev.to': server.url('/devto')})
+        return CrawlScheduler(scraper=scraper)
+    
+    def make_due(self):
+        CrawlSourceState.objects.update(next_run_at=timezone.now())
+    
+    def test_incremental_runs(self):
+        """Test that a run only parses items that were not scraped before"""
+        pages = {'/hn': (hackernews_page(3), 0), '/devto': (dev_to_page(2), 0)}
+        with stub_server(pages) as server:
+            scheduler = self.scheduler_for(server)
+            reports = scheduler.run_due()
+            self.assertEqual(reports['Hacker News']['new'], 3)
+            state = CrawlSourceState.objects.get(source='Hacker News')
+            self.assertEqual(state.last_seen_url, 'https://example.com/hn/2')
+            self.assertAlmostEqual((state.next_run_at - state.last_run_at).total_seconds(), 300, delta=1)
+            
+            # Nothing is due until the interval has passed
+            self.assertEqual(scheduler.run_due(), {})
+            
+            server.pages['/hn'] = (hackernews_page(5), 0)
+            self.make_due()
+            reports = scheduler.run_due()
+        
+        self.assertEqual(reports['Hacker News']['items'], 2)
+        self.assertEqual(reports['Hacker News']['new'], 2)
+        self.assertEqual(reports['dev.to']['items'], 0)
+        self.assertEqual(CrawlSourceState.objects.get(source='Hacker News').last_seen_url, 'https://example.com/hn/4')
+        self.assertEqual(CrawlSourceState.objects.get(source='dev.to').last_seen_url, server.url('/devto/post-1'))
+        self.assertEqual(ScrapedArticle.objects.count(), 7)
+    
+    def test_ranked_page_new_below_known(self):
+        """Test that new Hacker News stories ranked below known ones are found"""
+        pages = {'/hn': (hackernews_page(3), 0), '/devto': (dev_to_page(2), 0)}
+        with stub_server(pages) as server:
+            scheduler = self.scheduler_for(server)
+            scheduler.run_due()
+            
+            server.pages['/hn'] = (hackernews_page(3) + hackernews_page(2, prefix='hn-new'), 0)
+            self.make_due()
+            reports = scheduler.run_due()
+        
+        self.assertEqual(reports['Hacker News']['items'], 2)
+        self.assertEqual(reports['Hacker News']['new'], 2)
+        self.assertTrue(ScrapedArticle.objects.filter(url='https://example.com/hn-new/0').exists())
+    
+    def test_limit_per_source(self):
+        """Test that every source parses up to the crawl limit, not the sum over sources"""
+        pages = {'/hn': (hackernews_page(5), 0), '/devto': (dev_to_page(5), 0)}
+        with stub_server(pages) as server:
+            scheduler = self.scheduler_for(server)
+            scheduler.limit = 2
+            reports = scheduler.run_due()
+        
+        self.assertEqual(reports['Hacker News']['items'], 2)
+        self.assertEqual(reports['dev.to']['items'], 2)
+        self.assertEqual(ScrapedArticle.objects.count(), 4)
+    
+    def test_backoff(self):
+        """Test that failing sources back off exponentially up to the maximum"""
+        with stub_server({'/hn': (hackernews_page(1), 0)}) as server:
+            scheduler = self.scheduler_for(server)
+            delays = []
+            for _ in range(3):
+                self.make_due()
+                scheduler.run_due()
+                state = CrawlSourceState.objects.get(source='dev.to')
+                delays.append(round((state.next_run_at - state.last_run_at).total_seconds()))
+        
+        self.assertEqual(state.failure_count, 3)
+        self.assertTrue(state.last_error)
+        self.assertEqual(delays, [1800, 3600, 5000])
+        self.assertEqual(scheduler.delay('Hacker News', failures=1), 600)
+        self.assertEqual(CrawlSourceState.objects.get(source='Hacker News').failure_count, 0)
+    
+    def test_command(self):
+        """Test that crawl --once crawls the due sources and reports them"""
+        pages = {'/hn': (hackernews_page(2), 0), '/devto': (dev_to_page(2), 0)}
+        with stub_server(pages) as server:
+            urls = {'Hacker News': server.url('/hn'), 'dev.to': server.url('/devto')}
+            with override_settings(SCRAPER_SOURCE_URLS=urls):
+                out = StringIO()
+                call_command('crawl', '--once', stdout=out)
+        
+        self.assertIn('Hacker News: 2 items, 2 new', out.getvalue())
+        self.assertEqual(ScrapedArticle.objects.count(), 4)
+
+class ConditionalFetchTests(TestCase):
+    def test_unchanged_pages_are_not_parsed(self):
+        """Test that stored validators turn unchanged pages into 304s"""
+        pages = {'/hn': (hackernews_page(3), 0), '/devto': (dev_to_page(2), 0)}
+        with stub_server(pages) as server:
+            urls = {'Hacker News': server.url('/hn'), 'dev.to': server.url('/devto')}
+            self.assertEqual(len(ArticleScraper(urls=urls).scrape_all(limit=10)), 5)
+            state = CrawlSourceState.objects.get(source='dev.to')
+            self.assertEqual(state.url, urls['dev.to'])
+            self.assertTrue(state.etag)
+            self.assertTrue(state.last_modified)
+            
+            scraper = ArticleScraper(urls=urls)
+            self.assertEqual(scraper.scrape_all(limit=10), [])
+            self.assertEqual(server.not_modified, 2)
+            self.assertTrue(scraper.report['Hacker News']['not_modified'])
+            
+            server.pages['/hn'] = (hackernews_page(4), 0)
+            articles = scraper.scrape_all(limit=10)
+        
+        self.assertEqual(server.not_modified, 3)
+        self.assertEqual([article['url'] for article in articles if article['is_new']], ['https://example.com/hn/3'])
+    
+    def test_larger_limit_refetches(self):
+        """Test that a page parsed to a smaller limit is fetched again for a larger one"""
+        pages = {'/hn': (hackernews_page(5), 0)}
+        with stub_server(pages) as server:
+            scraper = ArticleScraper(urls={'Hacker News': server.url('/hn')})
+            self.assertEqual(len(scraper.scrape_hackernews(limit=2)), 2)
+            self.assertEqual(CrawlSourceState.objects.get(source='Hacker News').parsed_limit, 2)
+            
+            articles = scraper.scrape_hackernews(limit=5)
+            self.assertEqual(server.not_modified, 0)
+            self.assertEqual(len([article for article in articles if article['is_new']]), 3)
+            self.assertEqual(CrawlSourceState.objects.get(source='Hacker News').parsed_limit, 5)
+            
+            # Parsed deep enough already: conditional again
+            self.assertEqual(scraper.scrape_hackernews(limit=3), [])
+            self.assertEqual(server.not_modified, 1)
+            self.assertEqual(CrawlSourceState.objects.get(source='Hacker News').parsed_limit, 5)
+    
+    def test_validators_are_per_url(self):
+        """Test that validators recorded for another URL are not sent"""
+        pages = {'/hn': (hackernews_page(2), 0), '/hn-mirror': (hackernews_page(2), 0)}
+        with stub_server(pages) as server:
+            ArticleScraper(urls={'Hacker News': server.url('/hn')}).scrape_hackernews()
+            ArticleScraper(urls={'Hacker News': server.url('/hn-mirror')}).scrape_hackernews()
+        
+        self.assertEqual(server.not_modified, 0)
+        self.assertEqual(server.hits, {'/hn': 1, '/hn-mirror': 1})
+    
+    def test_failed_parse_keeps_validators(self):
+        """Test that a source that failed is fetched in full next time"""
+        with stub_server({'/hn': (hackernews_page(2), 0)}) as server:
+            scraper = ArticleScraper(urls={'Hacker News': server.url('/hn')})
+            scraper.parse_hackernews = lambda html, limit, known: 1 / 0
+            scraper.scrape_hackernews()
+            self.assertIsNotNone(scraper.report['Hacker News']['error'])
+            
+            articles = ArticleScraper(urls={'Hacker News': server.url('/hn')}).scrape_hackernews()
+        
+        self.assertEqual(server.not_modified, 0)
+        self.assertEqual(len(articles), 2)
+    
+    def test_connections_are_reused_and_compressed(self):
+        """Test that one scraper keeps its connection alive and accepts gzip"""
+        page = hackernews_page(50)
+        with stub_server({'/hn': (page, 0)}) as server:
+            scraper = ArticleScraper(urls={'Hacker News': server.url('/hn')})
+            for _ in range(3):
+                CrawlSourceState.objects.all().delete()
+                scraper.scrape_hackernews(limit=50)
+        
+        self.assertEqual(server.hits['/hn'], 3)
+        self.assertEqual(server.connections, 1)
+        self.assertLess(server.bytes_sent, 3 * len(page) / 2)
+        self.assertEqual(ScrapedArticle.objects.count(), 50)
+    
+    def test_sources_have_their_own_session(self):
+        """Test that concurrent sources each reuse their own session and connection across runs"""
+        pages = {'/hn': (hackernews_page(2), 0), '/devto': (dev_to_page(2), 0)}
+        with stub_server(pages) as server:
+            scraper = ArticleScraper(urls={'Hacker News': server.url('/hn'), 'dev.to': server.url('/devto')})
+            self.assertIsNot(scraper.sessions['Hacker News'], scraper.sessions['dev.to'])
+            for _ in range(3):
+                CrawlSourceState.objects.all().delete()
+                scraper.scrape_all(limit=10)
+        
+        self.assertEqual(server.hits, {'/hn': 3, '/devto': 3})
+        self.assertEqual(server.connections, 2)
+        self.assertEqual(set(scraper.validators), {'Hacker News', 'dev.to'})
@@ -1,46 +1,58 @@
 """
 scraper/views.py
 """
+from django.shortcuts import get_object_or_404
 from rest_framework import viewsets, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import IsAdminUser, AllowAny
 
-from scraper.models import ScrapedArticle
-from scraper.serializers import ScrapedArticleSerializer
-from scraper.scraper import ArticleScraper
+from mini_cms.middleware import SerializerTimingMixin
+from scraper.jobs import enqueue_scrape
+from scraper.models import ScrapedArticle, ScrapeJob
+from scraper.serializers import ScrapedArticleSerializer, ScrapeJobSerializer, ScrapeRequestSerializer
 
 
-class ScrapedArticleViewSet(viewsets.ReadOnlyModelViewSet):
+class ScrapedArticleViewSet(SerializerTimingMixin, viewsets.ReadOnlyModelViewSet):
     """
     ViewSet for viewing scraped articles
+    Lists can be filtered by ?source=
     Only admins can trigger scraping
     """
     queryset = ScrapedArticle.objects.all()
     serializer_class = ScrapedArticleSerializer
     permission_classes = [AllowAny]
+    filterset_fields = ['source']
     
     @action(detail=False, methods=['post'], permission_classes=[IsAdminUser])
     def scrape(self, request):
         """
-        Trigger scraping of articles (Admin only)
+        Queue a scrape of articles (Admin only). Answers 202 with the job,
+        which `manage.py run_scrape_worker` runs; a job already queued or
+        running for the same sources and limit is returned instead of a new
+        one.
         """
-        limit = request.data.get('limit', 5)
+        serializer = ScrapeRequestSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
         
-        try:
-            scraper = ArticleScraper()
-            articles = scraper.scrape_all(limit=limit)
-            
-            return Response({
-                'message': 'Scraping completed successfully',
-                'articles_scraped': len(articles),
-                'articles': articles
-            }, status=status.HTTP_200_OK)
-        
-        except Exception as e:
-            return Response({
-                'error': f'Scraping failed: {str(e)}'
-            }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+        job, created = enqueue_scrape(
+            serializer.validated_data['sources'], serializer.validated_data['limit'], request.user,
+        )
+        return Response({
+            **ScrapeJobSerializer(job, context={'request': request}).data,
+            'coalesced': not created,
+        }, status=status.HTTP_202_ACCEPTED)
+    
+    @action(
+        detail=False, methods=['get'], permission_classes=[IsAdminUser],
+        url_path=r'scrape/jobs/(?P<job_id>[0-9]+)', url_name='scrape-job',
+    )
+    def scrape_job(self, request, job_id=None):
+        """
+        Status, per-source progress and results of a scrape job (Admin only)
+        """
+        job = get_object_or_404(ScrapeJob, pk=job_id)
+        return Response(ScrapeJobSerializer(job, context={'request': request}).data)
     
     @action(detail=False, methods=['get'])
     def latest(self, request):